@@ -0,0 +1,128 @@
+"""denormalized review filter columns
+
+Revision ID: 5b2e8d41c9a7
+Revises: 884be0f53f6c
+Create Date: 2026-03-02 10:12:44.501216
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e8d41c9a7"
+down_revision: Union[str, Sequence[str], None] = "884be0f53f6c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_SEVERITY_COUNT = (
+    "(SELECT count(*) FROM json_each(review_messages.content_json, '$.issues') "
+    "WHERE coalesce(json_extract(value, '$.severity'), 'info') = '{severity}')"
+)
+
+
+def upgrade() -> None:
+    """Add indexed columns derived from content_json and backfill them."""
+    # -- 1. review_messages: derived columns (plain ADD COLUMN, no rebuild) ----
+    with op.batch_alter_table("review_messages") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "message_type",
+                sa.String(length=30),
+                nullable=False,
+                server_default="assistant_text",
+            )
+        )
+        batch_op.add_column(
+            sa.Column("info_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("warning_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("error_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("max_severity", sa.String(length=10), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("is_error", sa.Boolean(), nullable=False, server_default="0")
+        )
+
+    # -- 2. Backfill from content_json ----------------------------------------
+    op.execute(
+        "UPDATE review_messages SET message_type = "
+        "  CASE "
+        "    WHEN json_extract(content_json, '$.type') IS NOT NULL "
+        "      THEN json_extract(content_json, '$.type') "
+        "    WHEN json_type(content_json, '$.summary') IS NOT NULL THEN 'result' "
+        "    ELSE 'assistant_text' "
+        "  END"
+    )
+    op.execute(
+        "UPDATE review_messages SET "
+        f"info_count = {_SEVERITY_COUNT.format(severity='info')}, "
+        f"warning_count = {_SEVERITY_COUNT.format(severity='warning')}, "
+        f"error_count = {_SEVERITY_COUNT.format(severity='error')} "
+        "WHERE message_type = 'result'"
+    )
+    op.execute(
+        "UPDATE review_messages SET "
+        "max_severity = CASE "
+        "  WHEN error_count > 0 THEN 'error' "
+        "  WHEN warning_count > 0 THEN 'warning' "
+        "  WHEN info_count > 0 THEN 'info' "
+        "END, "
+        "is_error = (message_type = 'error')"
+    )
+
+    # -- 3. Indexes -----------------------------------------------------------
+    op.create_index(
+        op.f("ix_review_messages_message_type"),
+        "review_messages",
+        ["message_type"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_review_messages_max_severity"),
+        "review_messages",
+        ["max_severity"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_review_messages_is_error"),
+        "review_messages",
+        ["is_error"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_review_sessions_language"),
+        "review_sessions",
+        ["language"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_review_sessions_provider"),
+        "review_sessions",
+        ["provider"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the derived columns and their indexes."""
+    op.drop_index(op.f("ix_review_sessions_provider"), table_name="review_sessions")
+    op.drop_index(op.f("ix_review_sessions_language"), table_name="review_sessions")
+    op.drop_index(op.f("ix_review_messages_is_error"), table_name="review_messages")
+    op.drop_index(op.f("ix_review_messages_max_severity"), table_name="review_messages")
+    op.drop_index(op.f("ix_review_messages_message_type"), table_name="review_messages")
+    with op.batch_alter_table("review_messages") as batch_op:
+        batch_op.drop_column("is_error")
+        batch_op.drop_column("max_severity")
+        batch_op.drop_column("error_count")
+        batch_op.drop_column("warning_count")
+        batch_op.drop_column("info_count")
+        batch_op.drop_column("message_type")
@@ -0,0 +1,31 @@
+"""session model
+
+Revision ID: a3f6c2d9b417
+Revises: e7a2b9c4d136
+Create Date: 2026-03-09 10:22:14.318406
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f6c2d9b417"
+down_revision: Union[str, Sequence[str], None] = "e7a2b9c4d136"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Record which model served each review session."""
+    with op.batch_alter_table("review_sessions") as batch_op:
+        batch_op.add_column(sa.Column("model", sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the model column."""
+    with op.batch_alter_table("review_sessions") as batch_op:
+        batch_op.drop_column("model")
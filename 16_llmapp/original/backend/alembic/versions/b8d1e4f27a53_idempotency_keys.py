@@ -0,0 +1,51 @@
+"""idempotency keys
+
+Revision ID: b8d1e4f27a53
+Revises: a3f6c2d9b417
+Create Date: 2026-03-10 14:05:37.902215
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d1e4f27a53"
+down_revision: Union[str, Sequence[str], None] = "a3f6c2d9b417"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create idempotency_keys for de-duplicating retried review requests."""
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("endpoint", sa.String(length=20), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("session_id", sa.Integer(), nullable=True),
+        sa.Column("response_json", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["review_sessions.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("user_id", "key"),
+    )
+    op.create_index(
+        op.f("ix_idempotency_keys_created_at"),
+        "idempotency_keys",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop idempotency_keys."""
+    op.drop_index(op.f("ix_idempotency_keys_created_at"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,42 @@
+"""review rollups
+
+Revision ID: c41f7a9e2d08
+Revises: 5b2e8d41c9a7
+Create Date: 2026-03-04 16:40:02.118733
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f7a9e2d08"
+down_revision: Union[str, Sequence[str], None] = "5b2e8d41c9a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create review_rollups. Backfill with ``python -m app.cli rebuild-analytics``."""
+    op.create_table(
+        "review_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("language", sa.String(length=50), nullable=False),
+        sa.Column("reviews", sa.Integer(), nullable=False),
+        sa.Column("results", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.Integer(), nullable=False),
+        sa.Column("info_count", sa.Integer(), nullable=False),
+        sa.Column("warning_count", sa.Integer(), nullable=False),
+        sa.Column("error_count", sa.Integer(), nullable=False),
+        sa.Column("lines", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "day", "language"),
+    )
+
+
+def downgrade() -> None:
+    """Drop review_rollups."""
+    op.drop_table("review_rollups")
@@ -0,0 +1,35 @@
+"""user history version
+
+Revision ID: d2c7f9a1e384
+Revises: b8d1e4f27a53
+Create Date: 2026-03-11 09:41:52.530194
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2c7f9a1e384"
+down_revision: Union[str, Sequence[str], None] = "b8d1e4f27a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the per-user history version counter behind list ETags."""
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "history_version", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+
+
+def downgrade() -> None:
+    """Drop the history version counter."""
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("history_version")
@@ -0,0 +1,56 @@
+"""session token usage
+
+Revision ID: e7a2b9c4d136
+Revises: c41f7a9e2d08
+Create Date: 2026-03-06 11:05:37.902114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a2b9c4d136"
+down_revision: Union[str, Sequence[str], None] = "c41f7a9e2d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add per-session token counters and the (user_id, created_at) index."""
+    with op.batch_alter_table("review_sessions") as batch_op:
+        batch_op.add_column(
+            sa.Column("prompt_tokens", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column(
+                "completion_tokens", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+        batch_op.add_column(
+            sa.Column("cached_tokens", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column(
+                "usage_estimated", sa.Boolean(), nullable=False, server_default="0"
+            )
+        )
+    op.create_index(
+        "ix_review_sessions_user_id_created_at",
+        "review_sessions",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the token counters and index."""
+    op.drop_index("ix_review_sessions_user_id_created_at", table_name="review_sessions")
+    with op.batch_alter_table("review_sessions") as batch_op:
+        batch_op.drop_column("usage_estimated")
+        batch_op.drop_column("cached_tokens")
+        batch_op.drop_column("completion_tokens")
+        batch_op.drop_column("prompt_tokens")
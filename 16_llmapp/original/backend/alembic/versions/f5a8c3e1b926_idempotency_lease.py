@@ -0,0 +1,31 @@
+"""idempotency lease
+
+Revision ID: f5a8c3e1b926
+Revises: d2c7f9a1e384
+Create Date: 2026-03-12 10:18:44.217604
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from app.core import migrations
+
+# revision identifiers, used by Alembic.
+revision: str = "f5a8c3e1b926"
+down_revision: Union[str, Sequence[str], None] = "d2c7f9a1e384"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the lease that lets a retry take over a key whose original died."""
+    migrations.add_column(
+        "idempotency_keys", sa.Column("locked_until", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Drop the idempotency lease."""
+    migrations.drop_column("idempotency_keys", "locked_until")
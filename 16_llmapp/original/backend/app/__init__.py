@@ -0,0 +1,4 @@
+import time
+
+# Reference point for the import and time-to-ready figures in app.services.warmup.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,55 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.exceptions import NotFoundError
+from app.core.profiling import get_profiler
+from app.core.security import get_admin_user
+from app.models.user import User
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _require_profiling() -> None:
+    if not get_settings().profiling_enabled:
+        raise NotFoundError("Profiling is disabled")
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(_require_profiling)],
+)
+async def profile_worker(
+    _admin: User = Depends(get_admin_user),
+    seconds: float = Query(default=10, gt=0),
+):
+    """Sample this worker's event loop for ``seconds``; returns collapsed stacks."""
+    seconds = min(seconds, get_settings().profiling_max_seconds)
+    profiler = get_profiler()
+    collector = profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        collapsed = profiler.stop(collector)
+    return PlainTextResponse(
+        collapsed, headers={"X-Profile-Samples": str(collector.samples)}
+    )
+
+
+@router.get(
+    "/profile/requests/{request_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(_require_profiling)],
+)
+async def get_request_profile(
+    request_id: str,
+    _admin: User = Depends(get_admin_user),
+):
+    """Collapsed stacks recorded for a request sent with ``X-Profile: 1``."""
+    collapsed = get_profiler().stored(request_id)
+    if collapsed is None:
+        raise NotFoundError("No profile for this request on this worker")
+    return PlainTextResponse(collapsed)
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.analytics import GLOBAL_SCOPE
+from app.models.user import User
+from app.schemas.analytics import (
+    AnalyticsResponse,
+    AnalyticsScope,
+    AnalyticsTotals,
+    DailyStats,
+    LanguageStats,
+)
+from app.services.analytics import load_rollups
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+_DEFAULT_DAYS = 30
+_MAX_DAYS = 366
+
+
+@router.get("", response_model=AnalyticsResponse)
+async def get_analytics(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    scope: AnalyticsScope = Query(default="user"),
+    days: int = Query(default=_DEFAULT_DAYS, ge=1, le=_MAX_DAYS),
+):
+    rows = await load_rollups(db, user.id if scope == "user" else GLOBAL_SCOPE, days)
+
+    daily: dict = {}
+    languages: dict[str, LanguageStats] = {}
+    totals = AnalyticsTotals()
+    for row in rows:
+        day = daily.setdefault(row.day, DailyStats(day=row.day))
+        day.reviews += row.reviews
+        day.errors += row.errors
+
+        lang = languages.setdefault(row.language, LanguageStats(language=row.language))
+        lang.reviews += row.reviews
+        lang.info_count += row.info_count
+        lang.warning_count += row.warning_count
+        lang.error_count += row.error_count
+
+        totals.reviews += row.reviews
+        totals.results += row.results
+        totals.errors += row.errors
+        totals.issues += row.info_count + row.warning_count + row.error_count
+        totals.lines += row.lines
+
+    if totals.reviews:
+        totals.error_rate = totals.errors / totals.reviews
+    if totals.lines:
+        totals.issues_per_kloc = totals.issues * 1000 / totals.lines
+
+    return AnalyticsResponse(
+        scope=scope,
+        days=days,
+        daily=list(daily.values()),
+        languages=sorted(languages.values(), key=lambda s: s.reviews, reverse=True),
+        totals=totals,
+    )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.warmup import get_readiness
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """503 until startup warm-up has finished, for load balancer readiness checks."""
+    readiness = get_readiness()
+    return JSONResponse(
+        readiness.snapshot(), status_code=200 if readiness.ready else 503
+    )
@@ -1,31 +1,94 @@
+import asyncio
 import contextlib
 import json
 import logging
+import time
+from typing import Literal, NamedTuple
 
-from fastapi import APIRouter, Depends, Query, Response
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from sqlalchemy import and_, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sse_starlette.sse import EventSourceResponse, ServerSentEvent
+from starlette.background import BackgroundTasks
 
+from app.core.config import get_settings
 from app.core.database import async_session, get_db
-from app.core.exceptions import NotFoundError, ProviderError
+from app.core.exceptions import (
+    ConflictError,
+    IdempotencyInProgressError,
+    NotFoundError,
+    ProviderError,
+)
+from app.core.metrics import CANCELLED_SAVED_TOKENS, OPEN_STREAMS, STREAM_DURATION
 from app.core.security import get_current_user
-from app.models.review import ReviewMessage, ReviewSession
+from app.core.tracing import start_span, trace_span
+from app.models.review import SEVERITY_ORDER, ReviewMessage, ReviewSession
 from app.models.user import User
 from app.schemas.reviews import (
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    FocusArea,
+    FollowUpRequest,
     LocalReviewRequest,
+    PromptEstimate,
     ReviewCreateResponse,
     ReviewRequest,
     ReviewSessionDetailResponse,
     ReviewSessionResponse,
+    Severity,
+    TokenUsage,
+)
+from app.services.admission import AdmissionController, get_admission_controller
+from app.services.analytics import record_message, record_session
+from app.services.budget import enforce_budget, estimate_review
+from app.services.cancellation import (
+    StreamCancelledError,
+    StreamRegistry,
+    get_stream_registry,
+    shielded,
+    until_cancelled,
+)
+from app.services.fanout import (
+    branch_slots,
+    fanout_areas,
+    review_fanout,
+    stream_fanout,
+)
+from app.services.followup import build_followup_messages, session_turns
+from app.services.history import (
+    CACHE_CONTROL,
+    bump_history_version,
+    list_etag,
+    matches,
+    session_etag,
+)
+from app.services.idempotency import (
+    IdempotencyRecord,
+    IdempotencyStore,
+    get_idempotency_store,
+    request_hash,
+)
+from app.services.llm import (
+    OpenAIProvider,
+    get_openai_provider,
+    parse_stream_result,
+    partial_result_content,
+    salvage_stream_result,
 )
-from app.services.llm import OpenAIProvider, get_openai_provider, parse_stream_result
+from app.services.persistence import get_message_writer
+from app.services.prompts import CompactedCode, compact_code
+from app.services.retention import delete_sessions, purge
+from app.services.review_cache import CacheHit, ReviewCache, get_review_cache
+from app.services.routing import ModelRouter, Route, get_model_router
+from app.services.tokens import count_message_tokens, has_tokenizer
+from app.services.usage import enforce_token_quota, record_session_usage
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
 _MAX_STREAM_BUFFER = 2_000_000
+_FANOUT_DEGRADED = "fanout_degraded"
 _DEFAULT_PAGE_SIZE = 20
 _MAX_PAGE_SIZE = 100
 
@@ -35,71 +98,302 @@ async def _create_session_and_user_message(
     user: User,
     body: ReviewRequest | LocalReviewRequest,
     provider: str,
+    model: str | None = None,
 ) -> ReviewSession:
     """Create a ReviewSession and user message. Flushes but does NOT commit."""
-    session = ReviewSession(
-        user_id=user.id,
-        code=body.code,
-        language=body.language,
-        provider=provider,
-        settings_json=body.settings.model_dump() if body.settings else None,
-        execution_json=body.execution.model_dump() if body.execution else None,
+    with trace_span("db.create_session", provider=provider):
+        session = ReviewSession(
+            user_id=user.id,
+            code=body.code,
+            language=body.language,
+            provider=provider,
+            model=model,
+            settings_json=body.settings.model_dump() if body.settings else None,
+            execution_json=body.execution.model_dump() if body.execution else None,
+        )
+        db.add(session)
+        await db.flush()
+
+        user_msg = ReviewMessage(
+            session_id=session.id,
+            role="user",
+            content_json={
+                "type": "user_code",
+                "code": body.code,
+                "language": body.language,
+            },
+        )
+        db.add(user_msg)
+        await db.flush()
+        await record_session(db, session)
+        await bump_history_version(db, user.id)
+
+    return session
+
+
+async def _persist_error_message(
+    session: ReviewSession, raw_buffer: str, usage: TokenUsage | None = None
+) -> None:
+    """Persist an error message to the review session via the message writer."""
+    try:
+        await get_message_writer().write(
+            session, {"type": "error", "raw": raw_buffer[:2000]}, usage
+        )
+    except Exception:
+        logger.exception("Failed to persist error message")
+
+
+async def _persist_result(
+    session: ReviewSession, content: dict, usage: TokenUsage
+) -> None:
+    """Persist the assistant result and usage; returns once committed."""
+    await get_message_writer().write(session, content, usage)
+
+
+def _cache_lookup(
+    cache: ReviewCache | None,
+    user: User,
+    body: ReviewRequest,
+    cache_control: str | None,
+) -> CacheHit | None:
+    """Cached result for this submission, unless the client asked for a fresh one."""
+    if cache is None or (cache_control and "no-cache" in cache_control.lower()):
+        return None
+    return cache.lookup(user.id, body.code, body.language, body.settings)
+
+
+async def _claim_idempotency_key(
+    store: IdempotencyStore, user: User, key: str, endpoint: str, body: ReviewRequest
+) -> IdempotencyRecord | None:
+    """None when this request now owns ``key``; otherwise the original's record.
+
+    An in-progress original is waited for, unless it is a stream running in this
+    process, which the caller follows live instead.
+    """
+    digest = request_hash(endpoint, body.model_dump_json())
+    while True:
+        record = await store.claim(user.id, key, endpoint, digest)
+        if record is None or record.status != "in_progress":
+            return record
+        if endpoint == "stream" and store.is_local(user.id, key):
+            return record
+        record = await store.wait(user.id, key)
+        if record is not None:
+            return record
+
+
+async def _load_outcome(session_id: int | None) -> tuple[dict, TokenUsage]:
+    """Final assistant message and usage of a finished session, for replay."""
+    async with async_session() as db:
+        session = await db.get(
+            ReviewSession,
+            session_id or 0,
+            options=[selectinload(ReviewSession.messages)],
+        )
+    # The review's own outcome is the first reply; later ones are follow-ups.
+    reply = next(
+        (m for m in (session.messages if session else []) if m.role == "assistant"),
+        None,
     )
-    db.add(session)
-    await db.flush()
+    if reply is None:
+        raise NotFoundError("Review session not found")
+    usage = TokenUsage(
+        prompt_tokens=session.prompt_tokens,
+        completion_tokens=session.completion_tokens,
+        cached_tokens=session.cached_tokens,
+        estimated=session.usage_estimated,
+        model=session.model,
+    )
+    return reply.content_json, usage
 
-    user_msg = ReviewMessage(
-        session_id=session.id,
-        role="user",
-        content_json={
-            "type": "user_code",
-            "code": body.code,
-            "language": body.language,
-        },
+
+async def _create_cached_review(
+    db: AsyncSession, user: User, body: ReviewRequest, hit: CacheHit
+) -> ReviewSession:
+    session = await _create_session_and_user_message(db, user, body, "openai")
+    message = ReviewMessage(
+        session_id=session.id, role="assistant", content_json=hit.content()
     )
-    db.add(user_msg)
+    db.add(message)
     await db.flush()
-
+    await record_message(db, session, message)
     return session
 
 
-async def _persist_error_message(session_id: int, raw_buffer: str) -> None:
-    """Persist an error message to the review session in a separate DB session."""
+async def _persist_cancelled(
+    session: ReviewSession, content: dict, usage: TokenUsage
+) -> None:
+    """Persist what a stream produced before it was stopped; failures are logged."""
     try:
-        async with async_session() as db_write:
-            db_write.add(
-                ReviewMessage(
-                    session_id=session_id,
-                    role="assistant",
-                    content_json={
-                        "type": "error",
-                        "raw": raw_buffer[:2000],
-                    },
-                )
-            )
-            await db_write.commit()
+        await get_message_writer().write(session, content, usage)
     except Exception:
-        logger.exception("Failed to persist error message")
+        logger.exception("Failed to persist cancelled stream")
+
+
+class _Plan(NamedTuple):
+    route: Route
+    estimate: PromptEstimate
+    code: CompactedCode
+
+
+async def _plan(
+    body: ReviewRequest,
+    provider: OpenAIProvider,
+    model_router: ModelRouter,
+    stream: bool,
+) -> _Plan:
+    """Compact and count the prompt once, route it, and reject it if it won't fit."""
+    if get_settings().prompt_compaction_enabled:
+        code = compact_code(body.code, body.language)
+    else:
+        code = CompactedCode.identity(body.code)
+    estimate = await estimate_review(
+        code, body.language, body.settings, provider.model, stream
+    )
+    route = model_router.route(provider, estimate, body.settings)
+    enforce_budget(estimate, provider.capabilities.get(route.model).max_context)
+    return _Plan(route, estimate, code)
 
 
 @router.post("", response_model=ReviewCreateResponse)
 async def create_review(
     body: ReviewRequest,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     provider: OpenAIProvider = Depends(get_openai_provider),
+    admission: AdmissionController = Depends(get_admission_controller),
+    model_router: ModelRouter = Depends(get_model_router),
+    review_cache: ReviewCache | None = Depends(get_review_cache),
+    priority: Literal["standard", "bulk"] = Header(
+        default="standard", alias="X-Review-Priority"
+    ),
+    cache_control: str | None = Header(default=None),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    idempotency_key: str | None = Header(
+        default=None, alias="Idempotency-Key", max_length=255
+    ),
 ):
-    result = await provider.generate_review(body.code, body.language, body.settings)
+    if idempotency_key is None:
+        return await _review(
+            body,
+            user,
+            db,
+            provider,
+            admission,
+            model_router,
+            review_cache,
+            priority,
+            cache_control,
+        )
 
-    session = await _create_session_and_user_message(db, user, body, "openai")
+    record = await _claim_idempotency_key(
+        idempotency, user, idempotency_key, "review", body
+    )
+    if record is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return ReviewCreateResponse.model_validate(record.response_json)
+    try:
+        created = await _review(
+            body,
+            user,
+            db,
+            provider,
+            admission,
+            model_router,
+            review_cache,
+            priority,
+            cache_control,
+        )
+    except BaseException:
+        await shielded(idempotency.release(user.id, idempotency_key))
+        raise
+    finally:
+        await idempotency.finish(user.id, idempotency_key)
+    await idempotency.complete(
+        user.id,
+        idempotency_key,
+        created.session_id,
+        created.model_dump(mode="json"),
+        db=db,
+    )
+    return created
+
+
+async def _review(
+    body: ReviewRequest,
+    user: User,
+    db: AsyncSession,
+    provider: OpenAIProvider,
+    admission: AdmissionController,
+    model_router: ModelRouter,
+    review_cache: ReviewCache | None,
+    priority: str,
+    cache_control: str | None,
+) -> ReviewCreateResponse:
+    hit = _cache_lookup(review_cache, user, body, cache_control)
+    if hit is not None:
+        session = await _create_cached_review(db, user, body, hit)
+        return ReviewCreateResponse(
+            session_id=session.id,
+            result=hit.result,
+            usage=TokenUsage(),
+            cached=hit.marker,
+        )
+
+    await enforce_token_quota(db, user.id)
+    route, estimate, code = await _plan(body, provider, model_router, stream=False)
+    areas = fanout_areas(body.settings)
+    permit = await admission.acquire(
+        user.id, estimate.prompt_tokens * len(areas or [None]), priority
+    )
+    usage = TokenUsage()
+    failed: list[FocusArea] = []
+    with permit:
+        if areas:
+            result = await review_fanout(
+                provider,
+                areas,
+                code.code,
+                body.language,
+                body.settings,
+                usage,
+                route.models,
+                branch_slots(permit, lambda: admission.slot(user.id, priority)),
+                failed,
+            )
+        else:
+            result = await provider.generate_review(
+                code.code, body.language, body.settings, usage, route.models
+            )
+    result = code.remap_result(result)
+    if failed:
+        # A merge missing some focus areas is served once but never cached.
+        content = partial_result_content(result, _FANOUT_DEGRADED)
+    else:
+        content = result.model_dump()
+        if review_cache is not None:
+            review_cache.store(user.id, body.code, body.language, body.settings, result)
+
+    session = await _create_session_and_user_message(
+        db, user, body, "openai", usage.model
+    )
+    await record_session_usage(db, session.id, usage)
 
     assistant_msg = ReviewMessage(
-        session_id=session.id, role="assistant", content_json=result.model_dump()
+        session_id=session.id, role="assistant", content_json=content
     )
     db.add(assistant_msg)
     await db.flush()
+    await record_message(db, session, assistant_msg)
 
-    return ReviewCreateResponse(session_id=session.id, result=result)
+    return ReviewCreateResponse(
+        session_id=session.id,
+        result=result,
+        usage=usage,
+        estimate=estimate,
+        partial_reason=content.get("partial_reason"),
+    )
 
 
 @router.post("/local", response_model=ReviewCreateResponse)
@@ -117,6 +411,7 @@ async def create_local_review(
     )
     db.add(assistant_msg)
     await db.flush()
+    await record_message(db, session, assistant_msg)
 
     return ReviewCreateResponse(session_id=session.id, result=body.result)
 
@@ -127,61 +422,248 @@ async def stream_review(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     provider: OpenAIProvider = Depends(get_openai_provider),
+    admission: AdmissionController = Depends(get_admission_controller),
+    model_router: ModelRouter = Depends(get_model_router),
+    review_cache: ReviewCache | None = Depends(get_review_cache),
+    streams: StreamRegistry = Depends(get_stream_registry),
+    cache_control: str | None = Header(default=None),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    idempotency_key: str | None = Header(
+        default=None, alias="Idempotency-Key", max_length=255
+    ),
 ):
-    session = await _create_session_and_user_message(db, user, body, "openai")
-    await db.commit()
+    replayed = {"Idempotent-Replayed": "true"}
+    if idempotency_key is not None:
+        record = await _claim_idempotency_key(
+            idempotency, user, idempotency_key, "stream", body
+        )
+        if record is not None:
+            follower = idempotency.follow(user.id, idempotency_key)
+            if follower is not None:
+                return EventSourceResponse(follower, headers=replayed)
+            if record.status == "in_progress":
+                record = await idempotency.wait(user.id, idempotency_key)
+            if record is None:  # the original just failed; let the client retry
+                raise IdempotencyInProgressError(retry_after=1)
+            content, usage = await _load_outcome(record.session_id)
+            return EventSourceResponse(
+                _replay(record.session_id, content, usage), headers=replayed
+            )
+
+    background = BackgroundTasks()
+    if idempotency_key is not None:
+        # Covers failures before the stream starts and streams torn down
+        # before it runs; no-op once the outcome is recorded.
+        background.add_task(idempotency.release, user.id, idempotency_key)
+        background.add_task(idempotency.finish, user.id, idempotency_key)
+    try:
+        return await _stream_review(
+            body,
+            user,
+            db,
+            provider,
+            admission,
+            model_router,
+            review_cache,
+            streams,
+            cache_control,
+            idempotency,
+            idempotency_key,
+            background,
+        )
+    except BaseException:
+        await background()
+        raise
+
+
+async def _publishing(events, store: IdempotencyStore, user_id: int, key: str):
+    """Pass stream events through, sharing them with retries that attach."""
+    async with contextlib.aclosing(events):
+        try:
+            async for event in events:
+                await store.publish(user_id, key, event)
+                yield event
+        finally:
+            await shielded(store.finish(user_id, key))
+
+
+async def _stream_review(
+    body: ReviewRequest,
+    user: User,
+    db: AsyncSession,
+    provider: OpenAIProvider,
+    admission: AdmissionController,
+    model_router: ModelRouter,
+    review_cache: ReviewCache | None,
+    streams: StreamRegistry,
+    cache_control: str | None,
+    idempotency: IdempotencyStore,
+    idempotency_key: str | None,
+    background: BackgroundTasks,
+) -> EventSourceResponse:
+    hit = _cache_lookup(review_cache, user, body, cache_control)
+    if hit is not None:
+        session = await _create_cached_review(db, user, body, hit)
+        if idempotency_key is not None:
+            await idempotency.complete(user.id, idempotency_key, session.id, db=db)
+        await db.commit()
+        return EventSourceResponse(
+            _replay(session.id, hit.content(), TokenUsage()), background=background
+        )
+
+    await enforce_token_quota(db, user.id)
+    route, estimate, code = await _plan(body, provider, model_router, stream=True)
+    areas = fanout_areas(body.settings)
+    permit = await admission.acquire(
+        user.id, estimate.prompt_tokens * len(areas or [None]), "interactive"
+    )
+    cancel = None
+    try:
+        session = await _create_session_and_user_message(
+            db, user, body, "openai", route.model
+        )
+        # Registered before commit, while no other request can see the session.
+        cancel = streams.register(session.id)
+        if cancel is None:
+            raise ConflictError("Review session is still streaming")
+        await db.commit()
+    except BaseException:
+        if cancel is not None:
+            streams.unregister(session.id, cancel)
+        permit.release()
+        raise
     session_id = session.id
+    usage = TokenUsage()
+    failed: list[FocusArea] = []
+
+    def cancelled_content(reason: str, full_buffer: str) -> dict:
+        saved = max(0, estimate.output_reserve - usage.completion_tokens)
+        CANCELLED_SAVED_TOKENS.labels(reason).inc(saved)
+        salvaged = salvage_stream_result(full_buffer)
+        return {
+            "type": "cancelled",
+            "reason": reason,
+            "raw": full_buffer[:2000],
+            "result": code.remap_result(salvaged).model_dump() if salvaged else None,
+        }
 
     async def event_generator():
         full_buffer = ""
         line_buffer = ""
+        outcome = "cancelled"
+        settled = False  # the outcome is final; retries replay rather than rerun
+        parsing = False
+        start = time.perf_counter()
+        OPEN_STREAMS.inc()
+        stream_span = start_span("review.stream", session_id=session_id)
 
         try:
             yield ServerSentEvent(
-                data=json.dumps({"session_id": session_id}), event="meta"
+                data=json.dumps(
+                    {"session_id": session_id, "estimate": estimate.model_dump()}
+                ),
+                event="meta",
             )
 
-            async for chunk in provider.generate_review_stream(
-                body.code, body.language, body.settings
-            ):
-                full_buffer += chunk
-                if len(full_buffer) > _MAX_STREAM_BUFFER:
-                    raise ProviderError(
-                        "Response exceeded maximum size",
-                        details={"max_chars": _MAX_STREAM_BUFFER},
-                    )
-
-                line_buffer += chunk
-                while "\n" in line_buffer:
-                    line, line_buffer = line_buffer.split("\n", 1)
-                    line = line.strip()
-                    if line:
-                        yield ServerSentEvent(
-                            data=json.dumps({"chunk": line}), event="token"
+            if areas:
+                stream = stream_fanout(
+                    provider,
+                    areas,
+                    code.code,
+                    body.language,
+                    body.settings,
+                    usage,
+                    route.models,
+                    branch_slots(
+                        permit, lambda: admission.slot(user.id, "interactive")
+                    ),
+                    failed,
+                )
+            else:
+                stream = provider.generate_review_stream(
+                    code.code, body.language, body.settings, usage, route.models
+                )
+            # aclosing: an early exit must close upstream and settle usage now.
+            chunks = until_cancelled(stream, cancel)
+            async with contextlib.aclosing(chunks):
+                async for chunk in chunks:
+                    full_buffer += chunk
+                    if len(full_buffer) > _MAX_STREAM_BUFFER:
+                        raise ProviderError(
+                            "Response exceeded maximum size",
+                            details={"max_chars": _MAX_STREAM_BUFFER},
                         )
 
-            remaining = line_buffer.strip()
+                    line_buffer += chunk
+                    while "\n" in line_buffer:
+                        line, line_buffer = line_buffer.split("\n", 1)
+                        line = line.strip()
+                        if line:
+                            line = code.remap_stream_line(line)
+                            yield ServerSentEvent(
+                                data=json.dumps({"chunk": line}), event="token"
+                            )
+
+            remaining = code.remap_stream_line(line_buffer.strip())
             if remaining:
                 yield ServerSentEvent(
                     data=json.dumps({"chunk": remaining}), event="token"
                 )
 
-            result = parse_stream_result(full_buffer)
+            parsing = True
+            with trace_span("review.parse", parent=stream_span, chars=len(full_buffer)):
+                result = code.remap_result(parse_stream_result(full_buffer))
 
-            async with async_session() as db_write:
-                db_write.add(
-                    ReviewMessage(
-                        session_id=session_id,
-                        role="assistant",
-                        content_json=result.model_dump(),
-                    )
+            if failed:
+                content = partial_result_content(result, _FANOUT_DEGRADED)
+            else:
+                content = result.model_dump()
+            with trace_span("db.persist_result", parent=stream_span):
+                await _persist_result(session, content, usage)
+            if review_cache is not None and not failed:
+                review_cache.store(
+                    user.id, body.code, body.language, body.settings, result
                 )
-                await db_write.commit()
 
-            yield ServerSentEvent(data=json.dumps(result.model_dump()), event="result")
+            yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+            yield ServerSentEvent(data=json.dumps(content), event="result")
+            outcome = "partial" if failed else "success"
+            settled = True
+
+        except StreamCancelledError:
+            content = cancelled_content("user_cancel", full_buffer)
+            await _persist_cancelled(session, content, usage)
+            settled = True
+            yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+            yield ServerSentEvent(data=json.dumps(content), event="cancelled")
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away: upstream is already closed by aclosing above.
+            content = cancelled_content("client_disconnect", full_buffer)
+            await shielded(_persist_cancelled(session, content, usage))
+            raise
 
         except ProviderError as e:
-            await _persist_error_message(session_id, full_buffer)
+            salvaged = salvage_stream_result(full_buffer)
+            if salvaged is not None:
+                # Issues that already streamed (and were paid for) beat an error.
+                if len(full_buffer) > _MAX_STREAM_BUFFER:
+                    reason = "size_limit"
+                elif parsing:
+                    reason = "unparseable"
+                else:
+                    reason = "interrupted"
+                content = partial_result_content(code.remap_result(salvaged), reason)
+                with trace_span("db.persist_result", parent=stream_span):
+                    await _persist_result(session, content, usage)
+                outcome = "partial"
+                settled = True
+                yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+                yield ServerSentEvent(data=json.dumps(content), event="result")
+                return
+
+            outcome = "provider_error"
+            await _persist_error_message(session, full_buffer, usage)
             yield ServerSentEvent(
                 data=json.dumps(
                     {
@@ -194,8 +676,9 @@ async def stream_review(
             )
 
         except Exception:
+            outcome = "internal_error"
             logger.exception("Unexpected error during review stream")
-            await _persist_error_message(session_id, full_buffer)
+            await _persist_error_message(session, full_buffer, usage)
             yield ServerSentEvent(
                 data=json.dumps(
                     {
@@ -207,25 +690,269 @@ async def stream_review(
             )
 
         finally:
+            streams.unregister(session_id, cancel)
+            permit.release()
+            if settled and idempotency_key is not None:
+                await shielded(
+                    idempotency.complete(user.id, idempotency_key, session_id)
+                )
+            OPEN_STREAMS.dec()
+            STREAM_DURATION.labels(outcome).observe(time.perf_counter() - start)
+            if stream_span is not None:
+                stream_span.set("outcome", outcome)
+                stream_span.end()
             with contextlib.suppress(Exception):
                 yield ServerSentEvent(data="{}", event="done")
 
-    return EventSourceResponse(event_generator())
+    events = event_generator()
+    if idempotency_key is not None:
+        events = _publishing(events, idempotency, user.id, idempotency_key)
+    # The generator releases the permit and registration; the background tasks
+    # cover streams that are torn down before the generator ever runs.
+    background.add_task(permit.release)
+    background.add_task(streams.unregister, session_id, cancel)
+    return EventSourceResponse(events, background=background)
+
+
+@router.post("/{session_id}/followups")
+async def follow_up_review(
+    session_id: int,
+    body: FollowUpRequest,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    provider: OpenAIProvider = Depends(get_openai_provider),
+    admission: AdmissionController = Depends(get_admission_controller),
+    streams: StreamRegistry = Depends(get_stream_registry),
+):
+    """Answer a question about a reviewed session, streamed as SSE."""
+    result = await db.execute(
+        select(ReviewSession)
+        .where(ReviewSession.id == session_id, ReviewSession.user_id == user.id)
+        .options(selectinload(ReviewSession.messages))
+    )
+    session = result.scalar_one_or_none()
+    if session is None:
+        raise NotFoundError("Review session not found")
+    # Claimed here, not in the generator, so two concurrent follow-ups (or a
+    # follow-up racing the review stream) cannot both get through.
+    cancel = streams.register(session_id)
+    if cancel is None:
+        raise ConflictError("Review session is still streaming")
+
+    permit = None
+    try:
+        await enforce_token_quota(db, user.id)
+        settings = get_settings()
+        model = session.model or provider.model
+        review, turns = session_turns(session.messages)
+        messages = build_followup_messages(
+            session,
+            review,
+            turns,
+            body.question,
+            model,
+            settings.followup_history_tokens,
+        )
+        estimate = PromptEstimate(
+            prompt_tokens=count_message_tokens(messages, model),
+            output_reserve=settings.followup_output_reserve,
+            estimated=not has_tokenizer(model),
+        )
+        enforce_budget(estimate, provider.capabilities.get(model).max_context)
+        permit = await admission.acquire(user.id, estimate.prompt_tokens, "interactive")
+        question = ReviewMessage(
+            session_id=session.id,
+            role="user",
+            content_json={"type": "followup_question", "text": body.question},
+        )
+        db.add(question)
+        await db.commit()
+    except BaseException:
+        streams.unregister(session_id, cancel)
+        if permit is not None:
+            permit.release()
+        raise
+    question_id = question.id
+    # Stay on the session's model so its cached prefix is reused.
+    models = list(dict.fromkeys([model, provider.model]))
+    usage = TokenUsage()
+
+    def answer_content(text: str, reason: str | None = None) -> dict:
+        content = {"type": "followup_answer", "question_id": question_id, "text": text}
+        if usage.model is not None:
+            content["model"] = usage.model
+        if reason is not None:
+            content.update(partial=True, partial_reason=reason)
+        return content
+
+    def answer_usage() -> TokenUsage:
+        # The answer records its own model (it may have fallen back); the
+        # session keeps the one that produced the review.
+        return usage.model_copy(update={"model": None})
+
+    async def event_generator():
+        answer = ""
+        outcome = "cancelled"
+        start = time.perf_counter()
+        OPEN_STREAMS.inc()
+        stream_span = start_span("review.followup", session_id=session_id)
+
+        try:
+            yield ServerSentEvent(
+                data=json.dumps(
+                    {
+                        "session_id": session_id,
+                        "question_id": question_id,
+                        "estimate": estimate.model_dump(),
+                    }
+                ),
+                event="meta",
+            )
+            stream = provider.stream_messages(messages, usage, models)
+            chunks = until_cancelled(stream, cancel)
+            async with contextlib.aclosing(chunks):
+                async for chunk in chunks:
+                    answer += chunk
+                    if len(answer) > _MAX_STREAM_BUFFER:
+                        raise ProviderError(
+                            "Response exceeded maximum size",
+                            details={"max_chars": _MAX_STREAM_BUFFER},
+                        )
+                    yield ServerSentEvent(
+                        data=json.dumps({"chunk": chunk}), event="token"
+                    )
+
+            content = answer_content(answer)
+            with trace_span("db.persist_result", parent=stream_span):
+                await _persist_result(session, content, answer_usage())
+            yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+            yield ServerSentEvent(data=json.dumps(content), event="answer")
+            outcome = "success"
+
+        except StreamCancelledError:
+            content = answer_content(answer, "user_cancel")
+            await _persist_cancelled(session, content, answer_usage())
+            yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+            yield ServerSentEvent(data=json.dumps(content), event="cancelled")
+
+        except (asyncio.CancelledError, GeneratorExit):
+            content = answer_content(answer, "client_disconnect")
+            await shielded(_persist_cancelled(session, content, answer_usage()))
+            raise
+
+        except ProviderError as e:
+            # Saved as a partial answer: an "error" message would mark the
+            # review itself as failed in history and analytics.
+            outcome = "provider_error"
+            content = answer_content(answer, "provider_error")
+            await _persist_cancelled(session, content, answer_usage())
+            yield ServerSentEvent(
+                data=json.dumps(
+                    {
+                        "code": e.code,
+                        "message": e.message,
+                        "details": e.details or {},
+                    }
+                ),
+                event="error",
+            )
+
+        except Exception:
+            outcome = "internal_error"
+            logger.exception("Unexpected error during follow-up stream")
+            content = answer_content(answer, "internal_error")
+            await _persist_cancelled(session, content, answer_usage())
+            yield ServerSentEvent(
+                data=json.dumps(
+                    {
+                        "code": "internal_error",
+                        "message": "An unexpected error occurred",
+                    }
+                ),
+                event="error",
+            )
+
+        finally:
+            streams.unregister(session_id, cancel)
+            permit.release()
+            OPEN_STREAMS.dec()
+            STREAM_DURATION.labels(outcome).observe(time.perf_counter() - start)
+            if stream_span is not None:
+                stream_span.set("outcome", outcome)
+                stream_span.end()
+            with contextlib.suppress(Exception):
+                yield ServerSentEvent(data="{}", event="done")
+
+    background = BackgroundTasks()
+    background.add_task(permit.release)
+    background.add_task(streams.unregister, session_id, cancel)
+    return EventSourceResponse(event_generator(), background=background)
+
+
+async def _replay(session_id: int, content: dict, usage: TokenUsage):
+    """Stream a stored outcome with the same events as a live review."""
+    yield ServerSentEvent(data=json.dumps({"session_id": session_id}), event="meta")
+    cancelled = content.get("type") == "cancelled"
+    result = content.get("result") if cancelled else content
+    for issue in (result or {}).get("issues") or []:
+        line = json.dumps({"type": "issue", **issue})
+        yield ServerSentEvent(data=json.dumps({"chunk": line}), event="token")
+    yield ServerSentEvent(data=usage.model_dump_json(), event="usage")
+    event = "cancelled" if cancelled else "result"
+    yield ServerSentEvent(data=json.dumps(content), event=event)
+    yield ServerSentEvent(data="{}", event="done")
 
 
 @router.get("", response_model=list[ReviewSessionResponse])
 async def list_reviews(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     limit: int = Query(default=_DEFAULT_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
     offset: int = Query(default=0, ge=0),
+    language: str | None = Query(default=None),
+    provider: str | None = Query(default=None),
+    min_severity: Severity | None = Query(default=None),
+    status: Literal["success", "error"] | None = Query(default=None),
+    if_none_match: str | None = Header(default=None),
 ):
+    etag = list_etag(user, str(request.query_params))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    stmt = select(ReviewSession).where(ReviewSession.user_id == user.id)
+    if language is not None:
+        stmt = stmt.where(ReviewSession.language == language)
+    if provider is not None:
+        stmt = stmt.where(ReviewSession.provider == provider)
+    if min_severity is not None:
+        severities = SEVERITY_ORDER[SEVERITY_ORDER.index(min_severity) :]
+        stmt = stmt.where(
+            exists().where(
+                ReviewMessage.session_id == ReviewSession.id,
+                ReviewMessage.max_severity.in_(severities),
+            )
+        )
+    if status is not None:
+        has_error = exists().where(
+            ReviewMessage.session_id == ReviewSession.id,
+            ReviewMessage.is_error.is_(True),
+        )
+        if status == "error":
+            stmt = stmt.where(has_error)
+        else:
+            # Cancelled and still-running sessions are neither.
+            has_result = exists().where(
+                ReviewMessage.session_id == ReviewSession.id,
+                ReviewMessage.message_type == "result",
+            )
+            stmt = stmt.where(has_result, ~has_error)
+
     result = await db.execute(
-        select(ReviewSession)
-        .where(ReviewSession.user_id == user.id)
-        .order_by(ReviewSession.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+        stmt.order_by(ReviewSession.created_at.desc()).limit(limit).offset(offset)
     )
     sessions = result.scalars().all()
 
@@ -238,24 +965,65 @@ async def delete_review(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(ReviewSession)
-        .where(ReviewSession.id == session_id, ReviewSession.user_id == user.id)
+    deleted = await delete_sessions(
+        db, and_(ReviewSession.id == session_id, ReviewSession.user_id == user.id)
     )
-    session = result.scalar_one_or_none()
-    if session is None:
+    if not deleted:
         raise NotFoundError("Review session not found")
-
-    await db.delete(session)
     return Response(status_code=204)
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_reviews(
+    body: BulkDeleteRequest,
+    user: User = Depends(get_current_user),
+):
+    conditions = [ReviewSession.user_id == user.id]
+    if body.ids is not None:
+        conditions.append(ReviewSession.id.in_(body.ids))
+    if body.after is not None:
+        conditions.append(ReviewSession.created_at >= body.after)
+    if body.before is not None:
+        conditions.append(ReviewSession.created_at < body.before)
+    deleted = await purge(and_(*conditions), "bulk_delete")
+    return BulkDeleteResponse(deleted=deleted)
+
+
+@router.post("/{session_id}/cancel", status_code=202)
+async def cancel_review(
+    session_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    streams: StreamRegistry = Depends(get_stream_registry),
+):
+    owned = await db.scalar(
+        select(ReviewSession.id).where(
+            ReviewSession.id == session_id, ReviewSession.user_id == user.id
+        )
+    )
+    if owned is None:
+        raise NotFoundError("Review session not found")
+    if not streams.cancel(session_id):
+        raise ConflictError("Review is not streaming")
+    return Response(status_code=202)
+
+
 @router.get("/{session_id}", response_model=ReviewSessionDetailResponse)
 async def get_review(
     session_id: int,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
 ):
+    etag = await session_etag(db, user.id, session_id)
+    if etag is None:
+        raise NotFoundError("Review session not found")
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
     result = await db.execute(
         select(ReviewSession)
         .where(ReviewSession.id == session_id, ReviewSession.user_id == user.id)
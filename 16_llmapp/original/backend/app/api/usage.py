@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.usage import DailyUsage, UsageSummaryResponse
+from app.services.usage import daily_usage, quota_window_start, tokens_used_since
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+_DEFAULT_DAYS = 30
+_MAX_DAYS = 366
+
+
+@router.get("", response_model=UsageSummaryResponse)
+async def get_usage(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    settings = get_settings()
+    prompt, completion = await tokens_used_since(db, user.id, quota_window_start())
+    used = prompt + completion
+    quota = settings.token_quota or None
+    return UsageSummaryResponse(
+        window_hours=settings.token_quota_window_hours,
+        quota=quota,
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        used=used,
+        remaining=max(quota - used, 0) if quota else None,
+    )
+
+
+@router.get("/daily", response_model=list[DailyUsage])
+async def get_daily_usage(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    days: int = Query(default=_DEFAULT_DAYS, ge=1, le=_MAX_DAYS),
+):
+    rows = await daily_usage(db, user.id, days)
+    return [
+        DailyUsage(
+            day=day, reviews=reviews, prompt_tokens=prompt, completion_tokens=completion
+        )
+        for day, reviews, prompt, completion in rows
+    ]
@@ -0,0 +1,35 @@
+"""Maintenance commands: ``python -m app.cli <command>``."""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.database import async_session
+from app.services.analytics import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+
+async def _rebuild_analytics(_args: argparse.Namespace) -> None:
+    async with async_session() as db:
+        written = await rebuild_rollups(db)
+        await db.commit()
+    logger.info("Rebuilt analytics rollups (%d rows)", written)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-analytics", help="Recompute review rollups from history"
+    )
+    rebuild.set_defaults(handler=_rebuild_analytics)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,6 +19,118 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"
     cors_origins: str = "http://localhost:5173"
 
+    # Admission control in front of the provider. Rates of 0 disable a bucket.
+    rate_limit_requests_per_minute: float = 20
+    rate_limit_request_burst: int = 5
+    rate_limit_tokens_per_minute: float = 200_000
+    provider_max_concurrency: int = 16
+    provider_max_queue: int = 32
+    provider_queue_timeout_seconds: float = 10.0
+    # Seconds of waiting that lift a request by one priority class.
+    scheduler_aging_seconds: float = 15.0
+    # Fraction of provider slots bulk work may hold at once.
+    scheduler_bulk_max_share: float = 0.75
+
+    # Upstream resilience. The OpenAI SDK's own retries are disabled in favor of
+    # these so every attempt is seen by the circuit breaker.
+    llm_max_retries: int = 2
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_retry_max_delay_seconds: float = 8.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    # Race a second stream once the first token is later than this percentile.
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_delay_seconds: float = 1.0
+    # Probe JSON-schema/JSON-mode/stream-usage support at startup instead of
+    # learning it from the first rejected request.
+    llm_probe_capabilities: bool = False
+    # Seconds before a model's refusal of a request mode is retried.
+    llm_capability_recheck_seconds: float = 600.0
+    # Send a prompt_cache_key derived from the shared system prefix so requests
+    # with the same settings land on warm provider caches.
+    llm_prompt_cache_key: bool = True
+
+    # Preflight prompt budget. 0 disables the deployment-wide prompt cap.
+    budget_max_prompt_tokens: int = 0
+    budget_max_output_tokens: int = 16_384
+    # Strip license headers, comment banners and blank runs and shorten long
+    # string literals before prompting; issue lines are mapped back.
+    prompt_compaction_enabled: bool = False
+
+    # Review each focus area in its own concurrent request when a review lists at
+    # least fanout_min_areas of them, then merge the results.
+    fanout_enabled: bool = False
+    fanout_min_areas: int = 2
+
+    # Size-based routing between a fast and a strong model. When disabled every
+    # request uses openai_model.
+    routing_enabled: bool = False
+    routing_fast_model: str = "gpt-4o-mini"
+    routing_strong_model: str = "gpt-4o"
+    routing_fast_max_prompt_tokens: int = 4_000
+    # Move strong-routed reviews to the fast model while the strong model's p95
+    # time-to-first-token is above this. 0 disables the latency check.
+    routing_strong_latency_budget_seconds: float = 0.0
+
+    # Serve repeated submissions from a per-process result cache. The fuzzy tier
+    # also matches code that differs only in comments, whitespace or layout.
+    review_cache_enabled: bool = False
+    review_cache_fuzzy: bool = True
+    review_cache_ttl_seconds: int = 86_400
+    review_cache_max_entries: int = 1_000
+
+    # Idempotency-Key support on review creation. Keys expire after the TTL; a
+    # retry waits up to idempotency_wait_seconds for the original to finish.
+    # The original renews a lease on its key; a retry takes over the key once
+    # idempotency_lease_seconds pass without renewal.
+    idempotency_ttl_seconds: int = 86_400
+    idempotency_wait_seconds: float = 30.0
+    idempotency_lease_seconds: float = 30.0
+
+    # Write-behind batching of assistant messages: commit buffered writes
+    # together every window or once batch_size are waiting. Commits that hit
+    # SQLite lock contention are retried with exponential backoff.
+    persist_batch_enabled: bool = False
+    persist_batch_window_ms: int = 50
+    persist_batch_size: int = 100
+    persist_lock_retries: int = 5
+    persist_lock_retry_delay_ms: int = 20
+
+    # Background retention of review history; limits of 0 are off. Purges run
+    # every interval in batches of retention_batch_size sessions, each its own
+    # transaction, pausing between batches to let other writers in.
+    retention_enabled: bool = False
+    retention_interval_seconds: int = 3_600
+    retention_max_age_days: int = 0
+    retention_max_sessions_per_user: int = 0
+    retention_max_sessions: int = 0
+    retention_batch_size: int = 500
+    retention_batch_pause_ms: int = 50
+
+    # Follow-up questions: token budget for earlier turns kept verbatim (older
+    # ones are summarized) and the output allowance used for budget checks.
+    followup_history_tokens: int = 2_000
+    followup_output_reserve: int = 1_024
+
+    # Rolling per-user token quota (prompt + completion). 0 disables it.
+    token_quota: int = 0
+    token_quota_window_hours: int = 24
+
+    # Tracing: "none" disables span recording entirely.
+    trace_exporter: Literal["none", "jsonl", "otlp"] = "none"
+    trace_sample_rate: float = 0.1
+    trace_file: str = "traces.jsonl"
+    trace_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+
+    # Comma-separated emails of users allowed to use the admin endpoints.
+    admin_emails: str = ""
+    # Sampling profiler for admins: POST /api/admin/profile, or X-Profile: 1 on
+    # any request to profile just that request.
+    profiling_enabled: bool = False
+    profiling_interval_ms: int = 10
+    profiling_max_seconds: int = 60
+
 
 @lru_cache
 def get_settings() -> Settings:
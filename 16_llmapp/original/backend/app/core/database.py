@@ -1,9 +1,11 @@
+import time
 from collections.abc import AsyncGenerator
 
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import get_settings
+from app.core.metrics import DB_QUERY_DURATION, DB_TRANSACTION_DURATION
 
 engine = create_async_engine(get_settings().database_url)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
@@ -16,6 +18,37 @@ def _set_sqlite_pragma(dbapi_connection, _connection_record):
     cursor.close()
 
 
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _query_start(_conn, _cursor, _statement, _params, context, _executemany):
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _query_end(_conn, _cursor, _statement, _params, context, _executemany):
+    DB_QUERY_DURATION.observe(time.perf_counter() - context._query_start)
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _transaction_start(conn):
+    conn.info["transaction_start"] = time.perf_counter()
+
+
+def _transaction_end(conn, outcome: str) -> None:
+    start = conn.info.pop("transaction_start", None)
+    if start is not None:
+        DB_TRANSACTION_DURATION.labels(outcome).observe(time.perf_counter() - start)
+
+
+@event.listens_for(engine.sync_engine, "commit")
+def _transaction_commit(conn):
+    _transaction_end(conn, "commit")
+
+
+@event.listens_for(engine.sync_engine, "rollback")
+def _transaction_rollback(conn):
+    _transaction_end(conn, "rollback")
+
+
 async def get_db() -> AsyncGenerator[AsyncSession]:
     session = async_session()
     try:
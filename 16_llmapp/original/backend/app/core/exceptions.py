@@ -1,3 +1,5 @@
+import math
+
 from fastapi import Request
 from fastapi.responses import JSONResponse
 
@@ -9,12 +11,14 @@ class AppError(Exception):
         message: str,
         status_code: int = 400,
         details: dict | None = None,
+        retry_after: float | None = None,
     ):
         super().__init__(message)
         self.code = code
         self.message = message
         self.status_code = status_code
         self.details = details
+        self.retry_after = retry_after
 
 
 class AuthenticationError(AppError):
@@ -27,11 +31,82 @@ class NotFoundError(AppError):
         super().__init__(code="not_found", message=message, status_code=404)
 
 
+class ForbiddenError(AppError):
+    def __init__(self, message: str = "Not allowed"):
+        super().__init__(code="forbidden", message=message, status_code=403)
+
+
 class ConflictError(AppError):
     def __init__(self, message: str = "Resource already exists"):
         super().__init__(code="conflict", message=message, status_code=409)
 
 
+class IdempotencyKeyReusedError(AppError):
+    def __init__(
+        self, message: str = "Idempotency-Key was already used for a different request"
+    ):
+        super().__init__(
+            code="idempotency_key_reused", message=message, status_code=422
+        )
+
+
+class IdempotencyInProgressError(AppError):
+    def __init__(
+        self,
+        message: str = "A request with this Idempotency-Key is still in progress",
+        retry_after: float | None = None,
+    ):
+        super().__init__(
+            code="idempotency_in_progress",
+            message=message,
+            status_code=409,
+            retry_after=retry_after,
+        )
+
+
+class PromptTooLargeError(AppError):
+    def __init__(
+        self,
+        message: str = "Prompt exceeds the token budget",
+        details: dict | None = None,
+    ):
+        super().__init__(
+            code="prompt_too_large", message=message, status_code=413, details=details
+        )
+
+
+class TooManyRequestsError(AppError):
+    def __init__(
+        self,
+        code: str = "too_many_requests",
+        message: str = "Too many requests",
+        retry_after: float | None = None,
+        details: dict | None = None,
+    ):
+        super().__init__(
+            code=code,
+            message=message,
+            status_code=429,
+            details=details,
+            retry_after=retry_after,
+        )
+
+
+class QuotaExceededError(TooManyRequestsError):
+    def __init__(
+        self,
+        message: str = "Token quota exceeded",
+        retry_after: float | None = None,
+        details: dict | None = None,
+    ):
+        super().__init__(
+            code="quota_exceeded",
+            message=message,
+            retry_after=retry_after,
+            details=details,
+        )
+
+
 class ProviderError(AppError):
     def __init__(
         self, message: str = "LLM provider error", details: dict | None = None
@@ -41,8 +116,26 @@ class ProviderError(AppError):
         )
 
 
+class ProviderUnavailableError(ProviderError):
+    def __init__(
+        self,
+        message: str = "LLM provider temporarily unavailable",
+        retry_after: float | None = None,
+        details: dict | None = None,
+    ):
+        super().__init__(message=message, details=details)
+        self.code = "provider_unavailable"
+        self.status_code = 503
+        self.retry_after = retry_after
+
+
 async def app_exception_handler(_request: Request, exc: AppError) -> JSONResponse:
     body: dict = {"code": exc.code, "message": exc.message}
     if exc.details:
         body["details"] = exc.details
-    return JSONResponse(status_code=exc.status_code, content={"error": body})
+    headers = None
+    if exc.retry_after is not None:
+        headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    return JSONResponse(
+        status_code=exc.status_code, content={"error": body}, headers=headers
+    )
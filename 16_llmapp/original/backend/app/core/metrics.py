@@ -0,0 +1,369 @@
+"""In-process Prometheus-style collectors rendered in the text exposition format."""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+_REGISTRY: list["_Metric"] = []
+
+# Seconds. Covers sub-millisecond DB statements up to multi-minute generations.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = (
+            f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        )
+        return header + "".join(self._samples())
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_total{labels} {_format_value(child.value)}\n"
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def _samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(child.value)}\n"
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                labels = _format_labels(names, (*key, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}\n"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}\n"
+            yield f"{self.name}_count{labels} {cumulative}\n"
+
+
+def render_metrics() -> str:
+    return "".join(metric.render() for metric in _REGISTRY)
+
+
+# -- Application metrics ------------------------------------------------------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+PROVIDER_CALL_DURATION = Histogram(
+    "llm_provider_call_duration_seconds",
+    "Wall time of one upstream LLM call, including the full stream.",
+    ("provider", "model", "mode"),
+)
+TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from issuing a streaming call to the first content chunk.",
+    ("provider", "model"),
+)
+INTER_TOKEN_LATENCY = Histogram(
+    "llm_inter_token_latency_seconds",
+    "Gap between consecutive streamed content chunks.",
+    ("provider", "model"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+STREAM_DURATION = Histogram(
+    "review_stream_duration_seconds",
+    "Lifetime of a /api/reviews/stream response by outcome.",
+    ("outcome",),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Execution time of individual SQL statements.",
+)
+DB_TRANSACTION_DURATION = Histogram(
+    "db_transaction_duration_seconds",
+    "Time from BEGIN to COMMIT/ROLLBACK.",
+    ("outcome",),
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "Time spent hashing or verifying passwords.",
+    ("operation",),
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+PARSE_FAILURES = Counter(
+    "review_parse_failures",
+    "LLM outputs that could not be parsed into a ReviewResult.",
+)
+PROVIDER_ERRORS = Counter(
+    "llm_provider_errors",
+    "Upstream errors surfaced as ProviderError, by exception type.",
+    ("provider", "error_type"),
+)
+OPEN_STREAMS = Gauge(
+    "review_streams_open",
+    "Review streams currently being served.",
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections",
+    "Requests rejected with 429 before reaching the provider, by limit.",
+    ("reason",),
+)
+PROVIDER_SLOTS = Gauge(
+    "provider_slots_in_use",
+    "Provider concurrency slots currently held.",
+)
+PROVIDER_QUEUE_DEPTH = Gauge(
+    "provider_queue_depth",
+    "Requests waiting for a provider concurrency slot, by priority class.",
+    ("priority",),
+)
+SCHEDULER_WAIT = Histogram(
+    "provider_queue_wait_seconds",
+    "Time spent waiting for a provider slot, by priority class.",
+    ("priority",),
+)
+CIRCUIT_STATE = Gauge(
+    "llm_circuit_state",
+    "Provider circuit breaker state (0 closed, 1 open, 2 half-open).",
+    ("provider",),
+)
+PROVIDER_RETRIES = Counter(
+    "llm_provider_retries",
+    "Upstream calls retried after a transient error, by exception type.",
+    ("provider", "error_type"),
+)
+HEDGED_REQUESTS = Counter(
+    "llm_hedged_requests",
+    "Second streaming requests issued because the first token was slow, by winner.",
+    ("provider", "winner"),
+)
+PARTIAL_RESULTS = Counter(
+    "review_partial_results",
+    "Stream reviews salvaged from truncated or malformed output, by reason.",
+    ("reason",),
+)
+MODEL_ROUTES = Counter(
+    "llm_model_routes",
+    "Reviews routed to each model, by route.",
+    ("route", "model"),
+)
+MODEL_FALLBACKS = Counter(
+    "llm_model_fallbacks",
+    "Requests moved to a fallback model after the routed one failed.",
+    ("model", "fallback"),
+)
+COMPACTION_SAVED_TOKENS = Counter(
+    "prompt_compaction_saved_tokens",
+    "Prompt tokens removed by code compaction before reaching the provider.",
+)
+PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens",
+    "Prompt tokens reported by the provider, by model.",
+    ("model",),
+)
+CACHED_PROMPT_TOKENS = Counter(
+    "llm_cached_prompt_tokens",
+    "Prompt tokens served from the provider's prefix cache, by model.",
+    ("model",),
+)
+REVIEW_CACHE_LOOKUPS = Counter(
+    "review_cache_lookups",
+    "Review cache lookups, by outcome (exact_hit, fuzzy_hit, stale, miss).",
+    ("outcome",),
+)
+REVIEW_CACHE_ENTRIES = Gauge(
+    "review_cache_entries",
+    "Entries held in the review result cache, both tiers.",
+)
+CANCELLED_SAVED_TOKENS = Counter(
+    "review_cancel_saved_tokens",
+    "Estimated completion tokens not generated because a stream was cancelled "
+    "(output reserve minus tokens already received), by reason.",
+    ("reason",),
+)
+DB_WRITE_BATCH_SIZE = Histogram(
+    "db_write_batch_size",
+    "Assistant messages committed per write-behind transaction.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+DB_WRITE_RETRIES = Counter(
+    "db_write_retries",
+    "Write-behind commits retried after SQLite lock contention.",
+)
+STARTUP_SECONDS = Gauge(
+    "startup_seconds",
+    "Worker startup timings: imports, each warm-up step, and time to ready.",
+    ("phase",),
+)
+RETENTION_PURGED = Counter(
+    "review_sessions_purged",
+    "Review sessions removed by bulk delete or retention, by reason.",
+    ("reason",),
+)
+FOLLOWUP_HISTORY_TURNS = Counter(
+    "followup_history_turns",
+    "Earlier follow-up turns sent with a new question, verbatim or summarized.",
+    ("kind",),
+)
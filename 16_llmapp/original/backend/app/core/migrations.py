@@ -0,0 +1,248 @@
+"""Helpers for Alembic revisions that must not block the running service.
+
+Rebuilding a table (``batch_alter_table(..., recreate="always")``) or
+backfilling it with one ``UPDATE`` holds the SQLite write lock for the whole
+statement, which on a large database means minutes of failed writes. Revisions
+that touch big tables should instead follow expand/contract:
+
+1. **Expand** (one revision): ``add_column`` the new nullable or defaulted
+   column, which is a metadata-only ``ALTER TABLE ADD COLUMN``, and
+   ``sync_column`` to install triggers that fill it for rows the old code
+   keeps writing. Then ``backfill`` existing rows in small committed chunks.
+2. Deploy code that reads and writes the new column.
+3. **Contract** (a later revision): ``drop_sync`` the triggers and
+   ``drop_column`` the old column with SQLite's native ``DROP COLUMN``.
+
+Every helper is safe to re-run. A revision interrupted half way (killed,
+deploy rolled back) is not stamped, so ``alembic upgrade`` runs it again from
+the top; ``backfill`` records its position in ``alembic_backfill`` and resumes
+from the last committed chunk.
+"""
+
+import logging
+import time
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# Under the "alembic" logger so progress shows at the level alembic.ini sets.
+logger = logging.getLogger("alembic.backfill")
+
+PROGRESS_TABLE = "alembic_backfill"
+
+_MIN_CHUNK = 100
+
+
+def _columns(table: str) -> set[str] | None:
+    """Current column names, or None in offline mode where nothing is known."""
+    if op.get_context().as_sql:
+        return None
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def add_column(table: str, column: sa.Column) -> None:
+    """Expand: add ``column`` unless present. Never rebuilds the table.
+
+    SQLite only allows ``ADD COLUMN`` for nullable columns or ones with a
+    constant server default; enforce NOT NULL in the model until contract.
+    """
+    columns = _columns(table)
+    if columns is None or column.name not in columns:
+        op.add_column(table, column)
+
+
+def drop_column(table: str, column: str) -> None:
+    """Contract: drop ``column`` in place (SQLite 3.35+) if it still exists.
+
+    Indexes and triggers that mention the column must be dropped first.
+    """
+    columns = _columns(table)
+    if columns is None or column in columns:
+        op.drop_column(table, column)
+
+
+def _trigger_names(table: str, column: str) -> tuple[str, str]:
+    return f"{table}_{column}_sync_insert", f"{table}_{column}_sync_update"
+
+
+def sync_column(
+    table: str,
+    column: str,
+    expression: str,
+    sources: list[str],
+    key: str = "id",
+) -> None:
+    """Keep ``column`` equal to ``expression`` while old code is still writing.
+
+    ``expression`` is SQL over the row's own columns, the same as the
+    ``backfill`` SET clause uses. It is applied after every insert and after
+    updates of ``sources``.
+    """
+    on_insert, on_update = _trigger_names(table, column)
+    body = (
+        f"BEGIN UPDATE {table} SET {column} = {expression} WHERE {key} = NEW.{key}; END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {on_insert} AFTER INSERT ON {table} {body}"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {on_update} "
+        f"AFTER UPDATE OF {', '.join(sources)} ON {table} {body}"
+    )
+
+
+def drop_sync(table: str, column: str) -> None:
+    for name in _trigger_names(table, column):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _ensure_progress_table(conn: sa.Connection) -> None:
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+        "name VARCHAR(100) PRIMARY KEY, last_key INTEGER NOT NULL, "
+        "row_count INTEGER NOT NULL DEFAULT 0, finished_at VARCHAR(40))"
+    )
+
+
+def reset_backfill(name: str) -> None:
+    """Forget a backfill's progress; call from ``downgrade``."""
+    if op.get_context().as_sql:
+        return
+    conn = op.get_bind()
+    _ensure_progress_table(conn)
+    conn.execute(
+        sa.text(f"DELETE FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+    )
+
+
+def backfill(
+    name: str,
+    table: str,
+    assignments: str,
+    where: str | None = None,
+    key: str = "id",
+    chunk_size: int = 5_000,
+    pause: float = 0.05,
+    target_seconds: float = 0.25,
+    report_every: float = 5.0,
+) -> int:
+    """Run ``UPDATE table SET assignments [WHERE where]`` in resumable chunks.
+
+    Rows are walked in ``key`` order, ``chunk_size`` at a time, and each chunk
+    commits together with its checkpoint in one short ``BEGIN IMMEDIATE``
+    transaction. The loop sleeps ``pause`` between chunks so app writers get
+    the lock, and halves or grows the chunk to keep each one near
+    ``target_seconds``. Progress is logged every ``report_every`` seconds.
+    Returns the number of rows updated by this run.
+
+    Runs inside an autocommit block, so whatever the revision did before the
+    call is committed first. In offline (``--sql``) mode a single UPDATE is
+    emitted instead.
+    """
+    filter_sql = f" AND ({where})" if where else ""
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET {assignments} WHERE 1=1{filter_sql}")
+        return 0
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        _ensure_progress_table(conn)
+        state = conn.execute(
+            sa.text(
+                f"SELECT last_key, row_count, finished_at FROM {PROGRESS_TABLE} "
+                "WHERE name = :name"
+            ),
+            {"name": name},
+        ).first()
+        if state is not None and state.finished_at is not None:
+            logger.info("backfill %s: already finished", name)
+            return 0
+        bounds = sa.text(f"SELECT min({key}), max({key}) FROM {table}")
+        first, final = conn.execute(bounds).one()
+        if first is None:
+            first = final = 0
+        last_key = state.last_key if state is not None else first - 1
+        done = state.row_count if state is not None else 0
+
+        next_bound = sa.text(
+            f"SELECT {key} FROM {table} WHERE {key} > :lo "
+            f"ORDER BY {key} LIMIT 1 OFFSET :offset"
+        )
+        update = sa.text(
+            f"UPDATE {table} SET {assignments} "
+            f"WHERE {key} > :lo AND {key} <= :hi{filter_sql}"
+        )
+        checkpoint = sa.text(
+            f"INSERT INTO {PROGRESS_TABLE} (name, last_key, row_count, finished_at) "
+            "VALUES (:name, :last_key, :row_count, :finished_at) "
+            "ON CONFLICT(name) DO UPDATE SET last_key = excluded.last_key, "
+            "row_count = excluded.row_count, finished_at = excluded.finished_at"
+        )
+
+        size = chunk_size
+        started = last_report = time.monotonic()
+        updated = 0
+        while True:
+            hi = conn.execute(next_bound, {"lo": last_key, "offset": size - 1}).scalar()
+            finished = hi is None
+            if finished:
+                # Rows inserted since the start are covered too (and by any
+                # sync triggers from then on).
+                hi = conn.execute(bounds).one()[1] or last_key
+            chunk_started = time.monotonic()
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                count = 0
+                if hi > last_key:
+                    count = conn.execute(update, {"lo": last_key, "hi": hi}).rowcount
+                done += count
+                updated += count
+                conn.execute(
+                    checkpoint,
+                    {
+                        "name": name,
+                        "last_key": max(hi, last_key),
+                        "row_count": done,
+                        "finished_at": (
+                            datetime.now(UTC).isoformat() if finished else None
+                        ),
+                    },
+                )
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+            last_key = max(hi, last_key)
+            if finished:
+                break
+
+            elapsed = time.monotonic() - chunk_started
+            if elapsed > target_seconds:
+                size = max(_MIN_CHUNK, size // 2)
+            elif elapsed < target_seconds / 2:
+                size = min(chunk_size * 4, size + size // 2)
+            now = time.monotonic()
+            if now - last_report >= report_every:
+                last_report = now
+                span = max(final - first, 1)
+                logger.info(
+                    "backfill %s: %d rows, key %d/%d (%.1f%%), %.0f rows/s, chunk %d",
+                    name,
+                    done,
+                    last_key,
+                    final,
+                    100 * (last_key - first) / span,
+                    updated / (now - started),
+                    size,
+                )
+            time.sleep(pause)
+
+        logger.info(
+            "backfill %s: finished, %d rows in %.1fs",
+            name,
+            done,
+            time.monotonic() - started,
+        )
+        return updated
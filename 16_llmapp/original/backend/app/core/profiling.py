@@ -0,0 +1,116 @@
+"""On-demand sampling profiler for the event loop thread.
+
+A daemon thread wakes every ``interval`` seconds while at least one profile is
+active, reads the loop thread's current stack with ``sys._current_frames`` and
+adds it to every active collector. Nothing is sampled otherwise. Output is in
+the collapsed-stack format (``root;caller;leaf count``) that flamegraph.pl and
+speedscope read.
+
+Samples cover the whole worker thread, so a per-request profile also contains
+whatever other requests ran on the loop while it was in flight.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import get_settings
+
+_MAX_STORED_PROFILES = 50
+_MAX_DEPTH = 128
+
+
+@dataclass
+class Collector:
+    thread_id: int
+    stacks: Counter[str] = field(default_factory=Counter)
+    samples: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def collapsed(self) -> str:
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def _frame_name(code) -> str:
+    path = code.co_filename.replace(os.sep, "/")
+    short = "/".join(path.rsplit("/", 2)[-2:])
+    return f"{code.co_qualname} ({short}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    names: list[str] = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._recent: OrderedDict[str, str] = OrderedDict()
+
+    def start(self) -> Collector:
+        """Begin collecting samples of the calling thread."""
+        collector = Collector(threading.get_ident())
+        with self._lock:
+            self._collectors.append(collector)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+        return collector
+
+    def stop(self, collector: Collector) -> str:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+        return collector.collapsed()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._collectors:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                stacks: dict[int, str] = {}
+                for collector in self._collectors:
+                    frame = frames.get(collector.thread_id)
+                    if frame is None:
+                        continue
+                    if collector.thread_id not in stacks:
+                        stacks[collector.thread_id] = _collapse(frame)
+                    collector.stacks[stacks[collector.thread_id]] += 1
+                    collector.samples += 1
+                del frames
+
+    def store(self, request_id: str, collapsed: str) -> None:
+        """Keep a request's profile for later retrieval by request ID."""
+        with self._lock:
+            self._recent[request_id] = collapsed
+            while len(self._recent) > _MAX_STORED_PROFILES:
+                self._recent.popitem(last=False)
+
+    def stored(self, request_id: str) -> str | None:
+        with self._lock:
+            return self._recent.get(request_id)
+
+
+_profiler: SamplingProfiler | None = None
+
+
+def get_profiler() -> SamplingProfiler:
+    global _profiler  # noqa: PLW0603
+    if _profiler is None:
+        _profiler = SamplingProfiler(get_settings().profiling_interval_ms / 1000)
+    return _profiler
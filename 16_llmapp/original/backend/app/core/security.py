@@ -1,15 +1,16 @@
 from datetime import UTC, datetime, timedelta
 
+import bcrypt
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-import bcrypt
-from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
-from app.core.exceptions import AuthenticationError
+from app.core.exceptions import AuthenticationError, ForbiddenError
+from app.core.metrics import BCRYPT_DURATION
+from app.core.tracing import trace_span
 from app.models.user import User
 
 bearer_scheme = HTTPBearer()
@@ -17,15 +18,23 @@ bearer_scheme = HTTPBearer()
 
 def hash_password(password: str) -> str:
     pw = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(pw, bcrypt.gensalt()).decode("utf-8")
+    with BCRYPT_DURATION.labels("hash").time():
+        return bcrypt.hashpw(pw, bcrypt.gensalt()).decode("utf-8")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     pw = plain.encode("utf-8")[:72]
-    return bcrypt.checkpw(pw, hashed.encode("utf-8"))
+    with BCRYPT_DURATION.labels("verify").time():
+        return bcrypt.checkpw(pw, hashed.encode("utf-8"))
+
+
+# python-jose is imported on first use (pre-warmed at startup) to keep it off
+# the import path.
 
 
 def create_access_token(user_id: int) -> str:
+    from jose import jwt
+
     settings = get_settings()
     expire = datetime.now(UTC) + timedelta(minutes=settings.jwt_expire_minutes)
     payload = {"sub": str(user_id), "exp": expire}
@@ -35,6 +44,8 @@ def create_access_token(user_id: int) -> str:
 
 
 def decode_access_token(token: str) -> int:
+    from jose import JWTError, jwt
+
     settings = get_settings()
     try:
         payload = jwt.decode(
@@ -50,9 +61,36 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    user_id = decode_access_token(credentials.credentials)
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise AuthenticationError("User not found")
+    with trace_span("auth.get_current_user") as span:
+        user_id = decode_access_token(credentials.credentials)
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise AuthenticationError("User not found")
+        if span is not None:
+            span.set("user_id", user_id)
+        return user
+
+
+def is_admin(user: User) -> bool:
+    admins = get_settings().admin_emails.split(",")
+    return user.email.lower() in {a.strip().lower() for a in admins if a.strip()}
+
+
+async def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    if not is_admin(user):
+        raise ForbiddenError("Admin access required")
     return user
+
+
+async def is_admin_token(authorization: str | None, db: AsyncSession) -> bool:
+    """Whether an ``Authorization: Bearer`` header belongs to an admin user."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = decode_access_token(token)
+    except AuthenticationError:
+        return False
+    user = await db.get(User, user_id)
+    return user is not None and is_admin(user)
@@ -0,0 +1,274 @@
+"""Lightweight request tracing with head sampling and batched export.
+
+Spans are recorded only for sampled traces; everything else short-circuits on a
+single contextvar lookup. Finished spans are buffered and flushed periodically
+to a JSON-lines file or an OTLP/HTTP collector.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SERVICE_NAME = "code-reviewer"
+_FLUSH_INTERVAL_SECONDS = 5.0
+_MAX_BUFFERED_SPANS = 10_000
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: BaseException | None = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _exporter.add(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": ((self.end_ns or self.start_ns) - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# None: no trace in progress. _UNSAMPLED: a trace exists but was sampled out.
+_UNSAMPLED = Span(trace_id="", span_id="", parent_id=None, name="")
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def tracing_enabled() -> bool:
+    return get_settings().trace_exporter != "none"
+
+
+def current_span() -> Span | None:
+    span = _current.get()
+    return None if span is _UNSAMPLED else span
+
+
+def start_span(
+    name: str, *, parent: Span | None = None, **attributes: Any
+) -> Span | None:
+    """Start a child of ``parent`` (default: the current span) without activating it.
+
+    Use this for spans that live across ``yield`` points in async generators,
+    where resetting a contextvar would be unsafe. Call ``span.end()`` yourself.
+    """
+    if parent is None:
+        parent = _current.get()
+    if parent is None or parent is _UNSAMPLED:
+        return None
+    return Span(
+        trace_id=parent.trace_id,
+        span_id=_new_span_id(),
+        parent_id=parent.span_id,
+        name=name,
+        attributes=attributes,
+    )
+
+
+@contextlib.contextmanager
+def trace_span(
+    name: str, *, parent: Span | None = None, **attributes: Any
+) -> Iterator[Span | None]:
+    """Record a child span for the duration of the block and make it current."""
+    span = start_span(name, parent=parent, **attributes)
+    if span is None:
+        yield None
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.end(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+@contextlib.contextmanager
+def trace_root(name: str, trace_id: str, **attributes: Any) -> Iterator[Span | None]:
+    """Open the root span of a trace, applying the head sampling decision."""
+    settings = get_settings()
+    if settings.trace_exporter == "none":
+        yield None
+        return
+    if random.random() >= settings.trace_sample_rate:
+        token = _current.set(_UNSAMPLED)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+
+    span = Span(
+        trace_id=trace_id,
+        span_id=_new_span_id(),
+        parent_id=None,
+        name=name,
+        attributes=attributes,
+    )
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.end(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans: list[Span]) -> dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _otlp_value(_SERVICE_NAME)}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "app.core.tracing"},
+                        "spans": [
+                            {
+                                "traceId": s.trace_id,
+                                "spanId": s.span_id,
+                                "parentSpanId": s.parent_id or "",
+                                "name": s.name,
+                                "kind": 2 if s.parent_id is None else 1,
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": [
+                                    {"key": k, "value": _otlp_value(v)}
+                                    for k, v in s.attributes.items()
+                                ],
+                                "status": (
+                                    {"code": 2, "message": s.error}
+                                    if s.error
+                                    else {"code": 1}
+                                ),
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class _BatchExporter:
+    def __init__(self):
+        self._buffer: list[Span] = []
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def add(self, span: Span) -> None:
+        if len(self._buffer) < _MAX_BUFFERED_SPANS:
+            self._buffer.append(span)
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        settings = get_settings()
+        try:
+            if settings.trace_exporter == "jsonl":
+                lines = "".join(
+                    json.dumps(s.to_dict(), default=str) + "\n" for s in spans
+                )
+                await asyncio.to_thread(_append_file, settings.trace_file, lines)
+            elif settings.trace_exporter == "otlp":
+                if self._client is None:
+                    self._client = httpx.AsyncClient(timeout=5.0)
+                response = await self._client.post(
+                    settings.trace_otlp_endpoint, json=_otlp_payload(spans)
+                )
+                response.raise_for_status()
+        except Exception:
+            logger.warning("Dropped %d spans: export failed", len(spans), exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None and tracing_enabled():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _append_file(path: str, data: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(data)
+
+
+_exporter = _BatchExporter()
+
+
+def start_tracing() -> None:
+    _exporter.start()
+
+
+async def stop_tracing() -> None:
+    await _exporter.stop()
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import logging
 import time
 import uuid
@@ -6,10 +8,23 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.admin import router as admin_router
+from app.api.analytics import router as analytics_router
 from app.api.auth import router as auth_router
+from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.reviews import router as reviews_router
+from app.api.usage import router as usage_router
 from app.core.config import get_settings
+from app.core.database import async_session
 from app.core.exceptions import AppError, app_exception_handler
+from app.core.metrics import HTTP_REQUEST_DURATION
+from app.core.profiling import Collector, get_profiler
+from app.core.security import is_admin_token
+from app.core.tracing import start_tracing, stop_tracing, trace_root
+from app.services.persistence import get_message_writer
+from app.services.retention import run_retention
+from app.services.warmup import get_readiness, warm_up
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +33,18 @@ logger = logging.getLogger(__name__)
 async def lifespan(_app: FastAPI):
     logging.basicConfig(level=logging.INFO)
     logger.info("Starting Code Reviewer API")
+    start_tracing()
+    # Warm in the background so the port binds now; /api/health/ready gates traffic.
+    tasks = [asyncio.create_task(warm_up(get_readiness()))]
+    if settings.retention_enabled:
+        tasks.append(asyncio.create_task(run_retention()))
     yield
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await get_message_writer().close()
+    await stop_tracing()
     logger.info("Shutting down Code Reviewer API")
 
 
@@ -36,15 +62,63 @@ app.add_exception_handler(AppError, app_exception_handler)
 
 app.include_router(auth_router)
 app.include_router(reviews_router)
+app.include_router(analytics_router)
+app.include_router(usage_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(health_router)
+
+
+async def _start_request_profile(request: Request) -> Collector | None:
+    """Profile requests sent with ``X-Profile: 1`` by an admin."""
+    if not settings.profiling_enabled or request.headers.get("x-profile") != "1":
+        return None
+    async with async_session() as db:
+        if not await is_admin_token(request.headers.get("authorization"), db):
+            return None
+    return get_profiler().start()
+
+
+async def _profiled_body(body, collector: Collector, request_id: str):
+    """Keep sampling until a streamed body is fully sent, then store the profile."""
+    profiler = get_profiler()
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        profiler.store(request_id, profiler.stop(collector))
 
 
 @app.middleware("http")
 async def request_id_and_logging(request: Request, call_next):
-    request_id = str(uuid.uuid4())[:8]
+    trace_id = uuid.uuid4().hex
+    request_id = trace_id[:8]
     request.state.request_id = request_id
     start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
+    collector = await _start_request_profile(request)
+    with trace_root(
+        f"{request.method} {request.url.path}",
+        trace_id,
+        request_id=request_id,
+        method=request.method,
+        path=request.url.path,
+    ) as span:
+        try:
+            response = await call_next(request)
+        except BaseException:
+            if collector is not None:
+                get_profiler().stop(collector)
+            raise
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "<unmatched>"
+        if span is not None:
+            span.name = f"{request.method} {route_path}"
+            span.set("status_code", response.status_code)
+    elapsed = time.perf_counter() - start
+    elapsed_ms = elapsed * 1000
+    HTTP_REQUEST_DURATION.labels(
+        request.method, route_path, str(response.status_code)
+    ).observe(elapsed)
     logger.info(
         "[%s] %s %s → %d (%.0fms)",
         request_id,
@@ -54,4 +128,12 @@ async def request_id_and_logging(request: Request, call_next):
         elapsed_ms,
     )
     response.headers["X-Request-ID"] = request_id
+    if collector is not None:
+        response.headers["X-Profile-ID"] = request_id
+        response.body_iterator = _profiled_body(
+            response.body_iterator, collector, request_id
+        )
     return response
+
+
+get_readiness().imports_done()
@@ -1,5 +1,14 @@
+from app.models.analytics import ReviewRollup
 from app.models.base import Base
+from app.models.idempotency import IdempotencyKey
 from app.models.review import ReviewMessage, ReviewSession
 from app.models.user import User
 
-__all__ = ["Base", "ReviewMessage", "ReviewSession", "User"]
+__all__ = [
+    "Base",
+    "IdempotencyKey",
+    "ReviewMessage",
+    "ReviewRollup",
+    "ReviewSession",
+    "User",
+]
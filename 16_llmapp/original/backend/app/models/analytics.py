@@ -0,0 +1,25 @@
+from datetime import date
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+GLOBAL_SCOPE = 0
+
+
+class ReviewRollup(Base):
+    """Per-day, per-language review counters for one user (or GLOBAL_SCOPE)."""
+
+    __tablename__ = "review_rollups"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    language: Mapped[str] = mapped_column(String(50), primary_key=True)
+    reviews: Mapped[int] = mapped_column(default=0)
+    results: Mapped[int] = mapped_column(default=0)
+    errors: Mapped[int] = mapped_column(default=0)
+    info_count: Mapped[int] = mapped_column(default=0)
+    warning_count: Mapped[int] = mapped_column(default=0)
+    error_count: Mapped[int] = mapped_column(default=0)
+    lines: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,32 @@
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import JSON as SA_JSON
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """A client's Idempotency-Key and the outcome of the request that first used it."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    endpoint: Mapped[str] = mapped_column(String(20))
+    request_hash: Mapped[str] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(20), default="in_progress")
+    session_id: Mapped[int | None] = mapped_column(
+        ForeignKey("review_sessions.id", ondelete="SET NULL"), nullable=True
+    )
+    response_json: Mapped[dict[str, Any] | None] = mapped_column(SA_JSON, nullable=True)
+    # Lease of an in_progress row, renewed while its request runs; once it
+    # lapses (the worker died) a retry may claim the key.
+    locked_until: Mapped[datetime | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(UTC), index=True
+    )
@@ -2,33 +2,70 @@ from datetime import UTC, datetime
 from typing import Any
 
 from sqlalchemy import JSON as SA_JSON
-from sqlalchemy import ForeignKey, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.models.base import Base
 
+SEVERITY_ORDER = ("info", "warning", "error")
+
+
+def derive_message_columns(content: dict[str, Any]) -> dict[str, Any]:
+    """Compute the denormalized filter columns for a message payload."""
+    msg_type = content.get("type")
+    if msg_type is None:
+        msg_type = "result" if "summary" in content else "assistant_text"
+
+    counts = dict.fromkeys(SEVERITY_ORDER, 0)
+    if msg_type == "result":
+        for issue in content.get("issues") or []:
+            severity = (
+                issue.get("severity", "info") if isinstance(issue, dict) else None
+            )
+            if severity in counts:
+                counts[severity] += 1
+
+    max_severity = next((s for s in reversed(SEVERITY_ORDER) if counts[s]), None)
+    return {
+        "message_type": msg_type,
+        "info_count": counts["info"],
+        "warning_count": counts["warning"],
+        "error_count": counts["error"],
+        "max_severity": max_severity,
+        "is_error": msg_type == "error",
+    }
+
 
 class ReviewSession(Base):
     __tablename__ = "review_sessions"
+    __table_args__ = (
+        Index("ix_review_sessions_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), index=True
     )
     code: Mapped[str] = mapped_column(Text)
-    language: Mapped[str] = mapped_column(String(50))
-    provider: Mapped[str] = mapped_column(String(20))
+    language: Mapped[str] = mapped_column(String(50), index=True)
+    provider: Mapped[str] = mapped_column(String(20), index=True)
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
     settings_json: Mapped[dict[str, Any] | None] = mapped_column(SA_JSON, nullable=True)
     execution_json: Mapped[dict[str, Any] | None] = mapped_column(
         SA_JSON, nullable=True
     )
     created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(UTC))
+    prompt_tokens: Mapped[int] = mapped_column(default=0)
+    completion_tokens: Mapped[int] = mapped_column(default=0)
+    cached_tokens: Mapped[int] = mapped_column(default=0)
+    usage_estimated: Mapped[bool] = mapped_column(default=False)
 
     user: Mapped["User"] = relationship(back_populates="review_sessions")  # noqa: F821
     messages: Mapped[list["ReviewMessage"]] = relationship(
         back_populates="session",
         order_by="ReviewMessage.id",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -43,4 +80,20 @@ class ReviewMessage(Base):
     content_json: Mapped[dict[str, Any]] = mapped_column(SA_JSON)
     created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(UTC))
 
+    # Denormalized from content_json on write so history can be filtered in SQL.
+    message_type: Mapped[str] = mapped_column(String(30), index=True)
+    info_count: Mapped[int] = mapped_column(default=0)
+    warning_count: Mapped[int] = mapped_column(default=0)
+    error_count: Mapped[int] = mapped_column(default=0)
+    max_severity: Mapped[str | None] = mapped_column(
+        String(10), nullable=True, index=True
+    )
+    is_error: Mapped[bool] = mapped_column(default=False, index=True)
+
     session: Mapped["ReviewSession"] = relationship(back_populates="messages")
+
+    @validates("content_json")
+    def _sync_derived_columns(self, _key: str, value: dict[str, Any]):
+        for column, derived in derive_message_columns(value).items():
+            setattr(self, column, derived)
+        return value
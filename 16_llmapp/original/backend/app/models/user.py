@@ -13,7 +13,9 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     password_hash: Mapped[str] = mapped_column(String(255))
     created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(UTC))
+    # Bumped on every change to the user's review history; drives list ETags.
+    history_version: Mapped[int] = mapped_column(default=0, server_default="0")
 
     review_sessions: Mapped[list["ReviewSession"]] = relationship(  # noqa: F821
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -0,0 +1,38 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+AnalyticsScope = Literal["user", "global"]
+
+
+class DailyStats(BaseModel):
+    day: date
+    reviews: int = 0
+    errors: int = 0
+
+
+class LanguageStats(BaseModel):
+    language: str
+    reviews: int = 0
+    info_count: int = 0
+    warning_count: int = 0
+    error_count: int = 0
+
+
+class AnalyticsTotals(BaseModel):
+    reviews: int = 0
+    results: int = 0
+    errors: int = 0
+    issues: int = 0
+    lines: int = 0
+    error_rate: float = 0.0
+    issues_per_kloc: float = 0.0
+
+
+class AnalyticsResponse(BaseModel):
+    scope: AnalyticsScope
+    days: int
+    daily: list[DailyStats] = Field(default_factory=list)
+    languages: list[LanguageStats] = Field(default_factory=list)
+    totals: AnalyticsTotals
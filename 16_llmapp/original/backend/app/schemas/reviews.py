@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 FocusArea = Literal["security", "performance", "readability", "maintainability"]
 
@@ -25,6 +25,32 @@ class ReviewResult(BaseModel):
     corrected_code: str | None = None
 
 
+class TokenUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    estimated: bool = False
+    model: str | None = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class PromptEstimate(BaseModel):
+    """Preflight token budget for a review, computed before any upstream call."""
+
+    prompt_tokens: int
+    output_reserve: int
+    context_window: int | None = None
+    estimated: bool = False
+    compaction_saved_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_reserve
+
+
 class ExecutionResult(BaseModel):
     stdout: str = ""
     stderr: str = ""
@@ -71,8 +97,11 @@ class ReviewSessionResponse(BaseModel):
     code: str
     language: str
     provider: str
+    model: str | None = None
     settings_json: dict[str, Any] | None = None
     execution_json: dict[str, Any] | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -82,6 +111,54 @@ class ReviewSessionDetailResponse(ReviewSessionResponse):
     messages: list[ReviewMessageResponse] = Field(default_factory=list)
 
 
+class CacheMarker(BaseModel):
+    """How a review served from the result cache was matched, and its age."""
+
+    kind: Literal["exact", "fuzzy"]
+    age_seconds: int
+
+
 class ReviewCreateResponse(BaseModel):
     session_id: int
     result: ReviewResult
+    usage: TokenUsage | None = None
+    estimate: PromptEstimate | None = None
+    cached: CacheMarker | None = None
+    # Set when the result is incomplete, e.g. "fanout_degraded" when some
+    # focus-area branches failed.
+    partial_reason: str | None = None
+
+
+class FollowUpRequest(BaseModel):
+    question: str = Field(min_length=1, max_length=4_000)
+
+
+class BulkDeleteRequest(BaseModel):
+    """Sessions to delete: listed ``ids``, a ``created_at`` range, or ``all``."""
+
+    ids: list[int] | None = Field(default=None, max_length=10_000)
+    after: datetime | None = None
+    before: datetime | None = None
+    all: bool = False
+
+    @field_validator("after", "before")
+    @classmethod
+    def to_utc(cls, v: datetime | None) -> datetime | None:
+        if v is not None and v.tzinfo is not None:
+            v = v.astimezone(UTC).replace(tzinfo=None)
+        return v
+
+    @model_validator(mode="after")
+    def one_selector(self) -> "BulkDeleteRequest":
+        selectors = [
+            self.ids is not None,
+            self.after is not None or self.before is not None,
+            self.all,
+        ]
+        if sum(selectors) != 1:
+            raise ValueError("Give exactly one of ids, a date range, or all")
+        return self
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
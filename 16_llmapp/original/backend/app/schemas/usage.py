@@ -0,0 +1,19 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class UsageSummaryResponse(BaseModel):
+    window_hours: int
+    quota: int | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    used: int = 0
+    remaining: int | None = None
+
+
+class DailyUsage(BaseModel):
+    day: date
+    reviews: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
@@ -0,0 +1,219 @@
+"""Admission control in front of the LLM provider.
+
+Each user gets two token buckets (requests and estimated prompt tokens), and all
+users share a concurrency limit with a bounded wait queue ordered by the
+priority scheduler. Anything over the limits is rejected immediately with a
+Retry-After hint instead of queueing behind upstream rate limits. State is per
+process.
+"""
+
+import asyncio
+import time
+
+from app.core.config import get_settings
+from app.core.exceptions import TooManyRequestsError
+from app.core.metrics import ADMISSION_REJECTIONS, PROVIDER_SLOTS
+from app.services.scheduler import Priority, PriorityScheduler
+
+_MAX_TRACKED_USERS = 10_000
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if available now)."""
+        self._refill(time.monotonic())
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+    @property
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class Permit:
+    """A held provider slot. ``release`` is idempotent."""
+
+    def __init__(self, scheduler: PriorityScheduler, priority: Priority):
+        self._scheduler = scheduler
+        self.priority = priority
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._scheduler.release(self.priority)
+            PROVIDER_SLOTS.dec()
+
+    def __enter__(self) -> "Permit":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        requests_per_minute: float,
+        request_burst: int,
+        tokens_per_minute: float,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        aging_seconds: float,
+        bulk_max_share: float,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.request_burst = request_burst
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.scheduler = PriorityScheduler(
+            max_concurrency, aging_seconds, bulk_max_share
+        )
+        self._request_buckets: dict[int, TokenBucket] = {}
+        self._token_buckets: dict[int, TokenBucket] = {}
+
+    def _bucket(
+        self,
+        buckets: dict[int, TokenBucket],
+        user_id: int,
+        per_minute: float,
+        burst: float,
+    ) -> TokenBucket:
+        bucket = buckets.get(user_id)
+        if bucket is None:
+            if len(buckets) >= _MAX_TRACKED_USERS:
+                for uid in [uid for uid, b in buckets.items() if b.full]:
+                    del buckets[uid]
+            bucket = buckets[user_id] = TokenBucket(per_minute / 60.0, burst)
+        return bucket
+
+    def _check_rate(
+        self, user_id: int, prompt_tokens: int
+    ) -> list[tuple[TokenBucket, float]]:
+        """Charge the user's buckets; returns the charges for ``_refund``."""
+        checks = []
+        if self.requests_per_minute > 0:
+            bucket = self._bucket(
+                self._request_buckets,
+                user_id,
+                self.requests_per_minute,
+                self.request_burst,
+            )
+            checks.append(("requests", bucket, 1))
+        if self.tokens_per_minute > 0:
+            bucket = self._bucket(
+                self._token_buckets,
+                user_id,
+                self.tokens_per_minute,
+                self.tokens_per_minute,
+            )
+            checks.append(("tokens", bucket, prompt_tokens))
+
+        for reason, bucket, amount in checks:
+            wait = bucket.wait_time(amount)
+            if wait > 0:
+                ADMISSION_REJECTIONS.labels(reason).inc()
+                raise TooManyRequestsError(
+                    code="rate_limited",
+                    message=f"Rate limit exceeded ({reason})",
+                    retry_after=wait,
+                    details={"limit": reason},
+                )
+        for _reason, bucket, amount in checks:
+            bucket.take(amount)
+        return [(bucket, amount) for _reason, bucket, amount in checks]
+
+    def _check_queue(self) -> None:
+        scheduler = self.scheduler
+        if scheduler.saturated and scheduler.waiting >= self.max_queue:
+            ADMISSION_REJECTIONS.labels("queue_full").inc()
+            raise TooManyRequestsError(
+                code="overloaded",
+                message="Server is busy, please retry shortly",
+                retry_after=1.0,
+                details={"limit": "concurrency"},
+            )
+
+    async def acquire(
+        self, user_id: int, prompt_tokens: int, priority: Priority = "standard"
+    ) -> Permit:
+        """Charge the user's buckets and wait (bounded) for a provider slot.
+
+        A request turned away for lack of capacity is not charged: the queue is
+        checked before the buckets, and a queue timeout (or the client giving
+        up while queued) refunds them.
+        """
+        self._check_queue()
+        charges = self._check_rate(user_id, prompt_tokens)
+        try:
+            return await self.slot(user_id, priority, prompt_tokens / 1000)
+        except (TooManyRequestsError, asyncio.CancelledError):
+            for bucket, amount in charges:
+                bucket.refund(amount)
+            raise
+
+    async def slot(
+        self, user_id: int, priority: Priority = "standard", cost: float = 0.0
+    ) -> Permit:
+        """Wait (bounded) for one more provider slot without charging buckets.
+
+        For requests already admitted by ``acquire`` that issue several
+        provider calls, such as fan-out branches: each call holds its own slot.
+        """
+        self._check_queue()
+        scheduler = self.scheduler
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await scheduler.acquire(user_id, priority, cost)
+        except TimeoutError as e:
+            ADMISSION_REJECTIONS.labels("queue_timeout").inc()
+            raise TooManyRequestsError(
+                code="overloaded",
+                message="Server is busy, please retry shortly",
+                retry_after=self.queue_timeout,
+                details={"limit": "concurrency"},
+            ) from e
+
+        PROVIDER_SLOTS.inc()
+        return Permit(scheduler, priority)
+
+
+_admission_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _admission_controller  # noqa: PLW0603
+    if _admission_controller is None:
+        settings = get_settings()
+        _admission_controller = AdmissionController(
+            requests_per_minute=settings.rate_limit_requests_per_minute,
+            request_burst=settings.rate_limit_request_burst,
+            tokens_per_minute=settings.rate_limit_tokens_per_minute,
+            max_concurrency=settings.provider_max_concurrency,
+            max_queue=settings.provider_max_queue,
+            queue_timeout=settings.provider_queue_timeout_seconds,
+            aging_seconds=settings.scheduler_aging_seconds,
+            bulk_max_share=settings.scheduler_bulk_max_share,
+        )
+    return _admission_controller
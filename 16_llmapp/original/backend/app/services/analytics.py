@@ -0,0 +1,177 @@
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Subquery,
+    case,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import GLOBAL_SCOPE, ReviewRollup
+from app.models.review import ReviewMessage, ReviewSession
+
+_COUNTER_COLUMNS = (
+    "reviews",
+    "results",
+    "errors",
+    "info_count",
+    "warning_count",
+    "error_count",
+    "lines",
+)
+
+
+def _count_lines(code: str) -> int:
+    return len(code.splitlines())
+
+
+async def _bump(db: AsyncSession, session: ReviewSession, **deltas: int) -> None:
+    """Add deltas to the user's and the global rollup row for the session's day."""
+    day = session.created_at.date()
+    for scope in (session.user_id, GLOBAL_SCOPE):
+        stmt = sqlite_insert(ReviewRollup).values(
+            user_id=scope, day=day, language=session.language, **deltas
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "day", "language"],
+            set_={k: getattr(ReviewRollup, k) + stmt.excluded[k] for k in deltas},
+        )
+        await db.execute(stmt)
+
+
+async def record_session(db: AsyncSession, session: ReviewSession) -> None:
+    await _bump(db, session, reviews=1)
+
+
+async def record_message(
+    db: AsyncSession, session: ReviewSession, message: ReviewMessage
+) -> None:
+    """Fold an assistant message into the rollups. Other message types are ignored."""
+    if message.message_type == "error":
+        await _bump(db, session, errors=1)
+    elif message.message_type == "result":
+        await _bump(
+            db,
+            session,
+            results=1,
+            info_count=message.info_count,
+            warning_count=message.warning_count,
+            error_count=message.error_count,
+            lines=_count_lines(session.code),
+        )
+
+
+def _per_session(where: ColumnElement[bool] | None = None) -> Subquery:
+    """Each session's contribution to its rollup rows, one row per session."""
+    day = func.date(ReviewSession.created_at)
+    # Same as ``_count_lines`` for \n and \r\n endings: a trailing newline
+    # does not start another line, and empty code has none.
+    code = ReviewSession.code
+    lines = (
+        func.length(code)
+        - func.length(func.replace(code, "\n", ""))
+        + case((or_(code == "", func.substr(code, -1) == "\n"), 0), else_=1)
+    )
+    is_result = ReviewMessage.message_type == "result"
+
+    query = (
+        select(
+            ReviewSession.id.label("session_id"),
+            ReviewSession.user_id.label("user_id"),
+            day.label("day"),
+            ReviewSession.language.label("language"),
+            func.count(case((is_result, 1))).label("results"),
+            func.count(case((ReviewMessage.message_type == "error", 1))).label(
+                "errors"
+            ),
+            func.coalesce(func.sum(ReviewMessage.info_count), 0).label("info_count"),
+            func.coalesce(func.sum(ReviewMessage.warning_count), 0).label(
+                "warning_count"
+            ),
+            func.coalesce(func.sum(ReviewMessage.error_count), 0).label("error_count"),
+            (func.count(case((is_result, 1))) * lines).label("lines"),
+        )
+        .outerjoin(ReviewMessage, ReviewMessage.session_id == ReviewSession.id)
+        .group_by(ReviewSession.id)
+    )
+    if where is not None:
+        query = query.where(where)
+    return query.subquery()
+
+
+def _by_scope(per_session: Subquery) -> list[Select]:
+    """Sum ``per_session`` into rollup rows, per user and then globally."""
+    queries = []
+    for scope in (per_session.c.user_id, None):
+        keys = [per_session.c.day, per_session.c.language]
+        if scope is not None:
+            keys.insert(0, scope)
+        queries.append(
+            select(
+                scope if scope is not None else literal(GLOBAL_SCOPE),
+                per_session.c.day,
+                per_session.c.language,
+                func.count(),
+                *(func.sum(per_session.c[k]) for k in _COUNTER_COLUMNS[1:]),
+            ).group_by(*keys)
+        )
+    return queries
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Recompute every rollup row from review history. Returns rows written."""
+    await db.execute(delete(ReviewRollup))
+    written = 0
+    for aggregated in _by_scope(_per_session()):
+        result = await db.execute(
+            sqlite_insert(ReviewRollup).from_select(
+                ["user_id", "day", "language", *_COUNTER_COLUMNS], aggregated
+            )
+        )
+        written += result.rowcount
+    return written
+
+
+async def forget_sessions(db: AsyncSession, session_ids: Sequence[int]) -> None:
+    """Subtract sessions that are about to be deleted from the rollups.
+
+    Call in the deleting transaction, so rollups keep matching what
+    ``rebuild_rollups`` would compute from the remaining history.
+    """
+    for aggregated in _by_scope(_per_session(ReviewSession.id.in_(session_ids))):
+        for scope, day, language, *counts in (await db.execute(aggregated)).all():
+            await db.execute(
+                update(ReviewRollup)
+                .where(
+                    ReviewRollup.user_id == scope,
+                    ReviewRollup.day == date.fromisoformat(day),
+                    ReviewRollup.language == language,
+                )
+                .values(
+                    {
+                        k: getattr(ReviewRollup, k) - n
+                        for k, n in zip(_COUNTER_COLUMNS, counts, strict=True)
+                    }
+                )
+            )
+    await db.execute(delete(ReviewRollup).where(ReviewRollup.reviews <= 0))
+
+
+async def load_rollups(db: AsyncSession, user_id: int, days: int) -> list[ReviewRollup]:
+    """Rollup rows for one scope covering the last ``days`` days (UTC)."""
+    since: date = (datetime.now(UTC) - timedelta(days=days - 1)).date()
+    result = await db.execute(
+        select(ReviewRollup)
+        .where(ReviewRollup.user_id == user_id, ReviewRollup.day >= since)
+        .order_by(ReviewRollup.day)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,85 @@
+"""Preflight token budgeting for review prompts.
+
+The code is tokenized once per request: the prompt total is that count plus
+the review framing (system prompt, user prompt template, chat overhead), which
+is counted with empty code. An output reserve is added for the response mode.
+Requests that cannot fit any routed model, or that exceed the deployment's
+prompt cap, are rejected before queueing or calling upstream.
+"""
+
+import asyncio
+
+from app.core.config import get_settings
+from app.core.exceptions import PromptTooLargeError
+from app.core.metrics import COMPACTION_SAVED_TOKENS
+from app.schemas.reviews import PromptEstimate, ReviewSettings
+from app.services.prompts import CompactedCode, build_review_messages
+from app.services.tokens import count_message_tokens, count_tokens, has_tokenizer
+
+# Base output allowance by detail level; both modes also echo corrected code.
+_DETAIL_RESERVE = {"brief": 512, "normal": 1024, "deep": 2048}
+# NDJSON streams repeat every issue inside the final result line.
+_STREAM_FACTOR = 1.5
+# Code at least this long is tokenized off the event loop.
+_OFFLOAD_CHARS = 32_000
+
+
+def output_reserve(code_tokens: int, settings: ReviewSettings, stream: bool) -> int:
+    reserve = _DETAIL_RESERVE[settings.detail_level]
+    if stream:
+        reserve = int(reserve * _STREAM_FACTOR)
+    # corrected_code may repeat the whole file.
+    reserve += code_tokens
+    return min(reserve, get_settings().budget_max_output_tokens)
+
+
+def _estimate(
+    code: CompactedCode,
+    language: str,
+    settings: ReviewSettings,
+    model: str,
+    stream: bool,
+) -> PromptEstimate:
+    code_tokens = count_tokens(code.code, model)
+    framing = build_review_messages("", language, settings, stream)
+    saved = 0
+    if code.changed and code.code:
+        # Scaled by length rather than tokenizing the original a second time.
+        saved = round(code_tokens * len(code.original) / len(code.code)) - code_tokens
+        COMPACTION_SAVED_TOKENS.inc(max(saved, 0))
+    return PromptEstimate(
+        prompt_tokens=count_message_tokens(framing, model) + code_tokens,
+        output_reserve=output_reserve(code_tokens, settings, stream),
+        estimated=not has_tokenizer(model),
+        compaction_saved_tokens=saved,
+    )
+
+
+async def estimate_review(
+    code: CompactedCode,
+    language: str,
+    settings: ReviewSettings,
+    model: str,
+    stream: bool = False,
+) -> PromptEstimate:
+    if len(code.code) >= _OFFLOAD_CHARS:
+        return await asyncio.to_thread(
+            _estimate, code, language, settings, model, stream
+        )
+    return _estimate(code, language, settings, model, stream)
+
+
+def enforce_budget(estimate: PromptEstimate, context_window: int | None) -> None:
+    """Raise PromptTooLargeError if ``estimate`` cannot be served."""
+    estimate.context_window = context_window
+    max_prompt = get_settings().budget_max_prompt_tokens
+    if max_prompt and estimate.prompt_tokens > max_prompt:
+        raise PromptTooLargeError(
+            message="Code is too large to review",
+            details={**estimate.model_dump(), "max_prompt_tokens": max_prompt},
+        )
+    if context_window is not None and estimate.total_tokens > context_window:
+        raise PromptTooLargeError(
+            message="Code does not fit the model's context window",
+            details=estimate.model_dump(),
+        )
@@ -0,0 +1,123 @@
+"""Stream cancellation: explicit stop requests and cleanup under cancellation.
+
+Live review streams register here by session id so ``POST /cancel`` can stop
+them; ``until_cancelled`` races the flag against the next chunk and closes the
+upstream response as soon as it is set. Registrations are per process, so a cancel request
+only reaches streams served by the same worker.
+
+Client disconnects arrive as task cancellation instead. ``shielded`` lets the
+cleanup that must still happen then (closing the upstream response, saving the
+partial output) run to completion.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator, Awaitable
+
+
+class StreamCancelledError(Exception):
+    """Raised inside a review or follow-up stream that was stopped through the API."""
+
+
+class StreamRegistry:
+    def __init__(self) -> None:
+        self._streams: dict[int, asyncio.Event] = {}
+
+    def register(self, session_id: int) -> asyncio.Event | None:
+        """Claim the session for a new stream. None if one is already live."""
+        if session_id in self._streams:
+            return None
+        event = self._streams[session_id] = asyncio.Event()
+        return event
+
+    def unregister(self, session_id: int, event: asyncio.Event) -> None:
+        """Drop the registration, but only if it is still ``event``'s own."""
+        if self._streams.get(session_id) is event:
+            del self._streams[session_id]
+
+    def cancel(self, session_id: int) -> bool:
+        """Flag a live stream to stop. False when none is running here."""
+        event = self._streams.get(session_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+
+async def shielded(awaitable: Awaitable[object]) -> None:
+    """Run cleanup to completion even if the caller is being cancelled.
+
+    A cancellation that arrives while waiting is held back until the work has
+    finished and then re-raised, so the caller still unwinds as cancelled.
+    """
+    task = asyncio.ensure_future(awaitable)
+    cancelled = False
+    while True:
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.done():
+                raise
+            cancelled = True
+            continue
+        break
+    if cancelled:
+        raise asyncio.CancelledError
+
+
+_END = object()
+
+
+async def until_cancelled(
+    stream: AsyncGenerator[str], cancel: asyncio.Event
+) -> AsyncGenerator[str]:
+    """Yield ``stream``'s chunks, stopping as soon as ``cancel`` is set.
+
+    The stream is read by its own task, so a stop request does not wait for
+    the next chunk: the task is cancelled, which closes the upstream response,
+    and StreamCancelledError is raised here.
+    """
+    queue: asyncio.Queue[tuple[object, Exception | None]] = asyncio.Queue(1)
+
+    async def pump() -> None:
+        try:
+            async with contextlib.aclosing(stream):
+                async for chunk in stream:
+                    await queue.put((chunk, None))
+        except Exception as e:
+            await queue.put((None, e))
+        else:
+            await queue.put((_END, None))
+
+    reader = asyncio.create_task(pump())
+    stopped = asyncio.create_task(cancel.wait())
+    try:
+        while True:
+            item = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait(
+                {item, stopped}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if stopped in done:
+                item.cancel()
+                raise StreamCancelledError
+            chunk, error = item.result()
+            if error is not None:
+                raise error
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        stopped.cancel()
+        reader.cancel()
+        # Upstream is closed and usage settled before the caller saves anything.
+        await shielded(asyncio.gather(reader, stopped, return_exceptions=True))
+
+
+_stream_registry: StreamRegistry | None = None
+
+
+def get_stream_registry() -> StreamRegistry:
+    global _stream_registry  # noqa: PLW0603
+    if _stream_registry is None:
+        _stream_registry = StreamRegistry()
+    return _stream_registry
@@ -0,0 +1,136 @@
+"""Per-model capability cache for OpenAI-compatible endpoints.
+
+Each flag starts out unknown (None) and is settled either by the startup probe
+or by the first request that the endpoint rejects, so a model without JSON mode
+costs one extra round-trip per recheck interval instead of one per review.
+Refusals expire after ``recheck_seconds`` and the flag goes back to unknown, so
+a misread error or a server upgrade does not disable a mode for good.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from openai import APIError, APIStatusError
+
+from app.schemas.reviews import ReviewResult
+
+logger = logging.getLogger(__name__)
+
+# Longest prefix wins, so dated snapshots inherit their family's window.
+_KNOWN_CONTEXT = {
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4-turbo": 128_000,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4-mini": 200_000,
+}
+_CONTEXT_RE = re.compile(r"maximum context length is (\d+)")
+
+
+@dataclass
+class ModelCapabilities:
+    json_schema: bool | None = None
+    json_mode: bool | None = None
+    stream_usage: bool | None = None
+    max_context: int | None = None
+
+
+def _known_context(model: str) -> int | None:
+    matches = [prefix for prefix in _KNOWN_CONTEXT if model.startswith(prefix)]
+    return _KNOWN_CONTEXT[max(matches, key=len)] if matches else None
+
+
+def is_context_overflow(error: APIError) -> bool:
+    return getattr(error, "code", None) == "context_length_exceeded"
+
+
+def rejects_param(error: APIError, param: str) -> bool:
+    """Whether ``error`` is the endpoint refusing ``param`` (not a bad prompt)."""
+    if not isinstance(error, APIStatusError) or error.status_code != 400:
+        return False
+    if is_context_overflow(error):
+        return False
+    rejected = getattr(error, "param", None)
+    if rejected is not None:
+        return rejected.startswith(param)
+    # Compatible servers often omit ``param`` but name it in the message.
+    return param in str(error)
+
+
+class CapabilityCache:
+    def __init__(self, recheck_seconds: float = 600.0) -> None:
+        self.recheck_seconds = recheck_seconds
+        self._models: dict[str, ModelCapabilities] = {}
+        # (model, flag) -> monotonic time at which a refusal is forgotten.
+        self._refusals: dict[tuple[str, str], float] = {}
+
+    def get(self, model: str) -> ModelCapabilities:
+        caps = self._models.get(model)
+        if caps is None:
+            caps = self._models[model] = ModelCapabilities(
+                max_context=_known_context(model)
+            )
+        if self._refusals:
+            now = time.monotonic()
+            for key, expires in list(self._refusals.items()):
+                if key[0] == model and expires <= now:
+                    del self._refusals[key]
+                    setattr(caps, key[1], None)
+        return caps
+
+    def mark(self, model: str, **flags: bool | int) -> None:
+        caps = self.get(model)
+        for name, value in flags.items():
+            if value is False:
+                self._refusals[model, name] = time.monotonic() + self.recheck_seconds
+            else:
+                self._refusals.pop((model, name), None)
+            if getattr(caps, name) != value:
+                logger.info("Model %s capability %s=%s", model, name, value)
+                setattr(caps, name, value)
+
+    def learn_from_error(self, model: str, error: APIError) -> None:
+        """Pick up the context window from an overflow error message."""
+        if is_context_overflow(error):
+            match = _CONTEXT_RE.search(str(error))
+            if match:
+                self.mark(model, max_context=int(match.group(1)))
+
+
+def _strict(schema: dict) -> dict:
+    """Rewrite a pydantic JSON schema into the subset strict mode accepts."""
+    out: dict = {}
+    for key, value in schema.items():
+        if key in ("default", "title"):
+            continue
+        if key in ("properties", "$defs"):
+            # Name -> schema maps: field names are not schema keywords.
+            value = {name: _strict(sub) for name, sub in value.items()}
+        elif isinstance(value, dict):
+            value = _strict(value)
+        elif isinstance(value, list):
+            value = [_strict(v) if isinstance(v, dict) else v for v in value]
+        out[key] = value
+    if out.get("type") == "object" and "properties" in out:
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+@lru_cache(maxsize=1)
+def review_result_format() -> dict:
+    """``response_format`` for strict schema-constrained ``ReviewResult`` output."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "review_result",
+            "strict": True,
+            "schema": _strict(ReviewResult.model_json_schema()),
+        },
+    }
@@ -0,0 +1,321 @@
+"""Focus-area fan-out: one shorter review per focus area, run concurrently.
+
+Multi-focus reviews otherwise cover every area in one long generation. With
+fan-out each area is reviewed by its own request; issues are de-duplicated by
+line and message similarity as they arrive, and the branch results are merged
+into one ReviewResult. Only the first branch is asked for corrected_code, so
+output does not grow with the number of areas; if another branch returns one
+anyway, its non-conflicting edits are combined against the original code. Each
+branch
+is a separate provider call, so each one holds its own admission slot while it
+runs.
+
+A merge that is missing failed branches is still returned; the areas that
+failed are appended to the caller's ``failed`` list so it can flag the result
+as partial and keep it out of the review cache.
+"""
+
+import asyncio
+import contextlib
+import difflib
+import json
+import logging
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+
+from app.core.config import get_settings
+from app.core.exceptions import ProviderError, TooManyRequestsError
+from app.schemas.reviews import (
+    FocusArea,
+    ReviewIssue,
+    ReviewResult,
+    ReviewSettings,
+    TokenUsage,
+)
+from app.services.admission import Permit
+from app.services.llm import OpenAIProvider, parse_stream_result, salvage_stream_result
+from app.services.prompts import build_review_messages
+
+logger = logging.getLogger(__name__)
+
+_SIMILAR_MESSAGE_RATIO = 0.6
+
+# Returns the admission slot for a branch index; see ``branch_slots``.
+SlotSource = Callable[[int], Awaitable[Permit]]
+
+
+def fanout_areas(settings: ReviewSettings) -> list[FocusArea] | None:
+    """Focus areas to fan out over, or None to review in a single request."""
+    config = get_settings()
+    areas = list(dict.fromkeys(settings.focus_areas))
+    if not config.fanout_enabled or len(areas) < config.fanout_min_areas:
+        return None
+    return areas
+
+
+def branch_slots(
+    permit: Permit, acquire_more: Callable[[], Awaitable[Permit]]
+) -> SlotSource:
+    """Branch 0 runs under the request's own ``permit``; the rest wait for more.
+
+    A branch releases its slot as soon as it finishes, so branches that got a
+    slot always make progress and waiting ones cannot deadlock the scheduler.
+    """
+
+    async def slot(index: int) -> Permit:
+        return permit if index == 0 else await acquire_more()
+
+    return slot
+
+
+async def _slot(slots: SlotSource | None, index: int):
+    return contextlib.nullcontext() if slots is None else await slots(index)
+
+
+def _branch_messages(
+    code: str,
+    language: str,
+    settings: ReviewSettings,
+    area: FocusArea,
+    index: int,
+    stream: bool,
+) -> list[dict]:
+    return build_review_messages(
+        code,
+        language,
+        settings.model_copy(update={"focus_areas": [area]}),
+        stream,
+        corrected_code=index == 0,
+    )
+
+
+def _similar(a: ReviewIssue, b: ReviewIssue) -> bool:
+    if a.line != b.line:
+        return False
+    ratio = difflib.SequenceMatcher(None, a.message.lower(), b.message.lower()).ratio()
+    return ratio >= _SIMILAR_MESSAGE_RATIO
+
+
+class IssueMerger:
+    """Accumulates issues, dropping near-duplicates of ones already kept."""
+
+    def __init__(self) -> None:
+        self.issues: list[ReviewIssue] = []
+
+    def add(self, issue: ReviewIssue) -> bool:
+        for i, kept in enumerate(self.issues):
+            if _similar(kept, issue):
+                if _severity_rank(issue) > _severity_rank(kept):
+                    self.issues[i] = issue
+                return False
+        self.issues.append(issue)
+        return True
+
+
+def _severity_rank(issue: ReviewIssue) -> int:
+    return ("info", "warning", "error").index(issue.severity)
+
+
+def merge_corrected_code(original: str, candidates: Sequence[str | None]) -> str | None:
+    """Apply every non-overlapping line edit from ``candidates`` to ``original``.
+
+    Edits are taken in branch order; one that overlaps an edit already taken is
+    dropped rather than guessed at.
+    """
+    candidates = [c for c in candidates if c is not None and c != original]
+    if not candidates:
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    base = original.splitlines()
+    edits: list[tuple[int, int, list[str]]] = []
+    for corrected in candidates:
+        matcher = difflib.SequenceMatcher(
+            None, base, corrected.splitlines(), autojunk=False
+        )
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            overlaps = any(
+                (i1 < e2 and e1 < i2) or i1 == i2 == e1 or e1 == e2 == i1
+                for e1, e2, _ in edits
+            )
+            if not overlaps:
+                edits.append((i1, i2, corrected.splitlines()[j1:j2]))
+    out: list[str] = []
+    pos = 0
+    for i1, i2, lines in sorted(edits, key=lambda e: (e[0], e[1])):
+        out.extend(base[pos:i1])
+        out.extend(lines)
+        pos = i2
+    out.extend(base[pos:])
+    return "\n".join(out) + ("\n" if original.endswith("\n") else "")
+
+
+def merge_results(
+    code: str,
+    areas: Sequence[FocusArea],
+    results: Sequence[ReviewResult | None],
+    merger: IssueMerger | None = None,
+) -> ReviewResult:
+    merger = merger or IssueMerger()
+    summaries = []
+    suggestions: dict[str, str] = {}
+    for area, result in zip(areas, results, strict=True):
+        if result is None:
+            continue
+        summaries.append(f"[{area}] {result.summary}")
+        for issue in result.issues:
+            merger.add(issue)
+        for suggestion in result.suggestions:
+            suggestions.setdefault(suggestion.strip().lower(), suggestion)
+    return ReviewResult(
+        summary="\n".join(summaries),
+        issues=merger.issues,
+        suggestions=list(suggestions.values()),
+        corrected_code=merge_corrected_code(
+            code, [r.corrected_code for r in results if r is not None]
+        ),
+    )
+
+
+def _sum_usage(usage: TokenUsage | None, branches: Sequence[TokenUsage]) -> None:
+    if usage is None:
+        return
+    usage.prompt_tokens = sum(b.prompt_tokens for b in branches)
+    usage.completion_tokens = sum(b.completion_tokens for b in branches)
+    usage.cached_tokens = sum(b.cached_tokens for b in branches)
+    usage.estimated = any(b.estimated for b in branches)
+    usage.model = next((b.model for b in branches if b.model), None)
+
+
+async def review_fanout(
+    provider: OpenAIProvider,
+    areas: Sequence[FocusArea],
+    code: str,
+    language: str,
+    settings: ReviewSettings,
+    usage: TokenUsage | None = None,
+    models: Sequence[str] | None = None,
+    slots: SlotSource | None = None,
+    failed: list[FocusArea] | None = None,
+) -> ReviewResult:
+    branch_usage = [TokenUsage() for _ in areas]
+
+    async def run_branch(index: int) -> ReviewResult:
+        messages = _branch_messages(
+            code, language, settings, areas[index], index, stream=False
+        )
+        with await _slot(slots, index):
+            return await provider.review_messages(messages, branch_usage[index], models)
+
+    try:
+        outcomes = await asyncio.gather(
+            *(run_branch(i) for i in range(len(areas))), return_exceptions=True
+        )
+    finally:
+        _sum_usage(usage, branch_usage)
+    results = [o if isinstance(o, ReviewResult) else None for o in outcomes]
+    if all(r is None for r in results):
+        raise outcomes[0]
+    for area, outcome in zip(areas, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            logger.warning("Fan-out branch %s failed: %r", area, outcome)
+            if failed is not None:
+                failed.append(area)
+    return merge_results(code, areas, results)
+
+
+async def stream_fanout(
+    provider: OpenAIProvider,
+    areas: Sequence[FocusArea],
+    code: str,
+    language: str,
+    settings: ReviewSettings,
+    usage: TokenUsage | None = None,
+    models: Sequence[str] | None = None,
+    slots: SlotSource | None = None,
+    failed: list[FocusArea] | None = None,
+) -> AsyncGenerator[str]:
+    """Stream NDJSON like ``generate_review_stream``, fanned out per area.
+
+    Issue lines are forwarded (de-duplicated) as soon as any branch produces
+    them; a single merged result line follows once every branch has finished.
+    """
+    queue: asyncio.Queue[tuple[int, str | None]] = asyncio.Queue()
+    branch_usage = [TokenUsage() for _ in areas]
+    outputs = [""] * len(areas)
+    errors: list[ProviderError | TooManyRequestsError | None] = [None] * len(areas)
+
+    async def run_branch(index: int) -> None:
+        pending = ""
+        try:
+            messages = _branch_messages(
+                code, language, settings, areas[index], index, stream=True
+            )
+            with await _slot(slots, index):
+                stream = provider.stream_messages(messages, branch_usage[index], models)
+                async with contextlib.aclosing(stream):
+                    async for chunk in stream:
+                        outputs[index] += chunk
+                        pending += chunk
+                        while "\n" in pending:
+                            line, pending = pending.split("\n", 1)
+                            await queue.put((index, line))
+        except (ProviderError, TooManyRequestsError) as e:
+            errors[index] = e
+        finally:
+            await queue.put((index, None))
+
+    tasks = [asyncio.create_task(run_branch(i)) for i in range(len(areas))]
+    merger = IssueMerger()
+    try:
+        remaining = len(tasks)
+        while remaining:
+            _index, line = await queue.get()
+            if line is None:
+                remaining -= 1
+                continue
+            issue = _parse_issue(line)
+            if issue is not None and merger.add(issue):
+                yield json.dumps({"type": "issue", **issue.model_dump()}) + "\n"
+
+        results = []
+        for area, output, error in zip(areas, outputs, errors, strict=True):
+            if error is not None:
+                logger.warning("Fan-out branch %s failed: %s", area, error.message)
+            result = _branch_result(output)
+            if (error is not None or result is None) and failed is not None:
+                failed.append(area)
+            results.append(result)
+        if all(r is None for r in results):
+            first_error = next((e for e in errors if e is not None), None)
+            raise first_error or ProviderError("Fan-out produced no usable result")
+        merged = merge_results(code, areas, results, merger)
+        yield json.dumps({"type": "result", "result": merged.model_dump()}) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        _sum_usage(usage, branch_usage)
+
+
+def _parse_issue(line: str) -> ReviewIssue | None:
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(obj, dict) or obj.get("type") != "issue":
+        return None
+    try:
+        return ReviewIssue.model_validate(obj)
+    except ValueError:
+        return None
+
+
+def _branch_result(output: str) -> ReviewResult | None:
+    if not output:
+        return None
+    try:
+        return parse_stream_result(output)
+    except ProviderError:
+        return salvage_stream_result(output)
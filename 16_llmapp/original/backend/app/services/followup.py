@@ -0,0 +1,109 @@
+"""Context for follow-up questions on a review session.
+
+The prompt is the stable prefix [system, code, review], then a digest of older
+follow-ups, the most recent follow-ups verbatim, and the new question. Recent
+turns are kept whole, newest first, until ``history_tokens`` is spent; older
+ones are folded into the digest, one clipped question/answer pair per turn.
+Digest lines depend only on the stored turn, so consecutive questions share
+everything up to the point where a turn moves from the verbatim tail into the
+digest, and the provider's prefix cache covers the code and review every time.
+"""
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from app.core.metrics import FOLLOWUP_HISTORY_TURNS
+from app.models.review import ReviewMessage, ReviewSession
+from app.services.prompts import (
+    build_followup_system_prompt,
+    build_history_digest,
+    build_review_replay,
+    build_user_prompt,
+)
+from app.services.tokens import count_message_tokens
+
+_DIGEST_CHARS = 200
+# Oldest digest lines are dropped past this many turns.
+_MAX_DIGEST_TURNS = 30
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Turn:
+    question: str
+    answer: str
+
+
+def session_turns(
+    messages: Sequence[ReviewMessage],
+) -> tuple[dict | None, list[Turn]]:
+    """The session's review result (if any) and its answered follow-ups, in order."""
+    review: dict | None = None
+    turns: list[Turn] = []
+    question: str | None = None
+    for message in messages:
+        content = message.content_json
+        if message.message_type == "followup_question":
+            question = content.get("text")
+        elif message.message_type == "followup_answer":
+            if question and content.get("text"):
+                turns.append(Turn(question, content["text"]))
+            question = None
+        elif review is None and message.message_type == "result":
+            review = content
+        elif review is None and message.message_type == "cancelled":
+            review = content.get("result")
+    return review, turns
+
+
+def _clip(text: str) -> str:
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    if len(text) <= _DIGEST_CHARS:
+        return text
+    return text[: _DIGEST_CHARS - 1].rstrip() + "…"
+
+
+def _digest_line(turn: Turn) -> str:
+    return f"- Q: {_clip(turn.question)}\n  A: {_clip(turn.answer)}"
+
+
+def build_followup_messages(
+    session: ReviewSession,
+    review: dict | None,
+    turns: list[Turn],
+    question: str,
+    model: str,
+    history_tokens: int,
+) -> list[dict]:
+    output_language = (session.settings_json or {}).get("output_language", "en")
+    messages = [
+        {"role": "system", "content": build_followup_system_prompt(output_language)},
+        {"role": "user", "content": build_user_prompt(session.code, session.language)},
+    ]
+    if review is not None:
+        messages.append({"role": "assistant", "content": build_review_replay(review)})
+
+    recent: list[dict] = []
+    spent = 0
+    kept = 0
+    for turn in reversed(turns):
+        pair = [
+            {"role": "user", "content": turn.question},
+            {"role": "assistant", "content": turn.answer},
+        ]
+        spent += count_message_tokens(pair, model)
+        if spent > history_tokens:
+            break
+        recent[:0] = pair
+        kept += 1
+    older = turns[: len(turns) - kept][-_MAX_DIGEST_TURNS:]
+    if older:
+        digest = build_history_digest([_digest_line(t) for t in older])
+        messages.append({"role": "user", "content": digest})
+    FOLLOWUP_HISTORY_TURNS.labels("verbatim").inc(kept)
+    FOLLOWUP_HISTORY_TURNS.labels("summarized").inc(len(turns) - kept)
+
+    messages.extend(recent)
+    messages.append({"role": "user", "content": question})
+    return messages
@@ -0,0 +1,60 @@
+"""Conditional GET support for review history.
+
+Every write that changes what a user's history endpoints return bumps
+``users.history_version`` in the same transaction. The list ETag is derived
+from that counter, which ``get_current_user`` has already loaded, so a matching
+``If-None-Match`` is answered without touching review tables. A detail ETag is
+the session's message count (messages are append-only), found with one
+aggregate query instead of loading and serializing the session.
+
+Responses are ``private, no-cache``: sessions gain follow-up messages after
+they finish, so a browser must revalidate every time, which is cheap.
+"""
+
+import hashlib
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.review import ReviewMessage, ReviewSession
+from app.models.user import User
+
+
+async def bump_history_version(db: AsyncSession, *user_ids: int) -> None:
+    for user_id in sorted(set(user_ids)):
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(history_version=User.history_version + 1)
+        )
+
+
+def list_etag(user: User, query: str) -> str:
+    digest = hashlib.sha256(query.encode()).hexdigest()[:12]
+    return f'"h{user.id}.v{user.history_version}.{digest}"'
+
+
+CACHE_CONTROL = "private, no-cache"
+
+
+async def session_etag(db: AsyncSession, user_id: int, session_id: int) -> str | None:
+    """ETag for one of the user's sessions, or None if it is gone."""
+    messages = (
+        await db.execute(
+            select(func.count(ReviewMessage.id))
+            .select_from(ReviewSession)
+            .outerjoin(ReviewMessage, ReviewMessage.session_id == ReviewSession.id)
+            .where(ReviewSession.id == session_id, ReviewSession.user_id == user_id)
+            .group_by(ReviewSession.id)
+        )
+    ).scalar()
+    if messages is None:
+        return None
+    return f'"s{session_id}.m{messages}"'
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
@@ -0,0 +1,290 @@
+"""Idempotency-Key handling for the review creation endpoints.
+
+The first request with a key claims it by inserting an ``in_progress`` row in
+its own committed transaction, so concurrent retries on any worker see it. A
+retry then either waits for the original (following its events live when it
+is streaming in this process) or gets the stored outcome without calling the
+provider again. Failed originals release the key so a retry runs afresh.
+
+An ``in_progress`` row holds a lease (``locked_until``) that the original
+renews while it runs. If its worker dies the lease lapses, and the next retry
+takes the key over instead of waiting on an outcome that will never come.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sse_starlette.sse import ServerSentEvent
+
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.exceptions import IdempotencyInProgressError, IdempotencyKeyReusedError
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+_POLL_SECONDS = 0.25
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    status: str
+    session_id: int | None
+    response_json: dict[str, Any] | None
+    lapsed: bool = False
+
+
+@dataclass
+class _InFlight:
+    """Events of a stream running in this process, for retries to follow."""
+
+    events: list[ServerSentEvent] = field(default_factory=list)
+    finished: bool = False
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+    renewal: asyncio.Task | None = None
+
+
+def _matching(user_id: int, key: str, *clauses) -> tuple:
+    return (IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, *clauses)
+
+
+def request_hash(endpoint: str, body_json: str) -> str:
+    return hashlib.sha256(f"{endpoint}\n{body_json}".encode()).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float, wait_seconds: float, lease_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.lease_seconds = lease_seconds
+        self._inflight: dict[tuple[int, str], _InFlight] = {}
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(UTC) - timedelta(seconds=self.ttl_seconds)
+
+    def _lease(self) -> datetime:
+        return datetime.now(UTC) + timedelta(seconds=self.lease_seconds)
+
+    @staticmethod
+    def _lapsed():
+        return or_(
+            IdempotencyKey.locked_until.is_(None),
+            IdempotencyKey.locked_until < datetime.now(UTC),
+        )
+
+    def _hold(self, user_id: int, key: str) -> None:
+        inflight = self._inflight[user_id, key] = _InFlight()
+        inflight.renewal = asyncio.create_task(self._renew(user_id, key))
+
+    async def _renew(self, user_id: int, key: str) -> None:
+        """Keep extending the lease until ``finish`` cancels this task."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with async_session() as db:
+                    await db.execute(
+                        update(IdempotencyKey)
+                        .where(
+                            *_matching(
+                                user_id, key, IdempotencyKey.status == "in_progress"
+                            )
+                        )
+                        .values(locked_until=self._lease())
+                    )
+                    await db.commit()
+            except Exception:
+                logger.warning("Failed to renew idempotency lease", exc_info=True)
+
+    async def claim(
+        self, user_id: int, key: str, endpoint: str, request_hash: str
+    ) -> IdempotencyRecord | None:
+        """Claim ``key`` for a new request; None when claimed, else the existing record."""
+        async with async_session() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.created_at < self._cutoff(),
+                )
+            )
+            db.add(
+                IdempotencyKey(
+                    user_id=user_id,
+                    key=key,
+                    endpoint=endpoint,
+                    request_hash=request_hash,
+                    locked_until=self._lease(),
+                )
+            )
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+            else:
+                self._hold(user_id, key)
+                return None
+            row = await db.get(IdempotencyKey, (user_id, key))
+            if row is None:  # expired and purged in between; treat as a fresh claim
+                return await self.claim(user_id, key, endpoint, request_hash)
+            if row.endpoint != endpoint or row.request_hash != request_hash:
+                raise IdempotencyKeyReusedError
+            record = IdempotencyRecord(row.status, row.session_id, row.response_json)
+            if record.status == "in_progress":
+                # The original's lease lapsed: it died, so this request takes over.
+                taken = await db.execute(
+                    update(IdempotencyKey)
+                    .where(
+                        *_matching(
+                            user_id,
+                            key,
+                            IdempotencyKey.status == "in_progress",
+                            self._lapsed(),
+                        )
+                    )
+                    .values(locked_until=self._lease())
+                    # Compared in SQL; the loaded row holds a naive datetime.
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                if taken.rowcount == 1:
+                    self._hold(user_id, key)
+                    return None
+        return record
+
+    async def _load(self, user_id: int, key: str) -> IdempotencyRecord | None:
+        async with async_session() as db:
+            row = (
+                await db.execute(
+                    select(
+                        IdempotencyKey.status,
+                        IdempotencyKey.session_id,
+                        IdempotencyKey.response_json,
+                        self._lapsed(),
+                    ).where(*_matching(user_id, key))
+                )
+            ).first()
+        if row is None:
+            return None
+        return IdempotencyRecord(row[0], row[1], row[2], bool(row[3]))
+
+    async def wait(self, user_id: int, key: str) -> IdempotencyRecord | None:
+        """Wait for an in-progress original.
+
+        None if it failed and released the key, or died and let its lease
+        lapse; either way the caller may claim the key again.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = await self._load(user_id, key)
+            if record is None or record.status != "in_progress":
+                return record
+            if record.lapsed:
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgressError(retry_after=_POLL_SECONDS * 4)
+            await asyncio.sleep(min(_POLL_SECONDS, remaining))
+
+    def is_local(self, user_id: int, key: str) -> bool:
+        return (user_id, key) in self._inflight
+
+    def follow(self, user_id: int, key: str) -> AsyncIterator[ServerSentEvent] | None:
+        """Live events of the original stream, if it is running in this process."""
+        inflight = self._inflight.get((user_id, key))
+        if inflight is None:
+            return None
+        return _follow(inflight)
+
+    async def publish(self, user_id: int, key: str, event: ServerSentEvent) -> None:
+        inflight = self._inflight.get((user_id, key))
+        if inflight is not None:
+            async with inflight.changed:
+                inflight.events.append(event)
+                inflight.changed.notify_all()
+
+    async def complete(
+        self,
+        user_id: int,
+        key: str,
+        session_id: int,
+        response_json: dict[str, Any] | None = None,
+        db: AsyncSession | None = None,
+    ) -> None:
+        """Record the outcome; pass ``db`` to commit it with the request's own writes."""
+        stmt = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                status="completed",
+                session_id=session_id,
+                response_json=response_json,
+                locked_until=None,
+            )
+        )
+        if db is not None:
+            await db.execute(stmt)
+            return
+        async with async_session() as own:
+            await own.execute(stmt)
+            await own.commit()
+
+    async def release(self, user_id: int, key: str) -> None:
+        """Forget a key whose request failed, so a retry runs afresh."""
+        async with async_session() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status == "in_progress",
+                )
+            )
+            await db.commit()
+
+    async def finish(self, user_id: int, key: str) -> None:
+        """Wake anything following the original; call once its outcome is stored."""
+        inflight = self._inflight.pop((user_id, key), None)
+        if inflight is not None:
+            if inflight.renewal is not None:
+                inflight.renewal.cancel()
+            async with inflight.changed:
+                inflight.finished = True
+                inflight.changed.notify_all()
+
+
+async def _follow(inflight: _InFlight) -> AsyncIterator[ServerSentEvent]:
+    index = 0
+    while True:
+        async with inflight.changed:
+            await inflight.changed.wait_for(
+                lambda seen=index: seen < len(inflight.events) or inflight.finished
+            )
+            pending = inflight.events[index:]
+            finished = inflight.finished
+        for event in pending:
+            yield event
+        index += len(pending)
+        if finished and index >= len(inflight.events):
+            return
+
+
+_idempotency_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _idempotency_store  # noqa: PLW0603
+    if _idempotency_store is None:
+        settings = get_settings()
+        _idempotency_store = IdempotencyStore(
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            wait_seconds=settings.idempotency_wait_seconds,
+            lease_seconds=settings.idempotency_lease_seconds,
+        )
+    return _idempotency_store
@@ -1,18 +1,51 @@
+import asyncio
+import contextlib
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Sequence
 
-from openai import APIError, APITimeoutError, AsyncOpenAI, RateLimitError
+from openai import (
+    APIError,
+    APITimeoutError,
+    AsyncOpenAI,
+    AsyncStream,
+    RateLimitError,
+)
 
 from app.core.config import get_settings
-from app.core.exceptions import ProviderError
-from app.schemas.reviews import ReviewResult, ReviewSettings
-from app.services.prompts import (
-    REVIEW_STREAM_SYSTEM_PROMPT,
-    REVIEW_SYSTEM_PROMPT,
-    build_user_prompt,
+from app.core.exceptions import ProviderError, ProviderUnavailableError
+from app.core.metrics import (
+    CACHED_PROMPT_TOKENS,
+    HEDGED_REQUESTS,
+    INTER_TOKEN_LATENCY,
+    MODEL_FALLBACKS,
+    PARSE_FAILURES,
+    PARTIAL_RESULTS,
+    PROMPT_TOKENS,
+    PROVIDER_CALL_DURATION,
+    PROVIDER_ERRORS,
+    PROVIDER_RETRIES,
+    TIME_TO_FIRST_TOKEN,
+)
+from app.core.tracing import start_span, trace_span
+from app.schemas.reviews import ReviewIssue, ReviewResult, ReviewSettings, TokenUsage
+from app.services.cancellation import shielded
+from app.services.capabilities import (
+    CapabilityCache,
+    is_context_overflow,
+    rejects_param,
+    review_result_format,
+)
+from app.services.prompts import build_review_messages, prompt_cache_key
+from app.services.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    RetryPolicy,
+    is_retryable,
 )
+from app.services.tokens import count_message_tokens, count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +80,76 @@ def _extract_json_object(text: str) -> str | None:
     return None
 
 
+def _provider_error(e: Exception) -> ProviderError:
+    PROVIDER_ERRORS.labels("openai", type(e).__name__).inc()
+    return ProviderError(
+        message=f"OpenAI API error: {e}",
+        details={"provider": "openai", "error_type": type(e).__name__},
+    )
+
+
+def _record_usage(
+    usage: TokenUsage | None,
+    upstream,
+    messages: list[dict],
+    output: str,
+    model: str,
+) -> None:
+    """Copy upstream token usage into ``usage``, estimating it when absent."""
+    if usage is None:
+        return
+    if upstream is not None:
+        details = getattr(upstream, "prompt_tokens_details", None)
+        usage.prompt_tokens = upstream.prompt_tokens or 0
+        usage.completion_tokens = upstream.completion_tokens or 0
+        usage.cached_tokens = getattr(details, "cached_tokens", None) or 0
+        usage.estimated = False
+        PROMPT_TOKENS.labels(model).inc(usage.prompt_tokens)
+        CACHED_PROMPT_TOKENS.labels(model).inc(usage.cached_tokens)
+    else:
+        usage.prompt_tokens = count_message_tokens(messages, model)
+        usage.completion_tokens = count_tokens(output, model)
+        usage.cached_tokens = 0
+        usage.estimated = True
+    usage.model = model
+
+
+def _chunk_text(chunk) -> str | None:
+    delta = chunk.choices[0].delta if chunk.choices else None
+    return delta.content if delta else None
+
+
+async def _chain(prefetched: list, rest: AsyncIterator) -> AsyncIterator:
+    for chunk in prefetched:
+        yield chunk
+    async for chunk in rest:
+        yield chunk
+
+
+async def _close_opened(tasks: set[asyncio.Task]) -> None:
+    """Cancel losing stream openers and close any stream they managed to open."""
+    for task in tasks:
+        task.cancel()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, tuple):
+            await result[0].close()
+
+
+def _can_fall_back(error: BaseException | None) -> bool:
+    """Whether a different model might succeed where this one failed."""
+    if isinstance(error, ProviderUnavailableError):  # this model's breaker is open
+        return True
+    if not isinstance(error, APIError):
+        return False
+    status = getattr(error, "status_code", None)
+    return is_retryable(error) or status == 404 or is_context_overflow(error)
+
+
+def _note_fallback(model: str, fallback: str, error: BaseException | None) -> None:
+    MODEL_FALLBACKS.labels(model, fallback).inc()
+    logger.warning("Model %s failed (%r); falling back to %s", model, error, fallback)
+
+
 def parse_review_result(raw_text: str) -> ReviewResult:
     try:
         data = json.loads(raw_text)
@@ -63,6 +166,7 @@ def parse_review_result(raw_text: str) -> ReviewResult:
         except (json.JSONDecodeError, ValueError):
             pass
 
+    PARSE_FAILURES.inc()
     raise ProviderError(
         message="Failed to parse LLM response as ReviewResult",
         details={"raw_output": raw_text[:1000]},
@@ -79,93 +183,488 @@ def parse_stream_result(raw_text: str) -> ReviewResult:
         except json.JSONDecodeError:
             continue
         if isinstance(obj, dict) and obj.get("type") == "result" and "result" in obj:
-            return ReviewResult.model_validate(obj["result"])
+            try:
+                return ReviewResult.model_validate(obj["result"])
+            except ValueError:
+                break
     # Fallback: entire text as single JSON
     return parse_review_result(raw_text)
 
 
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def repair_json(
+    text: str, accept: Callable[[object], bool] | None = None
+) -> object | None:
+    """Parse JSON that was cut off, dropping the incomplete trailing value.
+
+    Candidate cut points are recorded while scanning (before each top-level
+    comma of a container and after each closed container); the latest one that
+    parses once the open containers are closed, and that ``accept`` approves,
+    wins. Earlier cuts drop more of the tail, e.g. a half-written list item.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+    stack: list[str] = []
+    cuts: list[tuple[int, str]] = []
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                parsed = _loads(text[start : i + 1])
+                return parsed if accept is None or accept(parsed) else None
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+    for cut, closers in reversed(cuts):
+        repaired = _loads(text[start:cut] + closers)
+        if repaired is not None and (accept is None or accept(repaired)):
+            return repaired
+    return None
+
+
+def _loads(text: str) -> object | None:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def _is_stream_line(obj: object) -> bool:
+    """Whether ``obj`` is a valid issue or result line of the NDJSON stream."""
+    if not isinstance(obj, dict):
+        return False
+    try:
+        if obj.get("type") == "issue":
+            ReviewIssue.model_validate(obj)
+        elif obj.get("type") == "result":
+            ReviewResult.model_validate(obj.get("result"))
+        else:
+            return False
+    except ValueError:
+        return False
+    return True
+
+
+def salvage_stream_result(raw_text: str) -> ReviewResult | None:
+    """Best-effort ReviewResult from a stream that did not finish cleanly.
+
+    A truncated result line is repaired; otherwise (or when it lost issues) the
+    result is assembled from the issue lines that did stream. Returns None when
+    nothing usable arrived.
+    """
+    issues: list[ReviewIssue] = []
+    result: ReviewResult | None = None
+    for line in raw_text.splitlines():
+        obj = _loads(line.strip()) if line.strip() else None
+        if obj is None and '"type"' in line:
+            obj = repair_json(line, accept=_is_stream_line)
+        if not isinstance(obj, dict):
+            continue
+        if obj.get("type") == "issue":
+            try:
+                issues.append(ReviewIssue.model_validate(obj))
+            except ValueError:
+                continue
+        elif obj.get("type") == "result" and isinstance(obj.get("result"), dict):
+            with contextlib.suppress(ValueError):
+                result = ReviewResult.model_validate(obj["result"])
+
+    if result is not None:
+        if len(result.issues) < len(issues):
+            result.issues = issues
+        return result
+    if not issues:
+        return None
+    return ReviewResult(
+        summary=(
+            f"The review was cut short; {len(issues)} issue(s) were recovered "
+            "from the partial output."
+        ),
+        issues=issues,
+    )
+
+
+def partial_result_content(result: ReviewResult, reason: str) -> dict:
+    """Message payload for a salvaged result, flagged so clients can tell."""
+    PARTIAL_RESULTS.labels(reason).inc()
+    return {**result.model_dump(), "partial": True, "partial_reason": reason}
+
+
 class BaseProvider(ABC):
     @abstractmethod
     async def generate_review(
-        self, code: str, language: str, settings: ReviewSettings
+        self,
+        code: str,
+        language: str,
+        settings: ReviewSettings,
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
     ) -> ReviewResult: ...
 
     async def generate_review_stream(
-        self, code: str, language: str, settings: ReviewSettings
+        self,
+        code: str,
+        language: str,
+        settings: ReviewSettings,
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
     ) -> AsyncGenerator[str]:
         raise NotImplementedError("Streaming not supported by this provider")
         yield  # pragma: no cover
 
 
 class OpenAIProvider(BaseProvider):
-    def __init__(self, client: AsyncOpenAI, model: str):
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        retry: RetryPolicy | None = None,
+    ):
+        settings = get_settings()
         self.client = client
         self.model = model
+        self.retry = retry or RetryPolicy(
+            max_retries=settings.llm_max_retries,
+            base_delay=settings.llm_retry_base_delay_seconds,
+            max_delay=settings.llm_retry_max_delay_seconds,
+        )
+        self.breaker_threshold = settings.llm_breaker_failure_threshold
+        self.breaker_reset = settings.llm_breaker_reset_seconds
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.capabilities = CapabilityCache(settings.llm_capability_recheck_seconds)
+        self._ttft: dict[str, LatencyTracker] = {}
+        self.hedge_enabled = settings.llm_hedge_enabled
+        self.hedge_percentile = settings.llm_hedge_percentile
+        self.hedge_min_delay = settings.llm_hedge_min_delay_seconds
+        self.prompt_cache_keys = settings.llm_prompt_cache_key
 
     async def generate_review(
-        self, code: str, language: str, settings: ReviewSettings
+        self,
+        code: str,
+        language: str,
+        settings: ReviewSettings,
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
     ) -> ReviewResult:
-        user_prompt = build_user_prompt(code, language, settings)
-        messages = [
-            {"role": "system", "content": REVIEW_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_review_messages(code, language, settings)
+        return await self.review_messages(messages, usage, models)
+
+    async def review_messages(
+        self,
+        messages: list[dict],
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
+    ) -> ReviewResult:
+        """Review over prebuilt ``messages`` with the first of ``models``.
+
+        Later models are fallbacks, tried only when an earlier one fails in a
+        way another model could avoid (outage, throttling, unknown model or a
+        context overflow).
+        """
+        candidates = list(models or [self.model])
 
-        raw_text = await self._call_api(messages)
+        with trace_span("llm.generate_review", model=candidates[0]):
+            for i, model in enumerate(candidates):
+                try:
+                    raw_text = await self._call_api(messages, usage, model)
+                    break
+                except ProviderError as e:
+                    cause = e.__cause__ or e
+                    if i + 1 == len(candidates) or not _can_fall_back(cause):
+                        raise
+                    _note_fallback(model, candidates[i + 1], cause)
         return parse_review_result(raw_text)
 
-    async def generate_review_stream(
-        self, code: str, language: str, settings: ReviewSettings
+    def generate_review_stream(
+        self,
+        code: str,
+        language: str,
+        settings: ReviewSettings,
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
+    ) -> AsyncGenerator[str]:
+        messages = build_review_messages(code, language, settings, stream=True)
+        return self.stream_messages(messages, usage, models)
+
+    async def stream_messages(
+        self,
+        messages: list[dict],
+        usage: TokenUsage | None = None,
+        models: Sequence[str] | None = None,
     ) -> AsyncGenerator[str]:
-        user_prompt = build_user_prompt(code, language, settings)
-        messages = [
-            {"role": "system", "content": REVIEW_STREAM_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+        """Stream the text of a chat completion over prebuilt ``messages``."""
+        candidates = list(models or [self.model])
+        model = candidates[0]
+        start = time.perf_counter()
+        last = None
+        span = start_span("llm.stream", model=model)
+        error: BaseException | None = None
+        output: list[str] = []
+        upstream_usage = None
+        response: AsyncStream | None = None
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                stream=True,
-            )
-            async for chunk in response:
-                delta = chunk.choices[0].delta if chunk.choices else None
-                if delta and delta.content:
-                    yield delta.content
+            for i, model in enumerate(candidates):
+                try:
+                    opened = await self._open_stream_hedged(messages, model)
+                    break
+                except (APIError, ProviderUnavailableError) as e:
+                    if i + 1 == len(candidates) or not _can_fall_back(e):
+                        raise
+                    _note_fallback(model, candidates[i + 1], e)
+            response, chunks, prefetched = opened
+            if span is not None:
+                span.set("model", model)
+            async for chunk in _chain(prefetched, chunks):
+                if getattr(chunk, "usage", None) is not None:
+                    upstream_usage = chunk.usage
+                text = _chunk_text(chunk)
+                if text:
+                    now = time.perf_counter()
+                    if last is None:
+                        self.ttft(model).add(now - start)
+                        TIME_TO_FIRST_TOKEN.labels("openai", model).observe(now - start)
+                        if span is not None:
+                            span.set("time_to_first_token_ms", (now - start) * 1000)
+                    else:
+                        INTER_TOKEN_LATENCY.labels("openai", model).observe(now - last)
+                    last = now
+                    output.append(text)
+                    yield text
         except (RateLimitError, APITimeoutError, APIError) as e:
-            raise ProviderError(
-                message=f"OpenAI API error: {e}",
-                details={"provider": "openai", "error_type": type(e).__name__},
-            ) from e
+            error = e
+            raise _provider_error(e) from e
+        finally:
+            if response is not None:
+                # Also on client disconnect: stop generation (and billing) now.
+                await shielded(response.close())
+            PROVIDER_CALL_DURATION.labels("openai", model, "stream").observe(
+                time.perf_counter() - start
+            )
+            # A stream that never opened (breaker open, request refused) used
+            # no tokens; estimating the prompt would bill the user for nothing.
+            if response is not None:
+                _record_usage(usage, upstream_usage, messages, "".join(output), model)
+            if span is not None:
+                span.end(error=error)
 
-    async def _call_api(self, messages: list[dict]) -> str:
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format={"type": "json_object"},
+    def breaker(self, model: str) -> CircuitBreaker:
+        """Circuit breaker for ``model``; an outage of one leaves its fallbacks open."""
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(
+                f"openai:{model}",
+                failure_threshold=self.breaker_threshold,
+                reset_timeout=self.breaker_reset,
             )
-            return response.choices[0].message.content or ""
-        except (RateLimitError, APITimeoutError, APIError) as e:
-            if isinstance(e, APIError) and e.status_code == 400:
-                return await self._call_api_plain(messages)
-            raise ProviderError(
-                message=f"OpenAI API error: {e}",
-                details={"provider": "openai", "error_type": type(e).__name__},
-            ) from e
-
-    async def _call_api_plain(self, messages: list[dict]) -> str:
+        return breaker
+
+    def ttft(self, model: str) -> LatencyTracker:
+        """Rolling time-to-first-token samples for ``model``."""
+        tracker = self._ttft.get(model)
+        if tracker is None:
+            tracker = self._ttft[model] = LatencyTracker()
+        return tracker
+
+    async def _create(self, model: str, **kwargs):
+        """One completion request, retried per policy behind the circuit breaker."""
+        messages = kwargs.get("messages") or []
+        if self.prompt_cache_keys and messages and messages[0]["role"] == "system":
+            kwargs["prompt_cache_key"] = prompt_cache_key(messages[0]["content"])
+        breaker = self.breaker(model)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model, **kwargs
+                )
+            except APIError as e:
+                breaker.record_failure(e)
+                self.capabilities.learn_from_error(model, e)
+                delay = self.retry.next_delay(attempt, e)
+                if delay is None:
+                    raise
+                PROVIDER_RETRIES.labels("openai", type(e).__name__).inc()
+                logger.info("Retrying OpenAI call in %.2fs after %r", delay, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                breaker.record_success()
+                return response
+
+    async def _open_stream(
+        self, messages: list[dict], model: str
+    ) -> tuple[AsyncStream, AsyncIterator, list]:
+        """Open a stream and read up to its first content chunk."""
+        caps = self.capabilities.get(model)
+        if caps.stream_usage is False:
+            response = await self._create(model, messages=messages, stream=True)
+        else:
+            try:
+                response = await self._create(
+                    model,
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+            except APIError as e:
+                if not rejects_param(e, "stream_options"):
+                    raise
+                self.capabilities.mark(model, stream_usage=False)
+                response = await self._create(model, messages=messages, stream=True)
+            else:
+                self.capabilities.mark(model, stream_usage=True)
+        chunks = aiter(response)
+        prefetched = []
+        try:
+            async for chunk in chunks:
+                prefetched.append(chunk)
+                if _chunk_text(chunk):
+                    break
+        except BaseException:
+            await response.close()
+            raise
+        return response, chunks, prefetched
+
+    def _hedge_delay(self, model: str) -> float | None:
+        if not self.hedge_enabled or self.breaker(model).state != CircuitBreaker.CLOSED:
+            return None
+        threshold = self.ttft(model).percentile(self.hedge_percentile)
+        if threshold is None:
+            return None
+        return max(threshold, self.hedge_min_delay)
+
+    async def _open_stream_hedged(
+        self, messages: list[dict], model: str
+    ) -> tuple[AsyncStream, AsyncIterator, list]:
+        """Open a stream, racing a second request if the first token is slow.
+
+        The backup is only sent once the primary has gone past the observed
+        time-to-first-token percentile; whichever delivers content first wins
+        and the other is cancelled and closed.
+        """
+        delay = self._hedge_delay(model)
+        if delay is None:
+            return await self._open_stream(messages, model)
+
+        primary = asyncio.create_task(self._open_stream(messages, model))
+        pending = {primary}
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            hedge = asyncio.create_task(self._open_stream(messages, model))
+            pending.add(hedge)
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next((t for t in done if t.exception() is None), None)
+                if winner is None:
+                    errors.extend(t.exception() for t in done)
+                    continue
+                HEDGED_REQUESTS.labels(
+                    "openai", "hedge" if winner is hedge else "primary"
+                ).inc()
+                pending |= done - {winner}
+                return winner.result()
+            raise errors[0]
+        finally:
+            if pending:
+                await _close_opened(pending)
+
+    def _json_modes(self, model: str) -> list[str]:
+        """Output modes to try, best first, skipping ones known to be refused."""
+        caps = self.capabilities.get(model)
+        modes = []
+        if caps.json_schema is not False:
+            modes.append("json_schema")
+        if caps.json_mode is not False:
+            modes.append("json")
+        modes.append("plain")
+        return modes
+
+    async def _call_api(
+        self, messages: list[dict], usage: TokenUsage | None, model: str
+    ) -> str:
+        for mode in self._json_modes(model):
+            kwargs: dict = {"messages": messages}
+            if mode in _RESPONSE_FORMATS:
+                kwargs["response_format"] = _RESPONSE_FORMATS[mode]()
+            try:
+                with PROVIDER_CALL_DURATION.labels("openai", model, mode).time():
+                    response = await self._create(model, **kwargs)
+            except (RateLimitError, APITimeoutError, APIError) as e:
+                if mode != "plain" and rejects_param(e, "response_format"):
+                    self.capabilities.mark(model, **{_MODE_FLAGS[mode]: False})
+                    continue
+                raise _provider_error(e) from e
+            if mode != "plain":
+                self.capabilities.mark(model, **{_MODE_FLAGS[mode]: True})
+            content = response.choices[0].message.content or ""
+            _record_usage(
+                usage, getattr(response, "usage", None), messages, content, model
             )
-            return response.choices[0].message.content or ""
-        except (RateLimitError, APITimeoutError, APIError) as e:
-            raise ProviderError(
-                message=f"OpenAI API error: {e}",
-                details={"provider": "openai", "error_type": type(e).__name__},
-            ) from e
+            return content
+        raise AssertionError("plain mode is always attempted")  # pragma: no cover
+
+    async def warm_connection(self) -> None:
+        """Open a pooled connection to the API so the first review skips the handshake."""
+        await self.client.models.retrieve(self.model)
+
+    async def probe_capabilities(self, model: str | None = None) -> None:
+        """Settle unknown capabilities with minimal requests (run at startup)."""
+        model = model or self.model
+        caps = self.capabilities.get(model)
+        # JSON mode requires the word "JSON" in the messages. No token cap: newer
+        # models refuse max_tokens, and that refusal would be indistinguishable
+        # from the output mode being unsupported; the reply is short anyway.
+        probe = [{"role": "user", "content": 'Reply with the JSON {"ok": true}'}]
+        for mode in ("json_schema", "json"):
+            if getattr(caps, _MODE_FLAGS[mode]) is not None:
+                continue
+            try:
+                await self._create(
+                    model, messages=probe, response_format=_RESPONSE_FORMATS[mode]()
+                )
+            except APIError as e:
+                if not rejects_param(e, "response_format"):
+                    raise
+                self.capabilities.mark(model, **{_MODE_FLAGS[mode]: False})
+            else:
+                self.capabilities.mark(model, **{_MODE_FLAGS[mode]: True})
+        if caps.stream_usage is None:
+            response, _chunks, _prefetched = await self._open_stream(probe, model)
+            await response.close()
+
+
+_RESPONSE_FORMATS = {
+    "json_schema": review_result_format,
+    "json": lambda: {"type": "json_object"},
+}
+_MODE_FLAGS = {"json_schema": "json_schema", "json": "json_mode"}
 
 
 _openai_provider: OpenAIProvider | None = None
@@ -181,6 +680,7 @@ def get_openai_provider() -> OpenAIProvider:
             message="OpenAI API key not configured",
             details={"provider": "openai"},
         )
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    # Retries are owned by OpenAIProvider so they stay visible to the breaker.
+    client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
     _openai_provider = OpenAIProvider(client=client, model=settings.openai_model)
     return _openai_provider
@@ -0,0 +1,197 @@
+"""Write-behind persistence for assistant messages.
+
+Streams finish independently, and each used to commit its single message in
+its own transaction; on SQLite those commits queue on the database write lock.
+The writer buffers messages (with their session usage and rollup updates) and
+commits them together once the batch is full or the oldest write has waited
+``window`` seconds. Callers that go on to read their own write await it, which
+bounds their latency by the window; others hand it off and return. Commits that
+hit lock contention are retried with backoff, a batch that still fails is
+retried one write at a time, and ``close`` drains the buffer at shutdown.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.metrics import DB_WRITE_BATCH_SIZE, DB_WRITE_RETRIES
+from app.models.review import ReviewMessage, ReviewSession
+from app.schemas.reviews import TokenUsage
+from app.services.analytics import record_message
+from app.services.history import bump_history_version
+from app.services.usage import record_session_usage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Write:
+    session: ReviewSession
+    content: dict
+    usage: TokenUsage | None
+    deadline: float
+    done: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+def _is_lock_contention(error: OperationalError) -> bool:
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+class MessageWriter:
+    def __init__(
+        self,
+        enabled: bool,
+        window: float,
+        batch_size: int,
+        max_retries: int,
+        retry_delay: float,
+    ):
+        self.enabled = enabled
+        self.window = window
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._pending: list[_Write] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+    async def write(
+        self,
+        session: ReviewSession,
+        content: dict,
+        usage: TokenUsage | None = None,
+        wait: bool = True,
+        max_delay: float | None = None,
+    ) -> None:
+        """Queue an assistant message for ``session``.
+
+        With ``wait`` the call returns once the message is committed, at most
+        ``max_delay`` (default: the window) plus one commit later; without it
+        the write is handed off and failures are only logged.
+        """
+        delay = self.window if max_delay is None else min(max_delay, self.window)
+        item = _Write(session, content, usage, time.monotonic() + delay)
+        if not self.enabled:
+            await self._commit([item])
+        else:
+            self._pending.append(item)
+            self._ensure_running()
+            self._wake.set()
+        if wait:
+            await asyncio.shield(item.done)
+        else:
+            item.done.add_done_callback(_log_failure)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            await self._wake.wait()
+            self._wake.clear()
+            while (
+                self._pending
+                and len(self._pending) < self.batch_size
+                and not self._closing
+            ):
+                timeout = min(w.deadline for w in self._pending) - time.monotonic()
+                if timeout <= 0:
+                    break
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Commit everything buffered so far."""
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            await self._commit(batch)
+
+    async def _commit(self, batch: list[_Write]) -> None:
+        DB_WRITE_BATCH_SIZE.observe(len(batch))
+        try:
+            await self._commit_with_retry(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0].done.done():
+                    batch[0].done.set_exception(e)
+                return
+            logger.warning("Batched message write failed; retrying one by one")
+            for item in batch:
+                await self._commit([item])
+            return
+        for item in batch:
+            if not item.done.done():
+                item.done.set_result(None)
+
+    async def _commit_with_retry(self, batch: list[_Write]) -> None:
+        attempt = 0
+        while True:
+            try:
+                async with async_session() as db:
+                    for item in batch:
+                        message = ReviewMessage(
+                            session_id=item.session.id,
+                            role="assistant",
+                            content_json=item.content,
+                        )
+                        db.add(message)
+                        await record_message(db, item.session, message)
+                        if item.usage is not None:
+                            await record_session_usage(db, item.session.id, item.usage)
+                    await bump_history_version(
+                        db, *(item.session.user_id for item in batch)
+                    )
+                    await db.commit()
+                return
+            except OperationalError as e:
+                if attempt >= self.max_retries or not _is_lock_contention(e):
+                    raise
+                DB_WRITE_RETRIES.inc()
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+                attempt += 1
+
+    async def close(self) -> None:
+        """Flush the buffer and stop the background flusher."""
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+        self._closing = False
+
+
+def _log_failure(done: asyncio.Future) -> None:
+    if not done.cancelled() and done.exception() is not None:
+        logger.error("Failed to persist review message", exc_info=done.exception())
+
+
+_message_writer: MessageWriter | None = None
+
+
+def get_message_writer() -> MessageWriter:
+    global _message_writer  # noqa: PLW0603
+    if _message_writer is None:
+        settings = get_settings()
+        _message_writer = MessageWriter(
+            enabled=settings.persist_batch_enabled,
+            window=settings.persist_batch_window_ms / 1000,
+            batch_size=settings.persist_batch_size,
+            max_retries=settings.persist_lock_retries,
+            retry_delay=settings.persist_lock_retry_delay_ms / 1000,
+        )
+    return _message_writer
@@ -1,4 +1,11 @@
-from app.schemas.reviews import ReviewSettings
+import difflib
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.schemas.reviews import ReviewResult, ReviewSettings
 
 REVIEW_SYSTEM_PROMPT = """\
 You are an expert code reviewer. Analyze the provided source code and return your review as raw JSON matching this exact schema:
@@ -63,16 +70,363 @@ _LANGUAGE_MAP = {
 }
 
 
-def build_user_prompt(code: str, language: str, settings: ReviewSettings) -> str:
-    parts = [f"Review the following {language} code:\n\n```{language}\n{code}\n```"]
+# Layout for provider prefix caching: everything derived from the mode and the
+# review settings goes in the system message, built once per combination, and
+# the per-request code goes last in the user message. Equivalent settings (focus
+# areas in any order) produce byte-identical prefixes.
 
-    parts.append(_STRICTNESS_MAP[settings.strictness])
-    parts.append(_DETAIL_MAP[settings.detail_level])
 
-    if settings.focus_areas:
-        areas = ", ".join(settings.focus_areas)
-        parts.append(f"Focus on: {areas}.")
+# For reviews split across several requests, where only one writes the file.
+_NO_CORRECTED_CODE = (
+    "Ignore the corrected_code rules above: another reviewer writes the corrected"
+    " code, so always set corrected_code to null."
+)
 
-    parts.append(_LANGUAGE_MAP[settings.output_language])
 
+@lru_cache(maxsize=256)
+def _system_prompt(
+    stream: bool,
+    strictness: str,
+    detail_level: str,
+    focus_areas: tuple[str, ...],
+    output_language: str,
+    corrected_code: bool,
+) -> str:
+    parts = [REVIEW_STREAM_SYSTEM_PROMPT if stream else REVIEW_SYSTEM_PROMPT]
+    parts.append(_STRICTNESS_MAP[strictness])
+    parts.append(_DETAIL_MAP[detail_level])
+    if focus_areas:
+        parts.append(f"Focus on: {', '.join(focus_areas)}.")
+    if not corrected_code:
+        parts.append(_NO_CORRECTED_CODE)
+    parts.append(_LANGUAGE_MAP[output_language])
     return "\n\n".join(parts)
+
+
+def build_system_prompt(
+    settings: ReviewSettings, stream: bool = False, corrected_code: bool = True
+) -> str:
+    return _system_prompt(
+        stream,
+        settings.strictness,
+        settings.detail_level,
+        tuple(sorted(set(settings.focus_areas))),
+        settings.output_language,
+        corrected_code,
+    )
+
+
+@lru_cache(maxsize=256)
+def prompt_cache_key(system_prompt: str) -> str:
+    """Stable key for the shared prefix, used to route requests to warm caches."""
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:32]
+
+
+def build_user_prompt(code: str, language: str) -> str:
+    return f"Review the following {language} code:\n\n```{language}\n{code}\n```"
+
+
+def build_review_messages(
+    code: str,
+    language: str,
+    settings: ReviewSettings,
+    stream: bool = False,
+    corrected_code: bool = True,
+) -> list[dict]:
+    system_prompt = build_system_prompt(settings, stream, corrected_code)
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": build_user_prompt(code, language)},
+    ]
+
+
+# --- Follow-up questions ----------------------------------------------------
+#
+# Follow-ups reuse the review's user message verbatim and replay the review as
+# the assistant's turn, so [system, code, review] is byte-identical for every
+# question on a session and stays in the provider's prefix cache.
+
+FOLLOWUP_SYSTEM_PROMPT = """\
+You are an expert code reviewer. You already reviewed the code below; your review is the first assistant message. Answer the user's follow-up questions about the code and the review.
+
+Rules:
+- Answer in plain prose; Markdown and short code snippets are fine. Do not output JSON and do not repeat the whole review.
+- Refer to lines by their number in the original code.
+- If a question is unrelated to the code or the review, say so briefly.\
+"""
+
+_ANSWER_LANGUAGE_MAP = {
+    "en": "Answer in English.",
+    "ja": "Answer in Japanese.",
+}
+
+
+@lru_cache(maxsize=8)
+def build_followup_system_prompt(output_language: str) -> str:
+    return f"{FOLLOWUP_SYSTEM_PROMPT}\n\n{_ANSWER_LANGUAGE_MAP[output_language]}"
+
+
+def build_review_replay(review: dict) -> str:
+    """The review as the assistant's turn, without the (large) corrected code."""
+    shown = {k: v for k, v in review.items() if k != "corrected_code"}
+    return json.dumps(shown, ensure_ascii=False, sort_keys=True)
+
+
+def build_history_digest(lines: list[str]) -> str:
+    return "Earlier follow-up questions (summarized):\n" + "\n".join(lines)
+
+
+# --- Code compaction ---------------------------------------------------------
+#
+# Optional pre-prompt pass that drops license headers, comment banners and extra
+# blank lines and shortens long single-line string literals. ``line_map`` keeps
+# the original line number of every surviving line so issue lines can be mapped
+# back, and ``restore`` re-applies the model's corrected code to the original.
+#
+# Lines are classified by a small lexer that tracks strings and block comments,
+# so only whole comments are ever dropped and nothing inside a string literal
+# or an unfinished block comment is touched.
+
+
+@dataclass(frozen=True)
+class _Syntax:
+    line_comment: str
+    block_comment: tuple[str, str] | None
+    # Delimiters of literals that may span lines, longest first.
+    multiline_quotes: tuple[str, ...]
+    quotes: tuple[str, ...]
+    # ``'x'`` is a character literal (otherwise ``'`` is a lifetime or plain).
+    char_literals: bool
+
+
+_C_BLOCK = ("/*", "*/")
+_SYNTAX = {
+    "python": _Syntax("#", None, ('"""', "'''"), ('"', "'"), False),
+    "javascript": _Syntax("//", _C_BLOCK, ("`",), ('"', "'"), False),
+    "typescript": _Syntax("//", _C_BLOCK, ("`",), ('"', "'"), False),
+    "go": _Syntax("//", _C_BLOCK, ("`",), ('"',), True),
+    "java": _Syntax("//", _C_BLOCK, ('"""',), ('"',), True),
+    "rust": _Syntax("//", _C_BLOCK, ('"',), (), True),
+    "c": _Syntax("//", _C_BLOCK, (), ('"',), True),
+    "cpp": _Syntax("//", _C_BLOCK, (), ('"',), True),
+}
+_CHAR_RE = re.compile(r"'(?:\\[^'\n]{1,10}|[^\\'\n])'")
+_LICENSE_RE = re.compile(r"licen[cs]e|copyright|spdx-license-identifier", re.I)
+_LONG_STRING_KEEP = 40
+# A quoted literal of at least 160 characters on a single line.
+_STRING_RE = re.compile(
+    r"""(?P<q>["'])(?P<body>(?:\\.|(?!(?P=q))[^\\\n]){160,}?)(?P=q)"""
+)
+# A whole-line comment that is only a rule of repeated punctuation.
+_BANNER_RE = re.compile(r"(?:#|//|/\*)[^\w]*?([=\-*#/~+_.<>])\1{2,}[^\w]*")
+
+
+@dataclass(frozen=True)
+class _Line:
+    starts_inside: bool  # opens inside a string or block comment
+    ends_inside: bool
+    comment_only: bool  # non-blank, and every character is part of a comment
+
+
+def _skip_string(line: str, i: int, quote: str) -> int | None:
+    """Index just past ``quote`` closing at or after ``i``; None if still open."""
+    while i < len(line):
+        if line[i] == "\\":
+            i += 2
+        elif line.startswith(quote, i):
+            return i + len(quote)
+        else:
+            i += 1
+    return None
+
+
+def _classify(lines: list[str], syntax: _Syntax) -> list[_Line]:
+    out: list[_Line] = []
+    closer: str | None = None  # what the open string or block comment ends with
+    in_comment = False
+    for line in lines:
+        starts_inside = closer is not None
+        comment_only = bool(line.strip())
+        i = 0
+        while i < len(line):
+            if closer is not None:
+                if in_comment:
+                    end = line.find(closer, i)
+                    end = None if end < 0 else end + len(closer)
+                else:
+                    comment_only = False
+                    end = _skip_string(line, i, closer)
+                if end is None:
+                    break
+                closer, i = None, end
+                continue
+            if line[i].isspace():
+                i += 1
+                continue
+            if line.startswith(syntax.line_comment, i):
+                break
+            if syntax.block_comment and line.startswith(syntax.block_comment[0], i):
+                closer, in_comment = syntax.block_comment[1], True
+                i += len(syntax.block_comment[0])
+                continue
+            comment_only = False
+            opened = next(
+                (q for q in syntax.multiline_quotes if line.startswith(q, i)), None
+            )
+            if opened is not None:
+                closer, in_comment = opened, False
+                i += len(opened)
+            elif syntax.char_literals and line[i] == "'":
+                match = _CHAR_RE.match(line, i)
+                i = match.end() if match else i + 1
+            elif line[i] in syntax.quotes:
+                i = _skip_string(line, i + 1, line[i]) or len(line)
+            else:
+                i += 1
+        out.append(_Line(starts_inside, closer is not None, comment_only))
+    return out
+
+
+@dataclass
+class CompactedCode:
+    original: str
+    code: str
+    line_map: list[int]
+    elided: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def identity(cls, code: str) -> "CompactedCode":
+        return cls(code, code, list(range(1, len(code.splitlines()) + 1)))
+
+    @property
+    def changed(self) -> bool:
+        return self.code != self.original
+
+    def original_line(self, line: int | None) -> int | None:
+        if line is None or not 1 <= line <= len(self.line_map):
+            return line
+        return self.line_map[line - 1]
+
+    def _unelide(self, line: str) -> str:
+        for marker, text in self.elided.items():
+            line = line.replace(marker, text)
+        return line
+
+    def restore(self, corrected: str | None) -> str | None:
+        """Apply edits made to the compacted code back onto the original."""
+        if corrected is None or not self.changed:
+            return corrected
+        original = self.original.splitlines()
+        compacted = self.code.splitlines()
+        new = corrected.splitlines()
+        out: list[str] = []
+        emitted = 0
+
+        def emit_gap(i: int) -> None:
+            nonlocal emitted
+            target = self.line_map[i] - 1
+            out.extend(original[emitted:target])
+            emitted = target
+
+        matcher = difflib.SequenceMatcher(None, compacted, new, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            for i in range(i1, i2):
+                emit_gap(i)
+                if tag == "equal":
+                    out.append(original[emitted])
+                emitted += 1
+            if tag != "equal":
+                out.extend(self._unelide(line) for line in new[j1:j2])
+        out.extend(original[emitted:])
+        return "\n".join(out) + ("\n" if corrected.endswith("\n") else "")
+
+    def remap_stream_line(self, line: str) -> str:
+        """Rewrite the line number of a streamed NDJSON issue line."""
+        if not self.changed:
+            return line
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            return line
+        if not isinstance(obj, dict) or obj.get("type") != "issue":
+            return line
+        if not isinstance(obj.get("line"), int):
+            return line
+        obj["line"] = self.original_line(obj["line"])
+        return json.dumps(obj, ensure_ascii=False)
+
+    def remap_result(self, result: ReviewResult) -> ReviewResult:
+        if not self.changed:
+            return result
+        issues = [
+            issue.model_copy(update={"line": self.original_line(issue.line)})
+            for issue in result.issues
+        ]
+        return result.model_copy(
+            update={
+                "issues": issues,
+                "corrected_code": self.restore(result.corrected_code),
+            }
+        )
+
+
+def _header_length(lines: list[str], kinds: list[_Line], start: int) -> int:
+    """End of a leading license/copyright comment block, else ``start``.
+
+    The block only ends where no comment is left open, so a block comment is
+    dropped whole or not at all.
+    """
+    end = safe = start
+    while end < len(lines) and (
+        kinds[end].comment_only
+        or (not lines[end].strip() and not kinds[end].starts_inside)
+    ):
+        end += 1
+        if not kinds[end - 1].ends_inside:
+            safe = end
+    return safe if _LICENSE_RE.search("\n".join(lines[start:safe])) else start
+
+
+def compact_code(code: str, language: str) -> CompactedCode:
+    lines = code.splitlines()
+    syntax = _SYNTAX.get(language.lower())
+    if syntax is None:
+        return CompactedCode.identity(code)
+    kinds = _classify(lines, syntax)
+    # Only lines that start and end outside strings and comments are edited.
+    free = [not k.starts_inside and not k.ends_inside for k in kinds]
+    drop = [False] * len(lines)
+    start = 1 if lines and lines[0].startswith("#!") else 0
+    for i in range(start, _header_length(lines, kinds, start)):
+        drop[i] = True
+    for i, line in enumerate(lines):
+        if free[i] and kinds[i].comment_only and _BANNER_RE.fullmatch(line.strip()):
+            drop[i] = True
+
+    kept: list[str] = []
+    line_map: list[int] = []
+    elided: dict[str, str] = {}
+
+    def shorten(match: re.Match) -> str:
+        body = match.group("body")
+        marker = f"…[+{len(body) - _LONG_STRING_KEEP} chars #{len(elided) + 1}]"
+        elided[marker] = body[_LONG_STRING_KEEP:]
+        quote = match.group("q")
+        return f"{quote}{body[:_LONG_STRING_KEEP]}{marker}{quote}"
+
+    for i, line in enumerate(lines):
+        if drop[i]:
+            continue
+        blank = free[i] and not line.strip()
+        if blank and (not kept or not kept[-1].strip()):
+            continue
+        kept.append(_STRING_RE.sub(shorten, line) if free[i] else line)
+        line_map.append(i + 1)
+    while kept and not kept[-1].strip() and free[line_map[-1] - 1]:
+        kept.pop()
+        line_map.pop()
+
+    compacted = "\n".join(kept) + ("\n" if code.endswith("\n") else "")
+    if len(compacted) >= len(code):
+        return CompactedCode.identity(code)
+    return CompactedCode(code, compacted, line_map, elided)
@@ -0,0 +1,146 @@
+"""Retry, hedging and circuit-breaker policies for upstream LLM calls."""
+
+import random
+import time
+from collections import deque
+
+from openai import APIConnectionError, APIError, APIStatusError
+
+from app.core.exceptions import ProviderUnavailableError
+from app.core.metrics import CIRCUIT_STATE
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(error: APIError) -> float | None:
+    """Server-requested delay from ``retry-after-ms`` / ``retry-after`` headers."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def is_retryable(error: APIError) -> bool:
+    if isinstance(error, APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS
+    return False
+
+
+def is_outage(error: APIError) -> bool:
+    """Errors that indicate upstream is unhealthy, as opposed to throttling us."""
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter that honors Retry-After."""
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, attempt: int, error: APIError) -> float | None:
+        """Delay before retry number ``attempt + 1``, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        requested = retry_after_seconds(error)
+        if requested is None:
+            return backoff
+        if requested > self.max_delay:
+            return None
+        return max(requested, backoff)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started_at: float | None = None
+        CIRCUIT_STATE.labels(name).set(self.CLOSED)
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(state)
+
+    def before_call(self) -> None:
+        """Raise ProviderUnavailableError while open; admit one probe when due."""
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        remaining = self.opened_at + self.reset_timeout - now
+        if self.state == self.OPEN and remaining <= 0:
+            self._set_state(self.HALF_OPEN)
+            self._probe_started_at = None
+        if self.state == self.HALF_OPEN and (
+            # A probe whose caller vanished without reporting must not wedge us.
+            self._probe_started_at is None
+            or now - self._probe_started_at > self.reset_timeout
+        ):
+            self._probe_started_at = now
+            return
+        raise ProviderUnavailableError(
+            retry_after=max(remaining, 1.0),
+            details={"provider": self.name, "circuit": "open"},
+        )
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_started_at = None
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self, error: APIError) -> None:
+        if not is_outage(error):
+            # Upstream answered (throttling or a client error), so it is up.
+            self.record_success()
+            return
+        self._probe_started_at = None
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.opened_at = time.monotonic()
+        self._set_state(self.OPEN)
+
+
+class LatencyTracker:
+    """Rolling window of samples with a cached percentile."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._cached: dict[float, float] = {}
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self._cached.clear()
+
+    def percentile(self, q: float) -> float | None:
+        if len(self._samples) < self._min_samples:
+            return None
+        if q not in self._cached:
+            ordered = sorted(self._samples)
+            self._cached[q] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return self._cached[q]
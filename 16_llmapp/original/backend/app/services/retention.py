@@ -0,0 +1,133 @@
+"""Set-based purging of review history.
+
+Sessions are deleted with plain ``DELETE ... WHERE id IN (...)`` statements and
+their messages go with them through the database's ``ON DELETE CASCADE``; no
+rows are loaded into the ORM. Their counts are subtracted from the analytics
+rollups in the same transaction. Work is split into batches of at most
+``batch_size`` sessions, each committed in its own short transaction with a
+pause in between, so a large purge never holds the SQLite write lock for long.
+
+The retention job applies the configured limits on a timer: a maximum age,
+a maximum number of sessions per user and a maximum number overall (oldest
+go first). Each worker runs its own loop; the deletes are idempotent, so
+overlapping runs only repeat empty queries.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import ColumnElement, Select, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.metrics import RETENTION_PURGED
+from app.models.review import ReviewSession
+from app.services.analytics import forget_sessions
+from app.services.history import bump_history_version
+
+logger = logging.getLogger(__name__)
+
+
+async def _delete_batch(db: AsyncSession, candidates: Select) -> int:
+    """Delete one batch of sessions selected as (id, user_id) rows."""
+    rows = (await db.execute(candidates)).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    await forget_sessions(db, ids)
+    await db.execute(
+        delete(ReviewSession)
+        .where(ReviewSession.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    await bump_history_version(db, *(row.user_id for row in rows))
+    return len(rows)
+
+
+async def delete_sessions(db: AsyncSession, where: ColumnElement[bool]) -> int:
+    """Delete every session matching ``where`` in the caller's transaction.
+
+    For small, request-scoped deletes; the same cleanup as ``purge`` but
+    unbatched.
+    """
+    candidates = select(ReviewSession.id, ReviewSession.user_id).where(where)
+    return await _delete_batch(db, candidates)
+
+
+async def purge(
+    where: ColumnElement[bool],
+    reason: str,
+    batch_size: int | None = None,
+    pause: float | None = None,
+) -> int:
+    """Delete every session matching ``where`` in bounded batches."""
+    settings = get_settings()
+    batch_size = batch_size or settings.retention_batch_size
+    pause = settings.retention_batch_pause_ms / 1000 if pause is None else pause
+    candidates = (
+        select(ReviewSession.id, ReviewSession.user_id)
+        .where(where)
+        .order_by(ReviewSession.id)
+        .limit(batch_size)
+    )
+    return await _purge_batches(candidates, reason, pause)
+
+
+async def _purge_batches(candidates: Select, reason: str, pause: float) -> int:
+    total = 0
+    while True:
+        async with async_session() as db:
+            deleted = await _delete_batch(db, candidates)
+            await db.commit()
+        if not deleted:
+            return total
+        total += deleted
+        RETENTION_PURGED.labels(reason).inc(deleted)
+        await asyncio.sleep(pause)
+
+
+def _beyond_newest(limit: int, per_user: bool) -> Select:
+    """Sessions past the newest ``limit`` (per user, or overall)."""
+    rank = func.row_number().over(
+        partition_by=ReviewSession.user_id if per_user else None,
+        order_by=(ReviewSession.created_at.desc(), ReviewSession.id.desc()),
+    )
+    ranked = select(
+        ReviewSession.id, ReviewSession.user_id, rank.label("rank")
+    ).subquery()
+    return select(ranked.c.id, ranked.c.user_id).where(ranked.c.rank > limit)
+
+
+async def apply_retention() -> int:
+    """Run one pass of every configured retention limit."""
+    settings = get_settings()
+    batch_size = settings.retention_batch_size
+    pause = settings.retention_batch_pause_ms / 1000
+    total = 0
+    if settings.retention_max_age_days > 0:
+        cutoff = datetime.now(UTC) - timedelta(days=settings.retention_max_age_days)
+        total += await purge(ReviewSession.created_at < cutoff, "max_age")
+    for limit, per_user, reason in (
+        (settings.retention_max_sessions_per_user, True, "max_per_user"),
+        (settings.retention_max_sessions, False, "max_total"),
+    ):
+        if limit > 0:
+            candidates = _beyond_newest(limit, per_user).limit(batch_size)
+            total += await _purge_batches(candidates, reason, pause)
+    return total
+
+
+async def run_retention() -> None:
+    """Apply retention limits every ``retention_interval_seconds`` until cancelled."""
+    interval = get_settings().retention_interval_seconds
+    while True:
+        try:
+            purged = await apply_retention()
+        except Exception:
+            logger.exception("Retention pass failed")
+        else:
+            if purged:
+                logger.info("Retention purged %d review sessions", purged)
+        await asyncio.sleep(interval)
@@ -0,0 +1,226 @@
+"""Two-tier cache of review results for repeated submissions.
+
+The exact tier matches byte-identical code. The fuzzy tier matches code whose
+normalized token stream is identical: comments and whitespace are dropped
+(Python via ``tokenize``, other languages via a small lexer), so reformatting,
+comment edits and trailing newlines still hit. Issue lines from a fuzzy hit are
+mapped onto the new layout through token positions; corrected_code is not
+served from a fuzzy hit because it would undo the user's edits. Entries are
+scoped to the submitting user, so a review is only ever replayed to the user it
+was generated for. Entries expire after a TTL and are evicted LRU. State is per
+process.
+"""
+
+import bisect
+import hashlib
+import io
+import json
+import re
+import time
+import tokenize
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal
+
+from app.core.config import get_settings
+from app.core.metrics import REVIEW_CACHE_ENTRIES, REVIEW_CACHE_LOOKUPS
+from app.schemas.reviews import CacheMarker, ReviewResult, ReviewSettings
+
+_C_COMMENTS = {"javascript", "typescript", "java", "go", "rust", "c", "cpp"}
+_HASH_COMMENTS = {"python", "ruby", "shell", "bash", "perl", "r", "yaml"}
+
+_STRING = r"""(?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"""
+_REST = r"(?P<word>\w+)|(?P<op>\S)"
+_LEXERS = {
+    "c": re.compile(rf"(?P<comment>//[^\n]*|/\*.*?\*/)|{_STRING}|{_REST}", re.S),
+    "hash": re.compile(rf"(?P<comment>#[^\n]*)|{_STRING}|{_REST}", re.S),
+    "none": re.compile(rf"{_STRING}|{_REST}", re.S),
+}
+
+
+@dataclass
+class Fingerprint:
+    digest: str
+    token_lines: list[int]  # 1-based source line of each normalized token
+
+    def first_token_by_line(self, line_count: int) -> list[int]:
+        """For each line, the index of the first token on or after it."""
+        return [
+            bisect.bisect_left(self.token_lines, line)
+            for line in range(1, line_count + 1)
+        ]
+
+
+def _python_tokens(code: str) -> list[tuple[str, int]]:
+    tokens = []
+    for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+        if tok.type in (tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER):
+            continue
+        if tok.type == tokenize.NEWLINE:
+            text = "\n"
+        elif tok.type == tokenize.INDENT:
+            text = "<indent>"
+        elif tok.type == tokenize.DEDENT:
+            text = "<dedent>"
+        else:
+            text = tok.string
+        tokens.append((text, tok.start[0]))
+    return tokens
+
+
+def _lexer_tokens(code: str, language: str) -> list[tuple[str, int]]:
+    if language in _C_COMMENTS:
+        lexer = _LEXERS["c"]
+    elif language in _HASH_COMMENTS:
+        lexer = _LEXERS["hash"]
+    else:
+        lexer = _LEXERS["none"]
+    line_starts = [0] + [m.end() for m in re.finditer("\n", code)]
+    return [
+        (m.group(), bisect.bisect_right(line_starts, m.start()))
+        for m in lexer.finditer(code)
+        if m.lastgroup != "comment"
+    ]
+
+
+def fingerprint(code: str, language: str) -> Fingerprint:
+    language = language.lower()
+    tokens = None
+    if language == "python":
+        try:
+            tokens = _python_tokens(code)
+        except (tokenize.TokenError, SyntaxError):
+            tokens = None
+    if tokens is None:
+        tokens = _lexer_tokens(code, language)
+    digest = hashlib.sha256("\x00".join(t for t, _ in tokens).encode()).hexdigest()
+    return Fingerprint(digest, [line for _, line in tokens])
+
+
+@dataclass
+class _Entry:
+    result: ReviewResult
+    first_token_by_line: list[int]
+    created_at: float
+
+
+@dataclass
+class CacheHit:
+    result: ReviewResult
+    kind: Literal["exact", "fuzzy"]
+    age_seconds: float
+
+    @property
+    def marker(self) -> CacheMarker:
+        return CacheMarker(kind=self.kind, age_seconds=round(self.age_seconds))
+
+    def content(self) -> dict:
+        """Message payload with the marker clients use to label cached results."""
+        return {**self.result.model_dump(), "cached": self.marker.model_dump()}
+
+
+def _scope_key(user_id: int, language: str, settings: ReviewSettings) -> str:
+    data = settings.model_dump()
+    data["focus_areas"] = sorted(set(data["focus_areas"]))
+    return f"{user_id}:{language.lower()}:{json.dumps(data, sort_keys=True)}"
+
+
+class ReviewCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, fuzzy: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.fuzzy = fuzzy
+        self._entries: OrderedDict[tuple[str, str, str], _Entry] = OrderedDict()
+        self._expired = False
+
+    def _get(self, key: tuple[str, str, str]) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            REVIEW_CACHE_ENTRIES.set(len(self._entries))
+            self._expired = True
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put(self, key: tuple[str, str, str], entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        REVIEW_CACHE_ENTRIES.set(len(self._entries))
+
+    def lookup(
+        self, user_id: int, code: str, language: str, settings: ReviewSettings
+    ) -> CacheHit | None:
+        scope = _scope_key(user_id, language, settings)
+        exact = hashlib.sha256(code.encode()).hexdigest()
+        self._expired = False
+        entry = self._get(("exact", scope, exact))
+        if entry is not None:
+            REVIEW_CACHE_LOOKUPS.labels("exact_hit").inc()
+            return CacheHit(entry.result, "exact", time.time() - entry.created_at)
+        if self.fuzzy:
+            new = fingerprint(code, language)
+            entry = self._get(("fuzzy", scope, new.digest))
+            if entry is not None:
+                REVIEW_CACHE_LOOKUPS.labels("fuzzy_hit").inc()
+                result = _remap(entry, new)
+                return CacheHit(result, "fuzzy", time.time() - entry.created_at)
+        REVIEW_CACHE_LOOKUPS.labels("stale" if self._expired else "miss").inc()
+        return None
+
+    def store(
+        self,
+        user_id: int,
+        code: str,
+        language: str,
+        settings: ReviewSettings,
+        result: ReviewResult,
+    ) -> None:
+        scope = _scope_key(user_id, language, settings)
+        now = time.time()
+        exact = hashlib.sha256(code.encode()).hexdigest()
+        self._put(("exact", scope, exact), _Entry(result, [], now))
+        if self.fuzzy:
+            fp = fingerprint(code, language)
+            by_line = fp.first_token_by_line(len(code.splitlines()))
+            self._put(("fuzzy", scope, fp.digest), _Entry(result, by_line, now))
+
+
+def _remap(entry: _Entry, new: Fingerprint) -> ReviewResult:
+    """Move issue lines from the cached layout onto the new submission's."""
+
+    def new_line(line: int | None) -> int | None:
+        if line is None or not 1 <= line <= len(entry.first_token_by_line):
+            return line
+        index = entry.first_token_by_line[line - 1]
+        if not new.token_lines:
+            return line
+        return new.token_lines[min(index, len(new.token_lines) - 1)]
+
+    issues = [
+        issue.model_copy(update={"line": new_line(issue.line)})
+        for issue in entry.result.issues
+    ]
+    return entry.result.model_copy(update={"issues": issues, "corrected_code": None})
+
+
+_review_cache: ReviewCache | None = None
+
+
+def get_review_cache() -> ReviewCache | None:
+    """The process-wide cache, or None when caching is disabled."""
+    global _review_cache  # noqa: PLW0603
+    settings = get_settings()
+    if not settings.review_cache_enabled:
+        return None
+    if _review_cache is None:
+        _review_cache = ReviewCache(
+            max_entries=settings.review_cache_max_entries,
+            ttl_seconds=settings.review_cache_ttl_seconds,
+            fuzzy=settings.review_cache_fuzzy,
+        )
+    return _review_cache
@@ -0,0 +1,108 @@
+"""Model routing between a fast and a strong model.
+
+Small, lenient reviews go to the fast model; large prompts, strict reviews and
+security-focused reviews go to the strong one. When the strong model's recent
+time-to-first-token is over budget, requests that the fast model can handle
+are moved over. Each route lists the other model as its fallback.
+"""
+
+from dataclasses import dataclass
+
+from app.core.config import get_settings
+from app.core.metrics import MODEL_ROUTES
+from app.schemas.reviews import PromptEstimate, ReviewSettings
+from app.services.llm import OpenAIProvider
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    models: tuple[str, ...]
+    reason: str
+
+    @property
+    def model(self) -> str:
+        return self.models[0]
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        enabled: bool,
+        fast_model: str,
+        strong_model: str,
+        fast_max_prompt_tokens: int,
+        strong_latency_budget: float,
+    ):
+        self.enabled = enabled
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.fast_max_prompt_tokens = fast_max_prompt_tokens
+        self.strong_latency_budget = strong_latency_budget
+
+    def _needs_strong(self, prompt_tokens: int, settings: ReviewSettings) -> str | None:
+        if prompt_tokens > self.fast_max_prompt_tokens:
+            return "large_prompt"
+        if settings.strictness == "strict":
+            return "strict"
+        if "security" in settings.focus_areas:
+            return "security_focus"
+        if len(settings.focus_areas) > 2:
+            return "broad_focus"
+        return None
+
+    def _fits(self, provider: OpenAIProvider, model: str, tokens: int) -> bool:
+        max_context = provider.capabilities.get(model).max_context
+        return max_context is None or tokens <= max_context
+
+    def route(
+        self,
+        provider: OpenAIProvider,
+        estimate: PromptEstimate,
+        settings: ReviewSettings,
+    ) -> Route:
+        """Pick models for a review, dropping any whose context it would overflow."""
+        prompt_tokens = estimate.prompt_tokens
+        if not self.enabled:
+            route = Route("default", (provider.model,), "routing_disabled")
+        else:
+            fast, strong = self.fast_model, self.strong_model
+            reason = self._needs_strong(prompt_tokens, settings)
+            if reason is None:
+                route = Route("fast", (fast, strong), "small_lenient")
+            elif reason != "large_prompt" and self._strong_is_slow(provider):
+                route = Route("fast", (fast, strong), "strong_model_slow")
+            else:
+                route = Route("strong", (strong, fast), reason)
+            models = tuple(
+                m
+                for m in route.models
+                if self._fits(provider, m, estimate.total_tokens)
+            )
+            if models and models != route.models:
+                route = Route(route.name, models, route.reason)
+        MODEL_ROUTES.labels(route.name, route.model).inc()
+        return route
+
+    def _strong_is_slow(self, provider: OpenAIProvider) -> bool:
+        if self.strong_latency_budget <= 0:
+            return False
+        p95 = provider.ttft(self.strong_model).percentile(0.95)
+        return p95 is not None and p95 > self.strong_latency_budget
+
+
+_model_router: ModelRouter | None = None
+
+
+def get_model_router() -> ModelRouter:
+    global _model_router  # noqa: PLW0603
+    if _model_router is None:
+        settings = get_settings()
+        _model_router = ModelRouter(
+            enabled=settings.routing_enabled,
+            fast_model=settings.routing_fast_model,
+            strong_model=settings.routing_strong_model,
+            fast_max_prompt_tokens=settings.routing_fast_max_prompt_tokens,
+            strong_latency_budget=settings.routing_strong_latency_budget_seconds,
+        )
+    return _model_router
@@ -0,0 +1,133 @@
+"""Priority-class scheduler for provider concurrency slots.
+
+Waiters are grouped into priority classes. Within a class, users share slots by
+weighted fair queueing: each request gets a virtual finish tag of
+``max(class_virtual_time, user_last_finish) + cost``, so a user submitting a
+burst cannot starve others in the same class. Across classes the head of each
+queue competes on ``rank - waited / aging_seconds``, which keeps interactive
+work ahead while guaranteeing that bulk work eventually runs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Literal
+
+from app.core.metrics import PROVIDER_QUEUE_DEPTH, SCHEDULER_WAIT
+
+Priority = Literal["interactive", "standard", "bulk"]
+
+PRIORITIES: tuple[Priority, ...] = ("interactive", "standard", "bulk")
+_RANK: dict[str, int] = {p: i for i, p in enumerate(PRIORITIES)}
+_MAX_TRACKED_USERS = 10_000
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish: float
+    seq: int
+    user_id: int = field(compare=False)
+    priority: Priority = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class PriorityScheduler:
+    def __init__(self, capacity: int, aging_seconds: float, bulk_max_share: float):
+        self.capacity = capacity
+        self.aging_seconds = aging_seconds
+        self.bulk_limit = max(1, math.floor(capacity * bulk_max_share))
+        self.in_use = 0
+        self._in_use_by_class = dict.fromkeys(PRIORITIES, 0)
+        self._queues: dict[str, list[_Waiter]] = {p: [] for p in PRIORITIES}
+        self._virtual_time = dict.fromkeys(PRIORITIES, 0.0)
+        self._last_finish: dict[str, dict[int, float]] = {p: {} for p in PRIORITIES}
+        self._seq = itertools.count()
+        self.waiting = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_use >= self.capacity
+
+    def _class_has_room(self, priority: str) -> bool:
+        return priority != "bulk" or self._in_use_by_class["bulk"] < self.bulk_limit
+
+    def _head(self, priority: str) -> _Waiter | None:
+        queue = self._queues[priority]
+        while queue and queue[0].future.done():
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self.in_use < self.capacity:
+            best: _Waiter | None = None
+            best_score = math.inf
+            for priority in PRIORITIES:
+                if not self._class_has_room(priority):
+                    continue
+                head = self._head(priority)
+                if head is None:
+                    continue
+                score = _RANK[priority] - (now - head.enqueued_at) / self.aging_seconds
+                if score < best_score:
+                    best, best_score = head, score
+            if best is None:
+                return
+
+            heapq.heappop(self._queues[best.priority])
+            self.waiting -= 1
+            PROVIDER_QUEUE_DEPTH.labels(best.priority).dec()
+            self._virtual_time[best.priority] = best.finish
+            self.in_use += 1
+            self._in_use_by_class[best.priority] += 1
+            SCHEDULER_WAIT.labels(best.priority).observe(now - best.enqueued_at)
+            best.future.set_result(None)
+
+    def _finish_tag(self, user_id: int, priority: str, cost: float) -> float:
+        last_finish = self._last_finish[priority]
+        virtual = self._virtual_time[priority]
+        if len(last_finish) >= _MAX_TRACKED_USERS:
+            for uid in [u for u, f in last_finish.items() if f <= virtual]:
+                del last_finish[uid]
+        finish = max(virtual, last_finish.get(user_id, 0.0)) + cost
+        last_finish[user_id] = finish
+        return finish
+
+    async def acquire(self, user_id: int, priority: Priority, cost: float) -> None:
+        """Wait for a slot. Cancelling the caller withdraws the request."""
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(
+            finish=self._finish_tag(user_id, priority, max(cost, 1.0)),
+            seq=next(self._seq),
+            user_id=user_id,
+            priority=priority,
+            enqueued_at=time.monotonic(),
+            future=future,
+        )
+        heapq.heappush(self._queues[priority], waiter)
+        self.waiting += 1
+        PROVIDER_QUEUE_DEPTH.labels(priority).inc()
+        self._dispatch()
+        if future.done():
+            return
+
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted while we were giving up: hand the slot on.
+                self.release(priority)
+            else:
+                future.cancel()
+                self.waiting -= 1
+                PROVIDER_QUEUE_DEPTH.labels(priority).dec()
+            raise
+
+    def release(self, priority: Priority) -> None:
+        self.in_use -= 1
+        self._in_use_by_class[priority] -= 1
+        self._dispatch()
@@ -0,0 +1,51 @@
+"""Token counting with tiktoken when available, a character heuristic otherwise."""
+
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Code averages well under 4 characters per token (symbols, indentation, short
+# identifiers), so the fallback errs high: budgets and rate limits would rather
+# overestimate than let an oversized prompt through.
+_CHARS_PER_TOKEN = 3
+# Per-message framing overhead of the chat format (role markers, separators).
+_TOKENS_PER_MESSAGE = 4
+_TOKENS_PER_REPLY = 3
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:  # pragma: no cover - declared, but keep the fallback
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Encodings are downloaded on first use; offline hosts fall back.
+        logger.warning("tiktoken encoding unavailable for %s; estimating", model)
+        return None
+
+
+def has_tokenizer(model: str) -> bool:
+    """False when counts for ``model`` are the character heuristic."""
+    return _encoding(model) is not None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: list[dict], model: str) -> int:
+    """Estimate prompt tokens for a chat completion request."""
+    total = _TOKENS_PER_REPLY
+    for message in messages:
+        total += _TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "", model)
+    return total
@@ -0,0 +1,107 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.exceptions import QuotaExceededError
+from app.models.review import ReviewSession
+from app.schemas.reviews import TokenUsage
+
+_SESSION_TOKENS = ReviewSession.prompt_tokens + ReviewSession.completion_tokens
+
+
+async def record_session_usage(
+    db: AsyncSession, session_id: int, usage: TokenUsage
+) -> None:
+    """Add ``usage`` to the session's counters (the review, then any follow-ups)."""
+    values = {
+        "prompt_tokens": ReviewSession.prompt_tokens + usage.prompt_tokens,
+        "completion_tokens": ReviewSession.completion_tokens + usage.completion_tokens,
+        "cached_tokens": ReviewSession.cached_tokens + usage.cached_tokens,
+        "usage_estimated": ReviewSession.usage_estimated | usage.estimated,
+    }
+    if usage.model is not None:
+        # The model that actually served the request, after any fallback.
+        values["model"] = usage.model
+    await db.execute(
+        update(ReviewSession).where(ReviewSession.id == session_id).values(**values)
+    )
+
+
+def quota_window_start() -> datetime:
+    hours = get_settings().token_quota_window_hours
+    return datetime.now(UTC) - timedelta(hours=hours)
+
+
+async def tokens_used_since(
+    db: AsyncSession, user_id: int, since: datetime
+) -> tuple[int, int]:
+    """Return (prompt_tokens, completion_tokens) recorded since ``since``."""
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(ReviewSession.prompt_tokens), 0),
+            func.coalesce(func.sum(ReviewSession.completion_tokens), 0),
+        ).where(ReviewSession.user_id == user_id, ReviewSession.created_at >= since)
+    )
+    prompt, completion = result.one()
+    return int(prompt), int(completion)
+
+
+async def _seconds_until_below_quota(
+    db: AsyncSession, user_id: int, since: datetime, excess: int
+) -> float:
+    """Time until enough of the oldest in-window usage ages out to clear ``excess``."""
+    result = await db.execute(
+        select(ReviewSession.created_at, _SESSION_TOKENS)
+        .where(ReviewSession.user_id == user_id, ReviewSession.created_at >= since)
+        .order_by(ReviewSession.created_at)
+    )
+    freed = 0
+    for created_at, tokens in result:
+        freed += tokens
+        if freed >= excess:
+            expires = created_at.replace(tzinfo=UTC) - since.replace(tzinfo=UTC)
+            return max(expires.total_seconds(), 1.0)
+    return get_settings().token_quota_window_hours * 3600.0
+
+
+async def enforce_token_quota(db: AsyncSession, user_id: int) -> None:
+    """Raise QuotaExceededError if the user's rolling window usage is at quota."""
+    quota = get_settings().token_quota
+    if quota <= 0:
+        return
+    since = quota_window_start()
+    prompt, completion = await tokens_used_since(db, user_id, since)
+    used = prompt + completion
+    if used < quota:
+        return
+    retry_after = await _seconds_until_below_quota(db, user_id, since, used - quota + 1)
+    raise QuotaExceededError(
+        retry_after=retry_after,
+        details={"quota": quota, "used": used},
+    )
+
+
+async def daily_usage(
+    db: AsyncSession, user_id: int, days: int
+) -> list[tuple[str, int, int, int]]:
+    """Per-day (day, reviews, prompt_tokens, completion_tokens) for the user."""
+    since = datetime.now(UTC) - timedelta(days=days - 1)
+    day = func.date(ReviewSession.created_at)
+    result = await db.execute(
+        select(
+            day,
+            func.count(),
+            func.sum(ReviewSession.prompt_tokens),
+            func.sum(ReviewSession.completion_tokens),
+        )
+        .where(
+            ReviewSession.user_id == user_id,
+            ReviewSession.created_at
+            >= since.replace(hour=0, minute=0, second=0, microsecond=0),
+        )
+        .group_by(day)
+        .order_by(day)
+    )
+    return [tuple(row) for row in result]
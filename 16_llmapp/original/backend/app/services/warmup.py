@@ -0,0 +1,136 @@
+"""Startup pre-warming and readiness.
+
+Importing the app defines routes and still loads FastAPI, SQLAlchemy and the
+OpenAI SDK (whose exception types the provider code catches), which make up
+nearly all of the import phase; only python-jose and tiktoken are deferred.
+Connections, tokenizer tables and those imports are set up here instead of on
+the first user request. The lifespan hook starts ``warm_up`` in the background
+so the worker binds its port right away, and ``/api/health/ready`` reports 503
+until every step has finished. Import time and time-to-ready are logged and
+exported as metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+
+from app import IMPORT_STARTED
+from app.core.config import get_settings
+from app.core.database import engine
+from app.core.metrics import STARTUP_SECONDS
+from app.core.security import create_access_token, decode_access_token
+from app.schemas.reviews import ReviewRequest, ReviewResult, TokenUsage
+from app.services.llm import get_openai_provider
+from app.services.prompts import build_review_messages
+from app.services.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_DB_WARM_CONNECTIONS = 4
+_SAMPLE_RESULT = (
+    '{"summary": "ok", "issues": [{"line": 1, "severity": "info", '
+    '"message": "m", "suggestion": null}], "suggestions": [], '
+    '"corrected_code": null}'
+)
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self.ready = False
+        self.import_seconds: float | None = None
+        self.ready_seconds: float | None = None
+        self.steps: dict[str, float | str] = {}
+
+    def imports_done(self) -> None:
+        self.import_seconds = time.perf_counter() - IMPORT_STARTED
+        STARTUP_SECONDS.labels("imports").set(self.import_seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "ready_seconds": self.ready_seconds,
+            "steps": self.steps,
+        }
+
+
+async def _warm_db() -> None:
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrent checkouts so the pool holds several open connections.
+    await asyncio.gather(*(ping() for _ in range(_DB_WARM_CONNECTIONS)))
+
+
+async def _warm_openai() -> None:
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return
+    provider = get_openai_provider()
+    if settings.llm_probe_capabilities:
+        await provider.probe_capabilities()
+    else:
+        await provider.warm_connection()
+
+
+async def _warm_codecs() -> None:
+    """First use of pydantic validators, prompt caches, JWT and the tokenizer."""
+    request = ReviewRequest.model_validate({"code": "x = 1\n", "language": "python"})
+    ReviewResult.model_validate_json(_SAMPLE_RESULT).model_dump_json()
+    TokenUsage().model_dump_json()
+    for stream in (False, True):
+        build_review_messages(request.code, request.language, request.settings, stream)
+    decode_access_token(create_access_token(0))
+    # Tokenizer tables are large; load them off the event loop.
+    await asyncio.to_thread(count_tokens, "warm up", get_settings().openai_model)
+
+
+_STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "db": _warm_db,
+    "codecs": _warm_codecs,
+    "openai": _warm_openai,
+}
+
+
+async def warm_up(readiness: Readiness) -> None:
+    """Run every warm-up step, then mark the worker ready.
+
+    A failed step is logged and recorded but does not hold readiness back; the
+    work it skipped just happens on the first request instead.
+    """
+
+    async def run(name: str, step: Callable[[], Awaitable[None]]) -> None:
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+            readiness.steps[name] = f"failed: {type(e).__name__}"
+        else:
+            elapsed = time.perf_counter() - start
+            readiness.steps[name] = round(elapsed, 4)
+            STARTUP_SECONDS.labels(f"warm_{name}").set(elapsed)
+
+    await asyncio.gather(*(run(name, step) for name, step in _STEPS.items()))
+    readiness.ready_seconds = time.perf_counter() - IMPORT_STARTED
+    readiness.ready = True
+    STARTUP_SECONDS.labels("ready").set(readiness.ready_seconds)
+    logger.info(
+        "Ready in %.2fs (imports %.2fs)",
+        readiness.ready_seconds,
+        readiness.import_seconds or 0.0,
+    )
+
+
+_readiness: Readiness | None = None
+
+
+def get_readiness() -> Readiness:
+    global _readiness  # noqa: PLW0603
+    if _readiness is None:
+        _readiness = Readiness()
+    return _readiness
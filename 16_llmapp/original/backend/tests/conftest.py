@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read once, on first use; point the app at a scratch database
+# before anything imports it.
+_DB_DIR = tempfile.mkdtemp(prefix="reviewer-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/test.db"
+
+from app.core.database import async_session, engine  # noqa: E402
+from app.models import Base, User  # noqa: E402
+
+
+@pytest.fixture
+async def db():
+    """A session on a freshly created schema."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user(db):
+    user = User(email="tester@example.com", password_hash="x")
+    db.add(user)
+    await db.commit()
+    return user
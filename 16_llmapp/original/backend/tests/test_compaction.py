@@ -0,0 +1,96 @@
+from app.services.prompts import CompactedCode, compact_code
+
+C_BANNER = """\
+#include <stdio.h>
+
+/*****************************
+ * Helper that adds two numbers.
+ *****************************/
+int add(int a, int b) {
+    return a + b;
+}
+"""
+
+PY_DOCSTRING = '''\
+def report():
+    """Print the report.
+
+    # ======================
+
+
+    Sections follow.
+    """
+    return 1
+'''
+
+
+def test_c_banner_block_comment_is_kept_whole():
+    compacted = compact_code(C_BANNER, "c")
+    assert "/*****************************" in compacted.code
+    assert " * Helper that adds two numbers." in compacted.code
+    assert " *****************************/" in compacted.code
+
+
+def test_python_string_contents_are_untouched():
+    compacted = compact_code(PY_DOCSTRING, "python")
+    assert compacted.code == PY_DOCSTRING
+    assert not compacted.changed
+
+
+def test_whole_line_banners_and_extra_blank_lines_are_dropped():
+    code = "x = 1\n# ----------\n\n\n\ny = '# ====='\n// not a comment here\n"
+    compacted = compact_code(code, "python")
+    assert compacted.code == "x = 1\n\ny = '# ====='\n// not a comment here\n"
+    assert compacted.line_map == [1, 3, 6, 7]
+
+
+def test_single_line_block_banner_is_dropped():
+    code = "int a;\n/* ========== */\nint b;\n"
+    compacted = compact_code(code, "c")
+    assert compacted.code == "int a;\nint b;\n"
+    assert compacted.original_line(2) == 3
+
+
+def test_license_header_block_is_dropped_whole():
+    code = "/*\n * Copyright 2024 Example\n * SPDX-License-Identifier: MIT\n */\n\nint main(void) { return 0; }\n"
+    compacted = compact_code(code, "c")
+    assert compacted.code == "int main(void) { return 0; }\n"
+    assert compacted.original_line(1) == 6
+
+
+def test_header_that_closes_before_code_is_kept():
+    code = "/* Copyright 2024\n */ int x;\nint y;\n"
+    assert compact_code(code, "c").code == code
+
+
+def test_rust_lifetimes_do_not_open_strings():
+    code = "fn f<'a>(x: &'a str) {}\n// ==========\nfn g() {}\n"
+    assert compact_code(code, "rust").code == "fn f<'a>(x: &'a str) {}\nfn g() {}\n"
+
+
+def test_unknown_language_is_left_alone():
+    code = "a\n\n\n\nb\n"
+    assert compact_code(code, "brainfuck").code == code
+
+
+def test_long_string_is_elided_and_restored():
+    literal = "x" * 200
+    code = f'# ----------\nmsg = "{literal}"\nprint(msg)\n'
+    compacted = compact_code(code, "python")
+    assert literal not in compacted.code
+    corrected = compacted.code.replace("print(msg)", "print(msg.strip())")
+    restored = compacted.restore(corrected)
+    assert restored == f'# ----------\nmsg = "{literal}"\nprint(msg.strip())\n'
+
+
+def test_restore_keeps_dropped_lines_around_edits():
+    code = "a = 1\n# ==========\nb = 2\n\n\n\nc = 3\n"
+    compacted = compact_code(code, "python")
+    corrected = compacted.code.replace("b = 2", "b = 20")
+    assert compacted.restore(corrected) == "a = 1\n# ==========\nb = 20\n\n\n\nc = 3\n"
+
+
+def test_identity_restore_is_passthrough():
+    compacted = CompactedCode.identity("a\n")
+    assert compacted.restore("b\n") == "b\n"
+    assert compacted.original_line(1) == 1
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from app.core.exceptions import ProviderError
+from app.schemas.reviews import ReviewIssue, ReviewResult, ReviewSettings, TokenUsage
+from app.services.fanout import (
+    IssueMerger,
+    merge_corrected_code,
+    review_fanout,
+    stream_fanout,
+)
+
+AREAS = ["security", "performance", "readability"]
+ORIGINAL = "a = 1\nb = 2\nc = 3\nd = 4\n"
+
+
+def _issue(line, message, severity="warning"):
+    return ReviewIssue(line=line, message=message, severity=severity)
+
+
+def test_issue_merger_drops_near_duplicates_on_the_same_line():
+    merger = IssueMerger()
+
+    assert merger.add(_issue(3, "Unused variable x"))
+    assert not merger.add(_issue(3, "Unused variable 'x'"))
+    assert merger.add(_issue(4, "Unused variable x"))
+    assert merger.add(_issue(3, "SQL built from user input"))
+
+    assert [(i.line, i.message) for i in merger.issues] == [
+        (3, "Unused variable x"),
+        (4, "Unused variable x"),
+        (3, "SQL built from user input"),
+    ]
+
+
+def test_issue_merger_keeps_the_higher_severity_duplicate():
+    merger = IssueMerger()
+    merger.add(_issue(1, "Possible injection", "info"))
+    merger.add(_issue(1, "Possible injection!", "error"))
+    merger.add(_issue(1, "Possible injection.", "warning"))
+
+    assert len(merger.issues) == 1
+    assert merger.issues[0].severity == "error"
+    assert merger.issues[0].message == "Possible injection!"
+
+
+def test_merge_corrected_code_combines_disjoint_edits():
+    first = "a = 10\nb = 2\nc = 3\nd = 4\n"
+    second = "a = 1\nb = 2\nc = 3\nd = 40\n"
+
+    assert merge_corrected_code(ORIGINAL, [first, second]) == (
+        "a = 10\nb = 2\nc = 3\nd = 40\n"
+    )
+
+
+def test_merge_corrected_code_keeps_the_first_of_overlapping_edits():
+    first = "a = 10\nb = 2\nc = 3\nd = 4\n"
+    second = "a = 100\nb = 2\nc = 3\nd = 4\n"
+
+    assert merge_corrected_code(ORIGINAL, [first, second]) == first
+
+
+def test_merge_corrected_code_ignores_missing_and_unchanged_candidates():
+    first = "a = 1\nb = 2\nc = 30\nd = 4\n"
+
+    assert merge_corrected_code(ORIGINAL, [None, ORIGINAL]) is None
+    assert merge_corrected_code(ORIGINAL, [None, first, ORIGINAL]) == first
+
+
+class _Provider:
+    """Answers per focus area; areas in ``failing`` raise ProviderError."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.systems: list[str] = []
+
+    def _answer(self, messages) -> ReviewResult:
+        system = messages[0]["content"]
+        self.systems.append(system)
+        area = system.split("Focus on: ")[1].split(".")[0]
+        if area in self.failing:
+            raise ProviderError(f"{area} failed")
+        return ReviewResult(
+            summary=area,
+            issues=[_issue(AREAS.index(area) + 1, f"{area} issue")],
+        )
+
+    async def review_messages(self, messages, usage=None, models=None):
+        result = self._answer(messages)
+        usage.completion_tokens = 10
+        return result
+
+    async def stream_messages(self, messages, usage=None, models=None):
+        usage.completion_tokens = 10
+        result = self._answer(messages)
+        for issue in result.issues:
+            yield json.dumps({"type": "issue", **issue.model_dump()}) + "\n"
+        yield json.dumps({"type": "result", "result": result.model_dump()}) + "\n"
+
+
+async def test_only_the_first_branch_writes_corrected_code():
+    provider = _Provider()
+    await review_fanout(
+        provider, AREAS, ORIGINAL, "python", ReviewSettings(focus_areas=AREAS)
+    )
+
+    skipped = [s for s in provider.systems if "set corrected_code to null" in s]
+    assert len(provider.systems) == 3
+    assert len(skipped) == 2
+
+
+async def test_review_fanout_reports_failed_branches():
+    failed = []
+    usage = TokenUsage()
+    result = await review_fanout(
+        _Provider(failing={"performance"}),
+        AREAS,
+        ORIGINAL,
+        "python",
+        ReviewSettings(focus_areas=AREAS),
+        usage,
+        failed=failed,
+    )
+
+    assert failed == ["performance"]
+    assert "[security]" in result.summary
+    assert "[performance]" not in result.summary
+    assert usage.completion_tokens == 20
+
+
+async def test_review_fanout_raises_when_every_branch_fails():
+    with pytest.raises(ProviderError):
+        await review_fanout(
+            _Provider(failing=AREAS),
+            AREAS,
+            ORIGINAL,
+            "python",
+            ReviewSettings(focus_areas=AREAS),
+        )
+
+
+async def test_stream_fanout_reports_failed_branches():
+    failed = []
+    lines = [
+        json.loads(line)
+        async for chunk in stream_fanout(
+            _Provider(failing={"readability"}),
+            AREAS,
+            ORIGINAL,
+            "python",
+            ReviewSettings(focus_areas=AREAS),
+            TokenUsage(),
+            failed=failed,
+        )
+        for line in chunk.splitlines()
+    ]
+
+    assert failed == ["readability"]
+    assert [line["type"] for line in lines] == ["issue", "issue", "result"]
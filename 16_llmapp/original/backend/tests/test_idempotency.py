@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import IdempotencyKeyReusedError
+from app.models import ReviewSession
+from app.services.idempotency import IdempotencyStore, request_hash
+
+DIGEST = request_hash("review", '{"code": "x = 1"}')
+
+
+@pytest.fixture
+def store():
+    return IdempotencyStore(ttl_seconds=3600, wait_seconds=1, lease_seconds=60)
+
+
+async def _session(db, user):
+    session = ReviewSession(
+        user_id=user.id, code="x = 1", language="python", provider="openai"
+    )
+    db.add(session)
+    await db.commit()
+    return session.id
+
+
+async def test_completed_key_replays_the_stored_outcome(db, user, store):
+    session_id = await _session(db, user)
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+
+    running = await store.claim(user.id, "k", "review", DIGEST)
+    assert running.status == "in_progress"
+
+    await store.complete(user.id, "k", session_id, {"session_id": session_id})
+    await store.finish(user.id, "k")
+    replay = await store.claim(user.id, "k", "review", DIGEST)
+
+    assert replay.status == "completed"
+    assert replay.session_id == session_id
+    assert replay.response_json == {"session_id": session_id}
+    waited = await store.wait(user.id, "k")
+    assert (waited.status, waited.session_id) == ("completed", session_id)
+
+
+async def test_key_reused_for_another_request_is_refused(db, user, store):
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+    await store.finish(user.id, "k")
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        await store.claim(user.id, "k", "stream", DIGEST)
+    with pytest.raises(IdempotencyKeyReusedError):
+        await store.claim(user.id, "k", "review", request_hash("review", "{}"))
+
+
+async def test_released_key_can_be_claimed_again(db, user, store):
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+    await store.release(user.id, "k")
+    await store.finish(user.id, "k")
+
+    assert await store.wait(user.id, "k") is None
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+    await store.finish(user.id, "k")
+
+
+async def test_lapsed_lease_is_taken_over(db, user):
+    store = IdempotencyStore(ttl_seconds=3600, wait_seconds=1, lease_seconds=0.05)
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+    await store.finish(user.id, "k")
+    await asyncio.sleep(0.1)
+
+    # The original stopped renewing without an outcome: the next retry runs it.
+    assert await store.wait(user.id, "k") is None
+    assert await store.claim(user.id, "k", "review", DIGEST) is None
+    await store.finish(user.id, "k")
@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.core.exceptions import ProviderError
+from app.schemas.reviews import TokenUsage
+from app.services.llm import OpenAIProvider
+from app.services.resilience import RetryPolicy
+
+MESSAGES = [{"role": "user", "content": "Review this"}]
+
+
+class _Stream:
+    def __init__(self, parts, usage=None):
+        self.parts = parts
+        self.usage = usage
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for part in self.parts:
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=part))],
+                usage=None,
+            )
+        if self.usage is not None:
+            yield SimpleNamespace(choices=[], usage=self.usage)
+
+    async def close(self):
+        pass
+
+
+class _Client:
+    def __init__(self, create):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+def _provider(create) -> OpenAIProvider:
+    return OpenAIProvider(
+        _Client(create), "gpt-4o-mini", RetryPolicy(0, base_delay=0, max_delay=0)
+    )
+
+
+async def _drain(provider, usage):
+    return "".join([chunk async for chunk in provider.stream_messages(MESSAGES, usage)])
+
+
+async def test_stream_records_reported_usage():
+    async def create(**kwargs):
+        upstream = SimpleNamespace(
+            prompt_tokens=12, completion_tokens=3, prompt_tokens_details=None
+        )
+        return _Stream(["a", "b"], upstream)
+
+    usage = TokenUsage()
+    assert await _drain(_provider(create), usage) == "ab"
+
+    assert (usage.prompt_tokens, usage.completion_tokens) == (12, 3)
+    assert not usage.estimated
+    assert usage.model == "gpt-4o-mini"
+
+
+async def test_stream_estimates_usage_when_none_is_reported():
+    async def create(**kwargs):
+        return _Stream(["some output"])
+
+    usage = TokenUsage()
+    await _drain(_provider(create), usage)
+
+    assert usage.estimated
+    assert usage.prompt_tokens > 0
+    assert usage.completion_tokens > 0
+
+
+async def test_stream_that_never_opens_records_no_usage():
+    async def create(**kwargs):
+        raise openai.APIConnectionError(
+            request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        )
+
+    usage = TokenUsage()
+    with pytest.raises(ProviderError):
+        await _drain(_provider(create), usage)
+
+    assert usage == TokenUsage()
+
+
+def _bad_request(message, param):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.BadRequestError(
+        message,
+        response=httpx.Response(400, request=request),
+        body={"message": message, "param": param},
+    )
+
+
+def _probe_client(refused_format=None):
+    """Refuses max_tokens like newer models, and optionally one output format."""
+
+    async def create(**kwargs):
+        if "max_tokens" in kwargs:
+            raise _bad_request(
+                "Unsupported parameter: 'max_tokens'. Use 'max_completion_tokens'.",
+                "max_tokens",
+            )
+        response_format = kwargs.get("response_format")
+        if response_format and response_format["type"] == refused_format:
+            raise _bad_request("response_format is not supported", "response_format")
+        if kwargs.get("stream"):
+            return _Stream(["{}"])
+        message = SimpleNamespace(content='{"ok": true}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    return create
+
+
+async def test_probe_marks_supported_modes():
+    provider = _provider(_probe_client())
+    await provider.probe_capabilities()
+
+    caps = provider.capabilities.get("gpt-4o-mini")
+    assert (caps.json_schema, caps.json_mode, caps.stream_usage) == (True, True, True)
+
+
+async def test_probe_marks_only_the_refused_mode_unsupported():
+    provider = _provider(_probe_client(refused_format="json_schema"))
+    await provider.probe_capabilities()
+
+    caps = provider.capabilities.get("gpt-4o-mini")
+    assert (caps.json_schema, caps.json_mode) == (False, True)
@@ -0,0 +1,94 @@
+from sqlalchemy import select
+
+from app.models import ReviewMessage, ReviewRollup, ReviewSession
+from app.services.analytics import rebuild_rollups, record_message, record_session
+from app.services.retention import delete_sessions, purge
+
+
+async def _review(db, user, code, issues=(), error=False):
+    session = ReviewSession(
+        user_id=user.id, code=code, language="python", provider="openai"
+    )
+    db.add(session)
+    await db.flush()
+    await record_session(db, session)
+    content = (
+        {"type": "error", "message": "boom"}
+        if error
+        else {
+            "summary": "ok",
+            "issues": [{"line": 1, "severity": s, "message": "m"} for s in issues],
+            "suggestions": [],
+        }
+    )
+    message = ReviewMessage(
+        session_id=session.id, role="assistant", content_json=content
+    )
+    db.add(message)
+    await db.flush()
+    await record_message(db, session, message)
+    await db.commit()
+    return session.id
+
+
+async def _rollups(db):
+    db.expire_all()
+    rows = (await db.scalars(select(ReviewRollup))).all()
+    return sorted(
+        (
+            r.user_id,
+            r.day,
+            r.language,
+            r.reviews,
+            r.results,
+            r.errors,
+            r.info_count,
+            r.warning_count,
+            r.error_count,
+            r.lines,
+        )
+        for r in rows
+    )
+
+
+async def _rebuilt(db):
+    await rebuild_rollups(db)
+    await db.commit()
+    return await _rollups(db)
+
+
+async def test_incremental_rollups_match_rebuild(db, user):
+    await _review(db, user, "x = 1\n", issues=["info", "error"])
+    await _review(db, user, "a\nb\nc", issues=["warning"])
+    await _review(db, user, "y = 2\n", error=True)
+    incremental = await _rollups(db)
+    assert incremental == await _rebuilt(db)
+
+
+async def test_line_counts_ignore_a_trailing_newline(db, user):
+    for code in ("x = 1\n", "a\nb\nc", "a\r\nb\r\n", "", "\n\n"):
+        await _review(db, user, code, issues=["info"])
+    incremental = await _rollups(db)
+
+    # 1 + 3 + 2 + 0 + 2 lines, per user and globally.
+    assert [row[-1] for row in incremental] == [8, 8]
+    assert incremental == await _rebuilt(db)
+
+
+async def test_deletes_subtract_from_rollups(db, user):
+    first = await _review(db, user, "x = 1\n", issues=["info"])
+    second = await _review(db, user, "a\nb\n", issues=["error", "warning"])
+    third = await _review(db, user, "z = 3\n", error=True)
+
+    assert await delete_sessions(db, ReviewSession.id == first) == 1
+    await db.commit()
+    after_single = await _rollups(db)
+    assert after_single == await _rebuilt(db)
+    assert after_single[0][3] == 2
+
+    assert await purge(ReviewSession.id == second, "test", pause=0) == 1
+    after_purge = await _rollups(db)
+    assert after_purge == await _rebuilt(db)
+
+    await purge(ReviewSession.id == third, "test", pause=0)
+    assert await _rollups(db) == []
@@ -0,0 +1,59 @@
+from app.schemas.reviews import ReviewIssue, ReviewResult, ReviewSettings
+from app.services.review_cache import ReviewCache, _Entry, _remap, fingerprint
+
+CODE = "def f():\n    x = 1\n    return x\n"
+SETTINGS = ReviewSettings()
+
+
+def _result(*lines):
+    return ReviewResult(
+        summary="ok",
+        issues=[ReviewIssue(line=line, message=f"line {line}") for line in lines],
+        corrected_code="fixed\n",
+    )
+
+
+def _entry(code, result):
+    fp = fingerprint(code, "python")
+    return _Entry(result, fp.first_token_by_line(len(code.splitlines())), 0.0)
+
+
+def test_entries_are_scoped_to_the_user():
+    cache = ReviewCache(max_entries=10, ttl_seconds=60, fuzzy=True)
+    cache.store(1, CODE, "python", SETTINGS, _result(2))
+
+    assert cache.lookup(1, CODE, "python", SETTINGS).kind == "exact"
+    assert cache.lookup(1, "# hi\n" + CODE, "python", SETTINGS).kind == "fuzzy"
+    assert cache.lookup(2, CODE, "python", SETTINGS) is None
+    assert cache.lookup(2, "# hi\n" + CODE, "python", SETTINGS) is None
+
+
+def test_remap_follows_lines_moved_by_comments_and_blank_lines():
+    moved = "# header\n\ndef f():\n    x = 1  # one\n\n    return x\n"
+    remapped = _remap(_entry(CODE, _result(1, 2, 3)), fingerprint(moved, "python"))
+
+    assert [i.line for i in remapped.issues] == [3, 4, 6]
+    assert remapped.corrected_code is None
+
+
+def test_remap_maps_comment_only_lines_to_the_next_code():
+    code = "def f():\n    # note\n    return 1\n"
+    joined = "def f():\n    return 1\n"
+    remapped = _remap(_entry(code, _result(2)), fingerprint(joined, "python"))
+
+    assert [i.line for i in remapped.issues] == [2]
+
+
+def test_remap_leaves_unknown_lines_alone():
+    remapped = _remap(
+        _entry(CODE, _result(None, 0, 99)), fingerprint("# x\n" + CODE, "python")
+    )
+
+    assert [i.line for i in remapped.issues] == [None, 0, 99]
+
+
+def test_remap_clamps_trailing_lines_to_the_last_token():
+    code = "x = 1\n\n\n"
+    remapped = _remap(_entry(code, _result(3)), fingerprint("x = 1", "python"))
+
+    assert [i.line for i in remapped.issues] == [1]
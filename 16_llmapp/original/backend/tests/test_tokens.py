@@ -0,0 +1,44 @@
+import pytest
+
+from app.services import tokens
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+
+class _Encoding:
+    """Stands in for a tiktoken encoding: one token per word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    monkeypatch.setattr(tokens, "_encoding", lambda model: _Encoding())
+
+
+@pytest.fixture
+def no_encoding(monkeypatch):
+    monkeypatch.setattr(tokens, "_encoding", lambda model: None)
+
+
+def test_counts_with_the_tokenizer(encoding):
+    assert tokens.has_tokenizer("gpt-4o-mini")
+    assert tokens.count_tokens(CODE, "gpt-4o-mini") == 7
+
+
+def test_fallback_rounds_up_at_three_chars_per_token(no_encoding):
+    assert not tokens.has_tokenizer("gpt-4o-mini")
+    assert tokens.count_tokens("", "gpt-4o-mini") == 0
+    assert tokens.count_tokens("abc", "gpt-4o-mini") == 1
+    assert tokens.count_tokens("abcd", "gpt-4o-mini") == 2
+    assert tokens.count_tokens(CODE, "gpt-4o-mini") == -(-len(CODE) // 3)
+
+
+def test_message_count_adds_framing(no_encoding):
+    messages = [
+        {"role": "system", "content": "abc"},
+        {"role": "user", "content": None},
+    ]
+
+    assert tokens.count_message_tokens(messages, "gpt-4o-mini") == 3 + 4 + 1 + 4
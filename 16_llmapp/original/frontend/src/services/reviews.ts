@@ -1,5 +1,6 @@
 import { authenticatedFetch, parseErrorResponse } from "@/services/api";
 import type {
+  BulkDeleteSelection,
   ReviewSessionDetail,
   ReviewSessionSummary,
 } from "@/types/review";
@@ -34,6 +35,27 @@ export async function deleteReviewSession(
   }
 }
 
+export async function deleteReviewSessions(
+  token: string,
+  selection: BulkDeleteSelection,
+): Promise<number> {
+  const response = await authenticatedFetch(
+    "/api/reviews/bulk-delete",
+    token,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(selection),
+    },
+  );
+  if (!response.ok) {
+    const message = await parseErrorResponse(response);
+    throw new Error(message);
+  }
+  const { deleted } = (await response.json()) as { deleted: number };
+  return deleted;
+}
+
 export async function fetchReviewDetail(
   token: string,
   sessionId: number,
@@ -15,6 +15,17 @@ export interface ReviewResult {
   issues: ReviewIssue[];
   suggestions: string[];
   corrected_code: string | null;
+  // Set when the result was salvaged from a truncated or malformed stream.
+  partial?: boolean;
+  partial_reason?: string;
+  // Set when the result was served from the review cache.
+  cached?: CacheMarker;
+}
+
+export interface CacheMarker {
+  // "fuzzy": matched code differing only in comments, whitespace or layout.
+  kind: "exact" | "fuzzy";
+  age_seconds: number;
 }
 
 export interface ReviewSettings {
@@ -50,3 +61,8 @@ export interface ReviewMessage {
 export interface ReviewSessionDetail extends ReviewSessionSummary {
   messages: ReviewMessage[];
 }
+
+export type BulkDeleteSelection =
+  | { ids: number[] }
+  | { after?: string; before?: string }
+  | { all: true };